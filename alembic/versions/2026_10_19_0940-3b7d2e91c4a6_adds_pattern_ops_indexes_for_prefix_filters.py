@@ -0,0 +1,42 @@
+"""adds pattern ops indexes for prefix filters
+
+Revision ID: 3b7d2e91c4a6
+Revises: f56beb965b19
+Create Date: 2026-10-19 09:40:12.318245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d2e91c4a6'
+down_revision: Union[str, Sequence[str], None] = 'f56beb965b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_tasks_title_pattern',
+        'tasks',
+        ['title'],
+        unique=False,
+        postgresql_ops={'title': 'varchar_pattern_ops'},
+    )
+    op.create_index(
+        'ix_users_username_pattern',
+        'users',
+        ['username'],
+        unique=False,
+        postgresql_ops={'username': 'varchar_pattern_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_username_pattern', table_name='users')
+    op.drop_index('ix_tasks_title_pattern', table_name='tasks')
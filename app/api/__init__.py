@@ -1,8 +1,12 @@
 from fastapi import APIRouter, Depends
-from fastapi_limiter.depends import RateLimiter
 
 from app.api.v1 import router as router_api_v1
 from app.core.config import settings
+from app.core.deadlines import apply_route_deadline
+from app.core.rate_limiter import RateLimiter
 
-router = APIRouter(prefix=settings.api.prefix, dependencies=[Depends(RateLimiter(seconds=5))])
+router = APIRouter(
+    prefix=settings.api.prefix,
+    dependencies=[Depends(apply_route_deadline), Depends(RateLimiter(scope="api"))],
+)
 router.include_router(router_api_v1)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response
+
+from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE, registry
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get(settings.metrics.path, include_in_schema=False)
+def metrics() -> Response:
+    """
+    Expose the metrics aggregated over all worker processes.
+
+    Returns:
+        Response: Prometheus text exposition
+
+    """
+    return Response(content=registry.expose(), media_type=CONTENT_TYPE)
@@ -4,14 +4,21 @@ from fastapi import APIRouter, Body, Depends, Response, status
 
 from app.api.v1.schemas import MessageLoginReturn, MessageRegisterReturn
 from app.core.config import settings
+from app.core.deadlines import deadline
+from app.core.rate_limiter import rate_cost
+from app.core.responses import TrustedRoute
+from app.database.bulkheads import bulkhead
 from app.schemas import UserInput
 from app.services import AuthService, AuthServiceBase, SqlAlchemyServiceHelper
 
-router = APIRouter(prefix=settings.api.v1.auth, tags=["Auth"])
+router = APIRouter(prefix=settings.api.v1.auth, tags=["Auth"], route_class=TrustedRoute)
 auth_service_helper = SqlAlchemyServiceHelper(AuthService)
 
 
 @router.post("/login")
+@rate_cost(10)
+@bulkhead("auth")
+@deadline(5)
 async def login(
     auth_service: Annotated[AuthServiceBase, Depends(auth_service_helper.service_getter)],
     user_input: Annotated[UserInput, Body()],
@@ -34,6 +41,9 @@ async def login(
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
+@rate_cost(10)
+@bulkhead("auth")
+@deadline(5)
 async def register(
     auth_service: Annotated[AuthServiceBase, Depends(auth_service_helper.service_getter)],
     user_input: Annotated[UserInput, Body()],
@@ -4,12 +4,15 @@ from fastapi import APIRouter, Body, Depends, Path, Query
 
 from app.api.v1.deps import PermissionChecker, TaskOwnershipChecker
 from app.api.v1.schemas import MessageDeleteTaskReturn, MessageUpdateTaskReturn
+from app.core.coalescing import CoalescingRoute, coalesce
 from app.core.config import settings
+from app.core.deadlines import deadline
+from app.core.rate_limiter import page_cost, rate_cost
 from app.core.security import Token
 from app.schemas import Payload, Role, TaskFilters, TaskInput, TaskRead, TaskUpdate
 from app.services import SqlAlchemyServiceHelper, TaskService, TaskServiceBase
 
-router = APIRouter(prefix=settings.api.v1.tasks, tags=["Tasks"])
+router = APIRouter(prefix=settings.api.v1.tasks, tags=["Tasks"], route_class=CoalescingRoute)
 task_service_helper = SqlAlchemyServiceHelper(TaskService)
 
 
@@ -41,6 +44,8 @@ async def create_task(
     "/all",
     dependencies=[Depends(PermissionChecker(Role.admin, Role.user))],
 )
+@rate_cost(page_cost)
+@deadline(20)
 async def get_all_tasks(
     task_service: Annotated[TaskServiceBase, Depends(task_service_helper.service_getter)],
     payload: Annotated[Payload, Depends(Token())],
@@ -65,6 +70,7 @@ async def get_all_tasks(
     "/{task_id}",
     dependencies=[Depends(TaskOwnershipChecker(task_service_helper))],
 )
+@coalesce
 async def get_task(
     task_service: Annotated[TaskServiceBase, Depends(task_service_helper.service_getter)],
     task_id: Annotated[int, Path()],
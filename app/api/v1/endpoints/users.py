@@ -4,12 +4,16 @@ from fastapi import APIRouter, Depends, Path, Query
 
 from app.api.v1.deps import PermissionChecker, UserOwnershipChecker
 from app.api.v1.schemas import MessageDeleteUserReturn
+from app.core.coalescing import CoalescingRoute, coalesce
 from app.core.config import settings
+from app.core.deadlines import deadline
+from app.core.rate_limiter import page_cost, rate_cost
 from app.core.security import Token
+from app.database.bulkheads import bulkhead
 from app.schemas import Payload, Role, UserFilters, UserRead
 from app.services import SqlAlchemyServiceHelper, UserService, UserServiceBase
 
-router = APIRouter(prefix=settings.api.v1.users, tags=["Users"])
+router = APIRouter(prefix=settings.api.v1.users, tags=["Users"], route_class=CoalescingRoute)
 user_service_helper = SqlAlchemyServiceHelper(UserService)
 
 
@@ -38,6 +42,10 @@ async def get_me(
     "/all",
     dependencies=[Depends(PermissionChecker(Role.admin))],
 )
+@coalesce
+@rate_cost(page_cost)
+@bulkhead("admin")
+@deadline(20)
 async def get_all_users(
     user_service: Annotated[UserServiceBase, Depends(user_service_helper.service_getter)],
     filters: Annotated[UserFilters, Query()],
@@ -1,5 +0,0 @@
-from pydantic import BaseModel
-
-
-class MessageHealthCheckReturn(BaseModel):
-    message: str = "Success."
@@ -0,0 +1,207 @@
+import asyncio
+import functools
+import inspect
+from collections.abc import Callable, Coroutine, Hashable
+from typing import Any, Final, final
+
+from fastapi import Request
+
+from app.core.metrics import cache_requests_total
+from app.core.responses import TrustedRoute
+
+type ENDPOINT = Callable[..., Coroutine[Any, Any, Any]]
+type ENDPOINT_CALL = Callable[[], Coroutine[Any, Any, Any]]
+
+COALESCE_ATTR: Final[str] = "__coalesce__"
+COALESCE_METHODS: Final[frozenset[str]] = frozenset({"GET", "HEAD"})
+AUTH_COOKIES: Final[tuple[str, ...]] = ("access_token", "refresh_token")
+
+_REQUEST_PARAM: Final[str] = "__coalesce_request"
+# result of a leader cancelled before finishing, its waiters execute on their own
+_ABANDONED: Final[object] = object()
+
+
+@final
+class SingleFlight:
+    """Coalesce identical in-flight requests into one execution."""
+
+    __slots__ = ("_in_flight", "executions", "requests")
+
+    def __init__(self) -> None:
+        """Initialize the single-flight group."""
+        self._in_flight: dict[Hashable, asyncio.Future[Any]] = {}
+        self.requests = 0
+        self.executions = 0
+
+    @property
+    def coalesced(self) -> int:
+        """
+        Number of requests served from another request's execution.
+
+        Returns:
+            int: coalesced requests count
+
+        """
+        return self.requests - self.executions
+
+    @property
+    def coalescing_ratio(self) -> float:
+        """
+        Share of requests that did not execute the endpoint.
+
+        Returns:
+            float: ratio in the range [0, 1]
+
+        """
+        return self.coalesced / self.requests if self.requests else 0.0
+
+    async def do(self, key: Hashable, call: ENDPOINT_CALL) -> Any:  # noqa: ANN401
+        """
+        Execute the endpoint once per key and share its result with all waiters.
+
+        Args:
+            key (Hashable): request identity
+            call (ENDPOINT_CALL): endpoint call with the request's arguments
+
+        Raises:
+            CancelledError: the leading request was cancelled
+
+        Returns:
+            Any: endpoint result
+
+        """
+        self.requests += 1
+
+        if (future := self._in_flight.get(key)) is not None:
+            shared = await asyncio.shield(future)
+
+            if shared is not _ABANDONED:
+                cache_requests_total.labels("single_flight", "hit").inc()
+                return shared
+
+            self.executions += 1
+            cache_requests_total.labels("single_flight", "miss").inc()
+            return await call()
+
+        self.executions += 1
+        cache_requests_total.labels("single_flight", "miss").inc()
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.set_result(_ABANDONED)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            _ = future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+
+
+single_flight = SingleFlight()
+
+
+def coalesce[Endpoint: Callable[..., Any]](endpoint: Endpoint) -> Endpoint:
+    """
+    Mark the endpoint for single-flight coalescing of identical GET requests.
+
+    Only takes effect on routers created with ``route_class=CoalescingRoute``.
+
+    Args:
+        endpoint (Endpoint): route endpoint
+
+    Returns:
+        Endpoint: the same endpoint
+
+    """
+    setattr(endpoint, COALESCE_ATTR, True)
+    return endpoint
+
+
+def _request_key(request: Request) -> Hashable:
+    """
+    Build the coalescing key: method, path, query and authorization scope.
+
+    Args:
+        request (Request): request from the client
+
+    Returns:
+        Hashable: request identity
+
+    """
+    cookies = request.cookies
+    return (
+        request.method,
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        request.headers.get("authorization"),
+        tuple(cookies.get(name) for name in AUTH_COOKIES),
+    )
+
+
+def _coalescing_endpoint(endpoint: ENDPOINT) -> ENDPOINT:
+    """
+    Wrap the endpoint to share its execution between identical requests.
+
+    FastAPI calls the endpoint once the dependencies of the request are solved, so each
+    waiter is still rate limited, given its deadline and authorized on its own.
+
+    Args:
+        endpoint (ENDPOINT): route endpoint
+
+    Returns:
+        ENDPOINT: wrapped endpoint with the request parameter added
+
+    """
+    signature = inspect.signature(endpoint)
+    parameters = [
+        *signature.parameters.values(),
+        inspect.Parameter(_REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+    ]
+
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs: Any) -> Any:  # noqa: ANN401
+        request: Request = kwargs.pop(_REQUEST_PARAM)
+
+        if request.method not in COALESCE_METHODS:
+            return await endpoint(**kwargs)
+
+        return await single_flight.do(_request_key(request), functools.partial(endpoint, **kwargs))
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)  # type: ignore[reportFunctionMemberAccess]
+    return wrapper
+
+
+class CoalescingRoute(TrustedRoute):
+    """
+    Route sharing the endpoint result of identical in-flight requests.
+
+    The waiters receive the leader's result and render their own response, with the
+    headers their dependencies set.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:  # noqa: ANN401
+        """
+        Initialize the route.
+
+        Args:
+            path (str): route path
+            endpoint (Callable[..., Any]): route endpoint
+            kwargs (Any): APIRoute options
+
+        """
+        # the routers copy their routes with the endpoint already wrapped
+        if (
+            getattr(endpoint, COALESCE_ATTR, False)
+            and inspect.iscoroutinefunction(endpoint)
+            and _REQUEST_PARAM not in inspect.signature(endpoint).parameters
+        ):
+            endpoint = _coalescing_endpoint(endpoint)
+
+        super().__init__(path, endpoint, **kwargs)
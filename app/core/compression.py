@@ -0,0 +1,409 @@
+import functools
+import time
+import zlib
+from collections.abc import Callable
+from typing import Final, Protocol, final
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import http_compression_bytes_total, http_compression_skipped_total
+from app.core.timing import record_timing
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_GZIP_WBITS: Final[int] = 31
+_NO_BODY_STATUSES: Final[frozenset[int]] = frozenset({204, 304})
+
+
+class StreamCompressor(Protocol):
+    def compress(self, chunk: bytes) -> bytes:
+        """
+        Compress the chunk and flush it, so that the client can decode it right away.
+
+        Args:
+            chunk (bytes): response body chunk
+
+        Returns:
+            bytes: compressed chunk
+
+        """
+        ...
+
+    def finish(self) -> bytes:
+        """
+        End the compressed stream.
+
+        Returns:
+            bytes: stream trailer
+
+        """
+        ...
+
+
+@final
+class _GzipStream:
+    __slots__ = ("_compressor",)
+
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, _GZIP_WBITS)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+@final
+class _BrotliStream:
+    __slots__ = ("_compressor",)
+
+    def __init__(self, level: int) -> None:
+        self._compressor = brotli.Compressor(quality=level)  # type: ignore[reportOptionalMemberAccess]
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+@final
+class _ZstdStream:
+    __slots__ = ("_compressor",)
+
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()  # type: ignore[reportOptionalMemberAccess]
+
+    def compress(self, chunk: bytes) -> bytes:
+        flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK  # type: ignore[reportOptionalMemberAccess]
+        return self._compressor.compress(chunk) + self._compressor.flush(flush_block)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+@final
+class Codec:
+    """Content coding with its one-shot and streaming compressors."""
+
+    __slots__ = ("compress", "name", "stream")
+
+    def __init__(
+        self,
+        name: str,
+        compress: Callable[[bytes], bytes],
+        stream: Callable[[], StreamCompressor],
+    ) -> None:
+        """
+        Initialize the codec.
+
+        Args:
+            name (str): content coding token
+            compress (Callable[[bytes], bytes]): whole body compressor
+            stream (Callable[[], StreamCompressor]): streaming compressor factory
+
+        """
+        self.name = name
+        self.compress = compress
+        self.stream = stream
+
+
+def _available_codecs() -> dict[str, Codec]:
+    levels = settings.compression.levels
+    codecs = {
+        "gzip": Codec(
+            "gzip",
+            functools.partial(zlib.compress, level=levels["gzip"], wbits=_GZIP_WBITS),
+            functools.partial(_GzipStream, levels["gzip"]),
+        ),
+    }
+
+    if brotli is not None:
+        codecs["br"] = Codec(
+            "br",
+            functools.partial(brotli.compress, quality=levels["br"]),
+            functools.partial(_BrotliStream, levels["br"]),
+        )
+
+    if zstandard is not None:
+        codecs["zstd"] = Codec(
+            "zstd",
+            zstandard.ZstdCompressor(level=levels["zstd"]).compress,
+            functools.partial(_ZstdStream, levels["zstd"]),
+        )
+
+    return codecs
+
+
+@functools.lru_cache(maxsize=256)
+def negotiate(accept_encoding: str, available: tuple[str, ...]) -> str | None:
+    """
+    Choose the content coding from the Accept-Encoding header.
+
+    The client's quality values decide, the server preference order breaks ties.
+
+    Args:
+        accept_encoding (str): Accept-Encoding header value
+        available (tuple[str, ...]): supported codings by server preference
+
+    Returns:
+        str | None: chosen coding, None for identity
+
+    """
+    accepted: dict[str, float] = {}
+
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        accepted[coding.strip()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    best: str | None = None
+    best_quality = 0.0
+
+    for coding in available:
+        if (quality := accepted.get(coding, wildcard)) > best_quality:
+            best, best_quality = coding, quality
+
+    return best
+
+
+@final
+class CompressionBudget:
+    """
+    Share of the worker time that may be spent compressing.
+
+    Compression time is drawn from a bucket refilled at the configured share of the
+    wall clock. A saturated worker empties it and sends the responses uncompressed
+    instead of queueing the other requests behind the compressor.
+    """
+
+    __slots__ = ("_burst", "_share", "_tokens", "_updated")
+
+    def __init__(self, share: float, burst: float) -> None:
+        """
+        Initialize the budget.
+
+        Args:
+            share (float): compression seconds allowed per second
+            burst (float): compression seconds that may be spent at once
+
+        """
+        self._share = share
+        self._burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def available(self) -> bool:
+        """
+        Check whether compression time is left.
+
+        Returns:
+            bool: True when the response may be compressed
+
+        """
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._share)
+        self._updated = now
+        return self._tokens > 0
+
+    def spend(self, seconds: float) -> None:
+        """
+        Account the time spent compressing.
+
+        Args:
+            seconds (float): compression time
+
+        """
+        self._tokens -= seconds
+
+
+@final
+class CompressionMiddleware:
+    """
+    Compress the response body with the coding negotiated from Accept-Encoding.
+
+    Complete bodies smaller than the threshold are sent as is, streamed bodies are
+    compressed and flushed chunk by chunk.
+    """
+
+    __slots__ = ("_available", "_codecs", "app", "budget")
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): next ASGI application
+
+        """
+        self.app = app
+        self._codecs = _available_codecs()
+        self._available = tuple(
+            coding for coding in settings.compression.preference if coding in self._codecs
+        )
+        self.budget = CompressionBudget(
+            settings.compression.cpu_share,
+            settings.compression.cpu_burst,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Negotiate the coding and compress the response.
+
+        Args:
+            scope (Scope): connection scope
+            receive (Receive): receive channel
+            send (Send): send channel
+
+        """
+        if scope["type"] != "http" or not settings.compression.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding")
+        coding = negotiate(accept_encoding, self._available) if accept_encoding else None
+
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, self._codecs[coding], self.budget)
+        await self.app(scope, receive, responder.send)
+
+
+@final
+class _CompressionResponder:
+    __slots__ = ("_budget", "_codec", "_send", "_start", "_stream")
+
+    def __init__(self, send: Send, codec: Codec, budget: CompressionBudget) -> None:
+        self._send = send
+        self._codec = codec
+        self._budget = budget
+        self._start: Message | None = None
+        self._stream: StreamCompressor | None = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # the headers depend on the first body chunk, hold them back
+            self._start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self._start is not None:
+            start, self._start = self._start, None
+            await self._send_first(start, message)
+        elif self._stream is not None:
+            await self._send_chunk(message)
+        else:
+            await self._send(message)
+
+    async def _send_first(self, start: Message, message: Message) -> None:
+        headers = MutableHeaders(scope=start)
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if (reason := self._skip_reason(start, headers, body, more_body=more_body)) is not None:
+            if reason != "type":
+                headers.add_vary_header("Accept-Encoding")
+
+            http_compression_skipped_total.labels(reason).inc()
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self._codec.name
+        headers.add_vary_header("Accept-Encoding")
+
+        if more_body:
+            del headers["Content-Length"]
+            self._stream = self._codec.stream()
+            await self._send(start)
+            await self._send_chunk(message)
+            return
+
+        compressed = self._timed(self._codec.compress, body)
+        headers["Content-Length"] = str(len(compressed))
+        self._count(len(body), len(compressed))
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    async def _send_chunk(self, message: Message) -> None:
+        if self._stream is None:
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        compressed = self._timed(self._stream.compress, body) if body else b""
+
+        if not more_body:
+            compressed += self._stream.finish()
+            self._stream = None
+
+        self._count(len(body), len(compressed))
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    def _skip_reason(
+        self,
+        start: Message,
+        headers: MutableHeaders,
+        body: bytes,
+        *,
+        more_body: bool,
+    ) -> str | None:
+        config = settings.compression
+
+        if start["status"] in _NO_BODY_STATUSES or "content-encoding" in headers:
+            return "encoded"
+
+        content_type = headers.get("content-type", "").partition(";")[0].strip()
+
+        if not content_type.startswith(tuple(config.content_types)):
+            return "type"
+
+        length = headers.get("content-length")
+        size = len(body) if not more_body else int(length) if length else config.minimum_size
+
+        if size < config.minimum_size:
+            return "size"
+
+        if not self._budget.available():
+            return "budget"
+
+        return None
+
+    def _timed(self, compress: Callable[[bytes], bytes], data: bytes) -> bytes:
+        start = time.perf_counter_ns()
+        compressed = compress(data)
+        elapsed_ns = time.perf_counter_ns() - start
+        self._budget.spend(elapsed_ns / 1e9)
+        record_timing("compress", elapsed_ns)
+        return compressed
+
+    def _count(self, uncompressed: int, compressed: int) -> None:
+        http_compression_bytes_total.labels(self._codec.name, "in").inc(uncompressed)
+        http_compression_bytes_total.labels(self._codec.name, "out").inc(compressed)
@@ -1,9 +1,8 @@
 from datetime import timedelta
 from pathlib import Path
-from typing import Self
+from typing import Literal
 
-from loguru import logger
-from pydantic import BaseModel, Field, PostgresDsn, computed_field, field_validator, model_validator
+from pydantic import BaseModel, Field, PostgresDsn, computed_field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,6 +12,7 @@ class _LoggerConfig(BaseModel):
     path: str = "logs/{time:YYYY-MM-DD}/log.log"
     rotation: str = "00:00"
     retention: str = "60 days"
+    diagnose: bool = Field(default=False, description="Show variable values in tracebacks.")
 
     @field_validator("level")
     @classmethod
@@ -26,6 +26,43 @@ class _LoggerConfig(BaseModel):
         return level.upper()
 
 
+class _RequestLoggingConfig(BaseModel):
+    sample_rate: float = Field(default=1.0, ge=0, le=1, description="Default sampling rate.")
+    status_sample_rates: dict[str, float] = Field(
+        default={},
+        description="Sampling rate per status class, e.g. {'2xx': 0.1}, errors are always logged.",
+    )
+    route_sample_rates: dict[str, float] = Field(
+        default={},
+        description="Sampling rate per route path, e.g. {'/api/v1/users/me': 0.01}.",
+    )
+    slow_threshold: float = Field(
+        default=1.0,
+        ge=0,
+        description="Requests slower than this (seconds) are always logged, as are 4xx and 5xx.",
+    )
+    header_allowlist: list[str] = [
+        "host",
+        "user-agent",
+        "accept",
+        "accept-encoding",
+        "content-type",
+        "content-length",
+        "content-encoding",
+        "origin",
+        "referer",
+        "x-forwarded-for",
+        "x-request-id",
+        "x-process-time",
+    ]
+    redacted_headers: list[str] = [
+        "authorization",
+        "proxy-authorization",
+        "cookie",
+        "set-cookie",
+    ]
+
+
 class _LoggingConfig(BaseModel):
     stream: _LoggerConfig
     common_file: _LoggerConfig
@@ -36,16 +73,18 @@ class _LoggingConfig(BaseModel):
         default=Path("logs").resolve(),
         description="The path to the logs folder.",
     )
-
-    @model_validator(mode="after")
-    def create_log_folder(self) -> Self:
-        self.path_folder.mkdir(exist_ok=True, parents=True)
-        return self
-
-    @model_validator(mode="after")
-    def remove_existing_logger(self) -> Self:
-        logger.remove()
-        return self
+    queue_size: int = Field(default=10_000, ge=1, description="Max queued log records.")
+    batch_size: int = Field(default=256, ge=1, description="Max records written at once.")
+    overflow: Literal["drop", "block"] = Field(
+        default="drop",
+        description="Policy for a full queue: drop the record or wait for free space.",
+    )
+    block_timeout: float = Field(
+        default=0.05,
+        gt=0,
+        description="Max wait for free space with the 'block' policy before dropping.",
+    )
+    requests: _RequestLoggingConfig = _RequestLoggingConfig()
 
 
 class _TokenConfig(BaseModel):
@@ -76,9 +115,131 @@ class _RedisConfig(BaseModel):
     encoding: str = "utf8"
 
 
+class _RateLimitTiers(BaseModel):
+    guest: int = Field(default=60, ge=1, description="Cost units allowed per period for guests.")
+    user: int = Field(default=300, ge=1, description="Cost units allowed per period for users.")
+    admin: int = Field(default=1200, ge=1, description="Cost units allowed per period for admins.")
+
+
+class _RateLimitConfig(BaseModel):
+    enabled: bool = True
+    tiers: _RateLimitTiers = _RateLimitTiers()
+    seconds: int = Field(default=60, ge=1, description="Default limit period in seconds.")
+    lease_size: int = Field(default=10, ge=1, description="Tokens leased from redis at once.")
+    redis_timeout: float = Field(default=0.05, gt=0, description="Lease call timeout.")
+    redis_backoff: float = Field(default=5.0, gt=0, description="Local-only period on failure.")
+    reconcile_interval: float = Field(default=1.0, gt=0)
+    key_prefix: str = "ratelimit"
+
+
+class _ServerTimingConfig(BaseModel):
+    enabled: bool = Field(default=True, description="Collect the per-request time breakdown.")
+    header: bool = Field(default=True, description="Expose the breakdown as Server-Timing.")
+
+
+class _ResponseConfig(BaseModel):
+    trusted: bool = Field(
+        default=True,
+        description=(
+            "Serialize the endpoint output without validating it against the response "
+            "model. Endpoints must return exactly the annotated models."
+        ),
+    )
+
+
+class _CompressionConfig(BaseModel):
+    enabled: bool = True
+    minimum_size: int = Field(default=1024, description="Smaller bodies are sent as is.")
+    preference: list[Literal["zstd", "br", "gzip"]] = Field(
+        default=["zstd", "br", "gzip"],
+        description="Codings by preference, zstd and br need the zstandard and brotli packages.",
+    )
+    levels: dict[Literal["zstd", "br", "gzip"], int] = {"zstd": 3, "br": 4, "gzip": 6}
+    content_types: list[str] = Field(
+        default=["application/json", "application/problem+json", "text/"],
+        description="Compressed content type prefixes.",
+    )
+    cpu_share: float = Field(default=0.5, description="Share of the worker time to compress.")
+    cpu_burst: float = Field(default=0.5, description="Compression seconds spent at once.")
+
+
+class _MetricsConfig(BaseModel):
+    enabled: bool = Field(default=True, description="Expose the metrics endpoint.")
+    path: str = "/metrics"
+    directory: Path | None = Field(
+        default=None,
+        description=(
+            "Directory shared by the worker metric files, to be emptied before the server "
+            "starts. Defaults to a temporary directory of the parent process."
+        ),
+    )
+    buckets: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class _RequestIdConfig(BaseModel):
+    header: str = "X-Request-ID"
+    trust_incoming: bool = Field(
+        default=True,
+        description="Keep a well-formed request id sent by the client or the proxy.",
+    )
+
+
+class _LoadSheddingConfig(BaseModel):
+    enabled: bool = True
+    initial_limit: int = Field(default=100, description="In-flight requests per worker.")
+    min_limit: int = 10
+    max_limit: int = 1000
+    window_size: int = Field(default=100, description="Latency samples per limit update.")
+    window_time: float = Field(default=1.0, description="Max seconds between limit updates.")
+    long_window: int = Field(default=60, description="Windows in the latency baseline.")
+    tolerance: float = Field(default=1.5, description="Latency increase tolerated as normal.")
+    smoothing: float = 0.2
+    retry_after: int = 1
+    priority_shares: dict[Literal["critical", "normal", "bulk"], float] = Field(
+        default={"critical": 1.25, "normal": 1.0, "bulk": 0.6},
+        description="Share of the limit available to each priority.",
+    )
+    critical_paths: list[str] | None = Field(
+        default=None,
+        description="Path prefixes shed last. Defaults to the auth routes and the metrics.",
+    )
+    bulk_paths: list[str] | None = Field(
+        default=None,
+        description="Path prefixes shed first. Defaults to the list routes.",
+    )
+
+
+class _DeadlineConfig(BaseModel):
+    enabled: bool = True
+    header: str = Field(default="X-Request-Timeout", description="Client timeout (seconds).")
+    default: float = Field(default=10.0, description="Budget of routes without a deadline.")
+    max: float = Field(default=30.0, description="Upper bound of any request budget.")
+    statement_timeout: bool = Field(
+        default=True,
+        description=(
+            "Apply the remaining budget as the Postgres statement_timeout. The connections "
+            "default to the default budget, a request sets its own only when it differs."
+        ),
+    )
+    statement_timeout_slack: float = Field(
+        default=1.0,
+        ge=0,
+        description="Budget difference from the default tolerated without a SET (seconds).",
+    )
+
+
 class _RunConfig(BaseModel):
     host: str = "127.0.0.1"
     port: int = 8000
+    workers: int = Field(default=1, description="Worker processes forked by 'python -m app'.")
+    loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    http: Literal["auto", "h11", "httptools"] = "auto"
+    backlog: int = Field(default=2048, description="Pending connections of the socket.")
+    keep_alive: int = Field(default=5, description="Idle keep-alive connection timeout (s).")
+    max_requests: int | None = Field(default=None, description="Recycle workers after.")
+    max_requests_jitter: int = Field(default=0, description="Spread worker recycling.")
+    max_memory_mb: int | None = Field(default=None, description="Recycle workers over RSS.")
+    graceful_timeout: float = Field(default=30.0, description="Wait for workers to stop (s).")
 
 
 class _ApiV1Prefix(BaseModel):
@@ -86,7 +247,60 @@ class _ApiV1Prefix(BaseModel):
     auth: str = "/auth"
     users: str = "/users"
     tasks: str = "/tasks"
-    health: str = "/health"
+
+
+class _HealthConfig(BaseModel):
+    liveness_path: str = "/livez"
+    readiness_path: str = "/readyz"
+    ttl: float = Field(default=1.0, ge=0, description="Reuse the dependency checks (seconds).")
+    timeout: float = Field(default=0.5, gt=0, description="Timeout of every check (seconds).")
+    max_queue_share: float = Field(
+        default=1.0,
+        gt=0,
+        description="Report not ready with in-flight requests over this share of the limit.",
+    )
+
+
+class _DrainConfig(BaseModel):
+    grace: float = Field(
+        default=5.0,
+        ge=0,
+        description=(
+            "Keep serving after the readiness turned failing, while the load balancers "
+            "stop routing to the worker (seconds)."
+        ),
+    )
+    timeout: float = Field(
+        default=10.0,
+        ge=0,
+        description="Wait for the in-flight requests and background tasks at shutdown (seconds).",
+    )
+    retry_after: int = 1
+
+
+class _WarmupConfig(BaseModel):
+    enabled: bool = True
+    connections: int = Field(
+        default=10,
+        ge=0,
+        description="Pooled database connections opened before serving, up to pool_size.",
+    )
+    active_users: int = Field(
+        default=20,
+        ge=0,
+        description="Users with the most tasks whose hot reads are run on every connection.",
+    )
+    timeout: float = Field(default=10.0, gt=0, description="Serve cold after (seconds).")
+
+
+class _OpenApiConfig(BaseModel):
+    cache_path: Path | None = Field(
+        default=Path("openapi.json").resolve(),
+        description=(
+            "Prebuilt OpenAPI schema, reused while the application sources are unchanged. "
+            "Build it with 'python -m app.core.openapi'."
+        ),
+    )
 
 
 class _ApiPrefix(BaseModel):
@@ -94,12 +308,93 @@ class _ApiPrefix(BaseModel):
     v1: _ApiV1Prefix = _ApiV1Prefix()
 
 
+class _QueryMonitoringConfig(BaseModel):
+    enabled: bool = True
+    slow_threshold: float = Field(default=0.2, description="Log statements slower (seconds).")
+    n_plus_one_threshold: int = Field(
+        default=10,
+        description="Warn when a request runs the same statement more times.",
+    )
+
+
+class _SqlCommentConfig(BaseModel):
+    enabled: bool = Field(default=True, description="Append sqlcommenter tags to statements.")
+    request_id: bool = Field(
+        default=False,
+        description=(
+            "Tag statements with the request id. Every statement text becomes unique, "
+            "which defeats the prepared statement cache of the driver."
+        ),
+    )
+
+
+class _BulkheadConfig(BaseModel):
+    enabled: bool = True
+    quotas: dict[str, int] = Field(
+        default={"auth": 10, "read": 30, "write": 12, "admin": 8},
+        description=(
+            "Connections each route class may hold at once. Routes default to 'read' or "
+            "'write' by method. Keep the sum within pool_size + max_overflow."
+        ),
+    )
+    acquire_timeout: float = Field(default=5.0, description="Wait for a free slot (seconds).")
+    slow_wait: float = Field(default=0.1, description="Log slot waits longer (seconds).")
+    retry_after: int = 1
+
+
+class _RetryConfig(BaseModel):
+    enabled: bool = True
+    attempts: int = Field(default=2, ge=0, description="Retries of a read after a lost connection.")
+    backoff: float = Field(default=0.05, gt=0, description="First retry delay bound (seconds).")
+    max_backoff: float = Field(default=0.5, gt=0, description="Retry delay bound (seconds).")
+    budget_ratio: float = Field(default=0.1, ge=0, description="Retries earned per read.")
+    budget_per_second: float = Field(default=5.0, ge=0, description="Retries always allowed.")
+    budget_burst: int = Field(default=20, ge=1, description="Retries that may be spent at once.")
+
+
+class _StatementCacheConfig(BaseModel):
+    compiled_cache_size: int = Field(
+        default=500,
+        ge=0,
+        description="Compiled SQL constructs cached per engine, 0 compiles every statement.",
+    )
+    prepared_statement_cache_size: int = Field(
+        default=256,
+        ge=0,
+        description=(
+            "Prepared statements cached per asyncpg connection, 0 prepares every statement. "
+            "The route comments multiply the statement texts, size it to the hot set."
+        ),
+    )
+    pgbouncer: bool = Field(
+        default=False,
+        description=(
+            "PgBouncer transaction pooling: the prepared statements are neither cached nor "
+            "named after a counter, a server connection is not kept between transactions."
+        ),
+    )
+    metrics: bool = Field(default=True, description="Count the statement cache hits.")
+
+
 class _DatabaseConfig(BaseModel):
     url: PostgresDsn
     echo: bool = False
     echo_pool: bool = False
     pool_size: int = 50
     max_overflow: int = 10
+    pool_pre_ping: bool = Field(
+        default=False,
+        description="Test every connection on checkout, a round trip per checkout.",
+    )
+    pool_recycle: int = Field(
+        default=-1,
+        description="Replace the connections older than this (seconds), -1 keeps them.",
+    )
+    retries: _RetryConfig = _RetryConfig()
+    statements: _StatementCacheConfig = _StatementCacheConfig()
+    queries: _QueryMonitoringConfig = _QueryMonitoringConfig()
+    comments: _SqlCommentConfig = _SqlCommentConfig()
+    bulkheads: _BulkheadConfig = _BulkheadConfig()
 
     naming_convention: dict[str, str] = {
         "ix": "ix_%(column_0_label)s",
@@ -124,6 +419,18 @@ class _Settings(BaseSettings):
     logging: _LoggingConfig
 
     run: _RunConfig = _RunConfig()
+    rate_limit: _RateLimitConfig = _RateLimitConfig()
+    server_timing: _ServerTimingConfig = _ServerTimingConfig()
+    responses: _ResponseConfig = _ResponseConfig()
+    compression: _CompressionConfig = _CompressionConfig()
+    metrics: _MetricsConfig = _MetricsConfig()
+    request_id: _RequestIdConfig = _RequestIdConfig()
+    load_shedding: _LoadSheddingConfig = _LoadSheddingConfig()
+    deadlines: _DeadlineConfig = _DeadlineConfig()
+    openapi: _OpenApiConfig = _OpenApiConfig()
+    warmup: _WarmupConfig = _WarmupConfig()
+    health: _HealthConfig = _HealthConfig()
+    drain: _DrainConfig = _DrainConfig()
     api: _ApiPrefix = _ApiPrefix()
 
 
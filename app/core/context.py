@@ -0,0 +1,114 @@
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Final, final
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+_REQUEST_ID_PATTERN: Final[re.Pattern[str]] = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+
+@final
+class RequestContext:
+    """Identity of the request being processed."""
+
+    __slots__ = ("request_id", "scope")
+
+    def __init__(self, request_id: str, scope: Scope) -> None:
+        """
+        Initialize the request context.
+
+        Args:
+            request_id (str): request id
+            scope (Scope): connection scope, the route is set on it after routing
+
+        """
+        self.request_id = request_id
+        self.scope = scope
+
+    @property
+    def route(self) -> str | None:
+        """
+        Matched route path.
+
+        Returns:
+            str | None: route path, None before routing or for unmatched requests
+
+        """
+        route = self.scope.get("route")
+        return route.path if route is not None else None
+
+
+request_context: ContextVar[RequestContext | None] = ContextVar("request_context", default=None)
+
+
+def current_request_id() -> str | None:
+    """
+    Get the id of the request being processed.
+
+    Returns:
+        str | None: request id
+
+    """
+    context = request_context.get()
+    return context.request_id if context is not None else None
+
+
+@final
+class RequestIdMiddleware:
+    """Assign the request id, accept a well-formed incoming one, echo it in the response."""
+
+    __slots__ = ("app", "header")
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): next ASGI application
+
+        """
+        self.app = app
+        self.header = settings.request_id.header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Bind the request id to the request context.
+
+        Args:
+            scope (Scope): connection scope
+            receive (Receive): receive channel
+            send (Send): send channel
+
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self._incoming(scope) or uuid.uuid4().hex
+        token = request_context.set(RequestContext(request_id, scope))
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(settings.request_id.header, request_id)
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_context.reset(token)
+
+    def _incoming(self, scope: Scope) -> str | None:
+        if not settings.request_id.trust_incoming:
+            return None
+
+        for name, value in scope["headers"]:
+            if name == self.header:
+                request_id = value.decode("latin-1")
+                return request_id if _REQUEST_ID_PATTERN.fullmatch(request_id) else None
+
+        return None
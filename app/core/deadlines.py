@@ -0,0 +1,275 @@
+import asyncio
+import math
+from collections.abc import Callable
+from contextvars import ContextVar
+from typing import Any, Final, final
+
+import orjson
+from fastapi import Request, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import http_requests_cancelled_total
+
+DEADLINE_ATTR: Final[str] = "__deadline__"
+
+_TIMEOUT_BODY: Final[bytes] = orjson.dumps({"error": "Request deadline exceeded."})
+
+
+def deadline[Endpoint: Callable[..., Any]](seconds: float) -> Callable[[Endpoint], Endpoint]:
+    """
+    Set the default deadline of the endpoint, used when the client does not send one.
+
+    Args:
+        seconds (float): time budget of the request
+
+    Returns:
+        Callable[[Endpoint], Endpoint]: endpoint decorator
+
+    """
+
+    def decorator(endpoint: Endpoint) -> Endpoint:
+        setattr(endpoint, DEADLINE_ATTR, seconds)
+        return endpoint
+
+    return decorator
+
+
+@final
+class RequestDeadline:
+    """Time budget of the request, enforced by cancelling the request task."""
+
+    __slots__ = ("_timeout", "client_timeout", "started_at")
+
+    def __init__(self, started_at: float, client_timeout: float | None) -> None:
+        """
+        Initialize the request deadline.
+
+        Args:
+            started_at (float): event loop time of the request start
+            client_timeout (float | None): timeout sent by the client
+
+        """
+        self.started_at = started_at
+        self.client_timeout = client_timeout
+        self._timeout: asyncio.Timeout | None = None
+
+    @property
+    def at(self) -> float:
+        """
+        Event loop time of the deadline.
+
+        Returns:
+            float: absolute deadline
+
+        """
+        if self._timeout is not None and (when := self._timeout.when()) is not None:
+            return when
+        return self.started_at + (self.client_timeout or settings.deadlines.default)
+
+    def remaining(self) -> float:
+        """
+        Time left before the deadline.
+
+        Returns:
+            float: remaining seconds, negative once expired
+
+        """
+        return self.at - asyncio.get_running_loop().time()
+
+    def bind(self, timeout: asyncio.Timeout) -> None:
+        """
+        Attach the timeout cancelling the request.
+
+        Args:
+            timeout (asyncio.Timeout): request timeout
+
+        """
+        self._timeout = timeout
+
+    def apply_default(self, seconds: float) -> None:
+        """
+        Replace the global default budget with the route one, unless the client set it.
+
+        Args:
+            seconds (float): route time budget
+
+        """
+        if self.client_timeout is not None or self._timeout is None:
+            return
+
+        if not self._timeout.expired():
+            self._timeout.reschedule(self.started_at + min(seconds, settings.deadlines.max))
+
+
+request_deadline: ContextVar[RequestDeadline | None] = ContextVar(
+    "request_deadline",
+    default=None,
+)
+
+
+def remaining_time() -> float | None:
+    """
+    Time left before the deadline of the request being processed.
+
+    Returns:
+        float | None: remaining seconds, None outside of a request
+
+    """
+    current = request_deadline.get()
+    return current.remaining() if current is not None else None
+
+
+async def apply_route_deadline(request: Request) -> None:
+    """
+    Apply the default deadline of the matched route.
+
+    Args:
+        request (Request): request from the client
+
+    """
+    current = request_deadline.get()
+    seconds = getattr(request.scope["route"].endpoint, DEADLINE_ATTR, None)
+
+    if current is not None and seconds is not None:
+        current.apply_default(seconds)
+
+
+@final
+class _Exchange:
+    """Request channels watching for the client disconnect while the work is running."""
+
+    __slots__ = (
+        "_receive",
+        "_send",
+        "disconnected",
+        "messages",
+        "response_complete",
+        "response_started",
+        "task",
+    )
+
+    def __init__(self, receive: Receive, send: Send) -> None:
+        self._receive = receive
+        self._send = send
+        self.task = asyncio.current_task()
+        self.messages: asyncio.Queue[Message] = asyncio.Queue()
+        self.response_started = False
+        self.response_complete = False
+        self.disconnected = False
+
+    async def watch_disconnect(self) -> None:
+        # the application reads the request body from the queue filled here
+        while True:
+            message = await self._receive()
+            self.messages.put_nowait(message)
+
+            if message["type"] == "http.disconnect":
+                if not self.response_complete and self.task is not None:
+                    self.disconnected = True
+                    _ = self.task.cancel()
+                return
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.response_started = True
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            self.response_complete = True
+
+        await self._send(message)
+
+
+@final
+class DeadlineMiddleware:
+    """
+    Cancel the request work at its deadline or when the client disconnects.
+
+    The deadline is taken from the request timeout header, capped by the configured
+    maximum, or from the route and global defaults.
+    """
+
+    __slots__ = ("app", "header")
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): next ASGI application
+
+        """
+        self.app = app
+        self.header = settings.deadlines.header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Run the request within its deadline.
+
+        Args:
+            scope (Scope): connection scope
+            receive (Receive): receive channel
+            send (Send): send channel
+
+        Raises:
+            TimeoutError: timeout of the application, not the request deadline
+            CancelledError: the request task was cancelled by the server
+
+        """
+        if scope["type"] != "http" or not settings.deadlines.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        current = RequestDeadline(asyncio.get_running_loop().time(), self._client_timeout(scope))
+        token = request_deadline.set(current)
+        exchange = _Exchange(receive, send)
+        watcher = asyncio.create_task(exchange.watch_disconnect())
+
+        try:
+            async with asyncio.timeout_at(current.at) as timeout:
+                current.bind(timeout)
+                await self.app(scope, exchange.messages.get, exchange.send)
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+
+            http_requests_cancelled_total.labels("deadline").inc()
+
+            if not exchange.response_started:
+                await self._send_timeout(send)
+        except asyncio.CancelledError:
+            if not exchange.disconnected or exchange.task is None:
+                raise
+
+            # the client is gone, the work is dropped and nothing can be answered
+            _ = exchange.task.uncancel()
+            http_requests_cancelled_total.labels("disconnect").inc()
+        finally:
+            _ = watcher.cancel()
+            request_deadline.reset(token)
+
+    def _client_timeout(self, scope: Scope) -> float | None:
+        for name, value in scope["headers"]:
+            if name == self.header:
+                try:
+                    seconds = float(value)
+                except ValueError:
+                    return None
+
+                if not math.isfinite(seconds) or seconds <= 0:
+                    return None
+
+                return min(seconds, settings.deadlines.max)
+
+        return None
+
+    @staticmethod
+    async def _send_timeout(send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_504_GATEWAY_TIMEOUT,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_TIMEOUT_BODY)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _TIMEOUT_BODY})
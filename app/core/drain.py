@@ -0,0 +1,168 @@
+import asyncio
+import time
+from typing import Final, final
+
+import orjson
+from fastapi import status
+from loguru import logger
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.warmup import readiness
+
+_DRAIN_BODY: Final[bytes] = orjson.dumps({"error": "Service is shutting down."})
+
+
+@final
+class Drain:
+    """
+    Shutdown phase of the worker.
+
+    Readiness fails as soon as the drain starts, the worker keeps serving during the
+    grace period while the load balancers stop routing to it, then refuses the late
+    requests and lets the in-flight ones complete.
+    """
+
+    __slots__ = ("_announced", "_idle", "_started_at", "in_flight")
+
+    def __init__(self) -> None:
+        """Initialize the drain state."""
+        self._started_at: float | None = None
+        self._announced = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.in_flight = 0
+
+    def request(self) -> None:
+        """
+        Start the grace period from a signal handler.
+
+        Only the time is recorded: the readiness gauge and the logger take locks the
+        interrupted code may hold, announce() reports the drain from the event loop.
+        """
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+
+    def announce(self) -> None:
+        """Fail the readiness and log the requested drain, once."""
+        if self._started_at is None or self._announced:
+            return
+
+        self._announced = True
+        readiness.set(ready=False)
+        logger.info(
+            "Draining, new requests are refused in {grace} s.",
+            grace=settings.drain.grace,
+        )
+
+    def start(self) -> None:
+        """Fail the readiness and start the grace period."""
+        self.request()
+        self.announce()
+
+    @property
+    def draining(self) -> bool:
+        """
+        Whether the shutdown has started.
+
+        Returns:
+            bool: True once the drain started
+
+        """
+        return self._started_at is not None
+
+    @property
+    def refusing(self) -> bool:
+        """
+        Whether the grace period is over.
+
+        Returns:
+            bool: True when new requests are refused
+
+        """
+        return (
+            self._started_at is not None
+            and time.monotonic() - self._started_at >= settings.drain.grace
+        )
+
+    def enter(self) -> None:
+        """Account a request being processed."""
+        self.in_flight += 1
+        self._idle.clear()
+
+    def leave(self) -> None:
+        """Account a processed request."""
+        self.in_flight -= 1
+
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def wait_idle(self) -> None:
+        """Wait for the in-flight requests to complete, up to the drain timeout."""
+        try:
+            async with asyncio.timeout(settings.drain.timeout):
+                _ = await self._idle.wait()
+        except TimeoutError:
+            logger.warning(
+                "{count} requests still in flight after the drain timeout.",
+                count=self.in_flight,
+            )
+
+
+drain = Drain()
+
+
+@final
+class DrainMiddleware:
+    """Count the in-flight requests, refuse the new ones once the grace period is over."""
+
+    __slots__ = ("app",)
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): next ASGI application
+
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Refuse the request while draining or process it.
+
+        Args:
+            scope (Scope): connection scope
+            receive (Receive): receive channel
+            send (Send): send channel
+
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if drain.refusing:
+            await self._refuse(send)
+            return
+
+        drain.enter()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            drain.leave()
+
+    @staticmethod
+    async def _refuse(send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_DRAIN_BODY)).encode()),
+                (b"retry-after", str(settings.drain.retry_after).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _DRAIN_BODY})
@@ -1,31 +1,70 @@
+from typing import TYPE_CHECKING, Any, Final
+
+import orjson
 from fastapi import HTTPException, Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse, Response
 from loguru import logger
-from sqlalchemy.exc import SQLAlchemyError
-
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+
+from app.core.exceptions import (
+    InvalidTokenError,
+    InvalidTokenTypeError,
+    ResourceOwnershipError,
+    TokenExpiredError,
+    TooManyRequestsError,
+    UserPermissionError,
+    WrondMethodError,
+)
+from app.core.loggers import redact_headers
 from app.schemas import ProblemDetails, get_custom_errors, get_full_url_data
 
+if TYPE_CHECKING:
+    from loguru import Logger
+
 _JSON_500_RESPONSE = JSONResponse(
     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
     content={"error": "Internal server error.", "message": "Please try again later."},
 )
+_JSON_504_RESPONSE = JSONResponse(
+    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+    content={"error": "Request deadline exceeded."},
+)
+_QUERY_CANCELED: Final[str] = "57014"
+
+# the most frequent errors carry a fixed detail, their bodies are encoded once
+_STATIC_ERROR_BODIES: Final[dict[str, bytes]] = {
+    error.detail: orjson.dumps({"error": error.detail})
+    for error in (
+        TokenExpiredError(),
+        InvalidTokenError(),
+        InvalidTokenTypeError(),
+        UserPermissionError(),
+        ResourceOwnershipError(),
+        WrondMethodError(),
+        TooManyRequestsError(0),
+    )
+}
 
 
-def validation_exception_handler(request: Request, exc: Exception) -> Response:
-    method = request.method
-    path = str(request.url)
-    client = request.client
-    client_ip = client.host if client is not None else "unknown"
+def _encode_error(detail: Any) -> bytes:  # noqa: ANN401
+    if isinstance(detail, str) and (body := _STATIC_ERROR_BODIES.get(detail)) is not None:
+        return body
+    return orjson.dumps({"error": detail}, default=jsonable_encoder)
 
-    logger_validation_exc = logger.bind(
-        path=path,
-        method=method,
-        client_ip=client_ip,
-        headers=request.headers,
+
+def _request_logger(request: Request, **extra: Any) -> "Logger":  # noqa: ANN401
+    client = request.client
+    return logger.bind(
+        path=request.url.path,
+        method=request.method,
+        client_ip=client.host if client is not None else "unknown",
+        **extra,
     )
 
+
+def validation_exception_handler(request: Request, exc: Exception) -> Response:
     if isinstance(exc, RequestValidationError):
         problem_details = ProblemDetails(
             title="Validation Error",
@@ -34,60 +73,39 @@ def validation_exception_handler(request: Request, exc: Exception) -> Response:
             instance=get_full_url_data(request, exc),
             errors=get_custom_errors(exc),
         )
-        logger_validation_exc.bind(type="validation_exception").warning(
+        body = problem_details.model_dump_json()
+        _request_logger(request, type="validation_exception").warning(
             "RequestValidationError: {exc_msg};\nRequest: {method} {path}",
-            exc_msg=problem_details.model_dump_json(),
-            method=method,
-            path=path,
+            exc_msg=body,
+            method=request.method,
+            path=request.url.path,
         )
-        return JSONResponse(
+        return Response(
+            content=body.encode(),
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            content=jsonable_encoder(problem_details),
-            headers={"Content-Type": "application/problem+json"},
+            media_type="application/problem+json",
         )
 
-    logger_validation_exc.bind(type="unexpected_exception").error(
-        "UnexpectedException: {exc_msg};\nRequest: {method} {path}",
-        exc_msg=repr(exc),
-        method=method,
-        path=path,
-    )
-    return _JSON_500_RESPONSE
+    return _unexpected_exception(request, exc)
 
 
 def http_exception_handler(request: Request, exc: Exception) -> Response:
-    method = request.method
-    path = str(request.url)
-    client = request.client
-    client_ip = client.host if client is not None else "unknown"
-
-    logger_fastapi_exc = logger.bind(
-        path=path,
-        method=method,
-        client_ip=client_ip,
-        headers=request.headers,
-    )
-
     if isinstance(exc, HTTPException):
-        logger_fastapi_exc.bind(type="http_exception", status_code=exc.status_code).warning(
+        _request_logger(request, type="http_exception", status_code=exc.status_code).warning(
             "HTTPException {status_code}: {exc_msg};\nRequest: {method} {path}",
             status_code=exc.status_code,
             exc_msg=exc.detail,
-            method=method,
-            path=path,
+            method=request.method,
+            path=request.url.path,
         )
-        return JSONResponse(
+        return Response(
+            content=_encode_error(exc.detail),
             status_code=exc.status_code,
-            content=jsonable_encoder({"error": exc.detail}),
+            headers=exc.headers,
+            media_type="application/json",
         )
 
-    logger_fastapi_exc.bind(type="unexpected_exception").error(
-        "UnexpectedException: {exc_msg};\nRequest: {method} {path}",
-        exc_msg=repr(exc),
-        method=method,
-        path=path,
-    )
-    return _JSON_500_RESPONSE
+    return _unexpected_exception(request, exc)
 
 
 def database_exception_handler(request: Request, exc: Exception) -> Response:
@@ -100,9 +118,17 @@ def database_exception_handler(request: Request, exc: Exception) -> Response:
         path=path,
         method=method,
         client_ip=client_ip,
-        headers=request.headers,
+        headers=redact_headers(request.headers.raw),
     )
 
+    if isinstance(exc, DBAPIError) and getattr(exc.orig, "sqlstate", None) == _QUERY_CANCELED:
+        logger_db_exc.bind(type="sqlalchemy_exception").warning(
+            "Statement cancelled at the request deadline;\nRequest: {method} {path}",
+            method=method,
+            path=path,
+        )
+        return _JSON_504_RESPONSE
+
     if isinstance(exc, SQLAlchemyError):
         logger_db_exc.bind(type="sqlalchemy_exception").error(
             "SQLAlchemyException: {exc_msg};\nRequest: {method} {path}",
@@ -112,16 +138,15 @@ def database_exception_handler(request: Request, exc: Exception) -> Response:
         )
         return _JSON_500_RESPONSE
 
-    logger_db_exc.bind(type="unexpected_exception").error(
-        "UnexpectedException: {exc_msg};\nRequest: {method} {path}",
-        exc_msg=repr(exc),
-        method=method,
-        path=path,
-    )
-    return _JSON_500_RESPONSE
+    return _unexpected_exception(request, exc)
 
 
 def global_exception_handler(request: Request, exc: Exception) -> Response:
+    return _unexpected_exception(request, exc)
+
+
+def _unexpected_exception(request: Request, exc: Exception) -> Response:
+    # unexpected errors are rare, they keep the full URL and headers for diagnosis
     method = request.method
     path = str(request.url)
     client = request.client
@@ -132,7 +157,7 @@ def global_exception_handler(request: Request, exc: Exception) -> Response:
         path=path,
         method=method,
         client_ip=client_ip,
-        headers=request.headers,
+        headers=redact_headers(request.headers.raw),
     ).error(
         "UnexpectedException: {exc_msg};\nRequest: {method} {path}",
         exc_msg=repr(exc),
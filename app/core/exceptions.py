@@ -62,6 +62,24 @@ class WrondMethodError(HTTPException):
         super().__init__(status.HTTP_405_METHOD_NOT_ALLOWED)
 
 
+class TooManyRequestsError(HTTPException):
+    def __init__(self, retry_after: int, headers: dict[str, str] | None = None) -> None:
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests.",
+            headers={**(headers or {}), "Retry-After": str(retry_after)},
+        )
+
+
+class ServiceUnavailableError(HTTPException):
+    def __init__(self, retry_after: int, detail: str = "Service is overloaded.") -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 class QueryValueError(RequestValidationError, AttributeError):
     def __init__(self, query_value: str, query_key: str) -> None:
         super().__init__([
@@ -0,0 +1,232 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Final, Literal, final
+
+import orjson
+from fastapi import status
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+import app.core.exceptions as exc
+from app.core.config import settings
+from app.core.load_shedding import LoadSheddingMiddleware
+from app.core.warmup import readiness
+from app.database import SqlAlchemyDB
+
+type CHECK_STATUS = Literal["ok", "saturated", "fail"]
+
+_LIVE_BODY: Final[bytes] = orjson.dumps({"status": "ok"})
+_OPTIONAL_CHECKS: Final[frozenset[str]] = frozenset({"redis"})
+
+
+@final
+class HealthCheck:
+    """
+    Readiness of the worker and of its dependencies.
+
+    The dependency checks run at most once per TTL whatever the probe rate, concurrent
+    probes wait for the same run. The worker readiness itself is read on every probe,
+    so that a draining worker is reported at once.
+    """
+
+    __slots__ = ("_checked_at", "_db", "_load", "_redis", "_report", "_running")
+
+    def __init__(self) -> None:
+        """Initialize the health check."""
+        self._db: SqlAlchemyDB | None = None
+        self._redis: Redis | None = None
+        self._load: LoadSheddingMiddleware | None = None
+        self._report: dict[str, CHECK_STATUS] = {}
+        self._checked_at = float("-inf")
+        self._running: asyncio.Task[dict[str, CHECK_STATUS]] | None = None
+
+    def init(self, db: SqlAlchemyDB, redis_connection: Redis) -> None:
+        """
+        Attach the checked dependencies.
+
+        Args:
+            db (SqlAlchemyDB): database helper
+            redis_connection (Redis): redis client
+
+        """
+        self._db = db
+        self._redis = redis_connection
+
+    def watch_load(self, load: LoadSheddingMiddleware | None) -> None:
+        """
+        Attach the admission queue of the worker.
+
+        Args:
+            load (LoadSheddingMiddleware | None): load shedding middleware
+
+        """
+        self._load = load
+
+    async def readiness(self) -> tuple[int, bytes]:
+        """
+        Build the readiness report.
+
+        Returns:
+            tuple[int, bytes]: status code and JSON body
+
+        """
+        checks: dict[str, CHECK_STATUS] = {"warmup": "ok" if readiness.ready else "fail"}
+        checks |= await self._dependencies()
+        checks["queue"] = self._check_queue()
+
+        failed = [name for name, result in checks.items() if result == "fail"]
+        ready = all(name in _OPTIONAL_CHECKS for name in failed)
+        overall = "fail" if not ready else "degraded" if failed else "ok"
+        code = status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+        return code, orjson.dumps({"status": overall, "checks": checks})
+
+    async def _dependencies(self) -> dict[str, CHECK_STATUS]:
+        if time.monotonic() - self._checked_at < settings.health.ttl:
+            return self._report
+
+        if self._running is None:
+            self._running = asyncio.create_task(self._check_dependencies())
+
+        running = self._running
+
+        try:
+            # shielded, a probe giving up must not cancel the run the others wait for
+            self._report = await asyncio.shield(running)
+        finally:
+            if self._running is running and running.done():
+                self._running = None
+                self._checked_at = time.monotonic()
+
+        return self._report
+
+    async def _check_dependencies(self) -> dict[str, CHECK_STATUS]:
+        database, redis = await asyncio.gather(
+            self._check(self._check_database),
+            self._check(self._check_redis),
+        )
+        return {"database": database, "redis": redis}
+
+    @staticmethod
+    async def _check(check: Callable[[], Awaitable[CHECK_STATUS]]) -> CHECK_STATUS:
+        try:
+            async with asyncio.timeout(settings.health.timeout):
+                return await check()
+        except (
+            TimeoutError,
+            OSError,
+            RedisError,
+            SQLAlchemyError,
+            exc.DatabaseSessionError,
+        ) as error:
+            logger.bind(type="health").warning(
+                "Health check {check} failed: {error!r}",
+                check=check.__name__,
+                error=error,
+            )
+            return "fail"
+
+    async def _check_database(self) -> CHECK_STATUS:
+        if self._db is None:
+            return "fail"
+
+        # the connections in use prove the database reachable, a ping would queue
+        if self._db.saturated:
+            return "saturated"
+
+        await self._db.ping()
+        return "ok"
+
+    async def _check_redis(self) -> CHECK_STATUS:
+        if self._redis is None:
+            return "fail"
+
+        _ = await self._redis.ping()  # type: ignore[reportUnknownMemberType]
+        return "ok"
+
+    def _check_queue(self) -> CHECK_STATUS:
+        if self._load is None or not settings.load_shedding.enabled:
+            return "ok"
+
+        if self._load.in_flight >= self._load.limiter.limit * settings.health.max_queue_share:
+            return "fail"
+
+        return "ok"
+
+
+health = HealthCheck()
+
+
+@final
+class HealthMiddleware:
+    """
+    Answer the liveness and readiness probes ahead of every other middleware.
+
+    The probes are neither logged, measured, shed nor rate limited.
+    """
+
+    __slots__ = ("_load_found", "app")
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): next ASGI application
+
+        """
+        self.app = app
+        self._load_found = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Answer the probe paths, pass the other requests through.
+
+        Args:
+            scope (Scope): connection scope
+            receive (Receive): receive channel
+            send (Send): send channel
+
+        """
+        if scope["type"] != "http" or scope["method"] not in {"GET", "HEAD"}:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+
+        if path == settings.health.liveness_path:
+            await self._respond(send, status.HTTP_200_OK, _LIVE_BODY)
+        elif path == settings.health.readiness_path:
+            self._find_load()
+            await self._respond(send, *await health.readiness())
+        else:
+            await self.app(scope, receive, send)
+
+    def _find_load(self) -> None:
+        if self._load_found:
+            return
+
+        # the middleware stack is built on the first request, the queue lives inside it
+        app: object = self.app
+
+        while app is not None and not isinstance(app, LoadSheddingMiddleware):
+            app = getattr(app, "app", None)
+
+        health.watch_load(app)
+        self._load_found = True
+
+    @staticmethod
+    async def _respond(send: Send, status_code: int, body: bytes) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"cache-control", b"no-store"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
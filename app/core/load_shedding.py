@@ -0,0 +1,190 @@
+import math
+import time
+from typing import Final, Literal, final
+
+import orjson
+from fastapi import status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import concurrency_limit, http_requests_shed_total
+
+type PRIORITY = Literal["critical", "normal", "bulk"]
+
+_SHED_BODY: Final[bytes] = orjson.dumps({"error": "Service is overloaded."})
+
+
+@final
+class GradientLimiter:
+    """
+    Adaptive concurrency limit following the latency gradient.
+
+    The average latency of a short window is compared to its long-term moving average.
+    While they match, the limit grows by a queue allowance of sqrt(limit). When the
+    short-term latency rises, requests are queueing somewhere downstream and the limit
+    shrinks in proportion.
+    """
+
+    __slots__ = (
+        "_long_latency",
+        "_max_in_flight",
+        "_window_count",
+        "_window_end",
+        "_window_sum",
+        "limit",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the limiter with the configured initial limit."""
+        self.limit = float(settings.load_shedding.initial_limit)
+        self._long_latency = 0.0
+        self._window_sum = 0.0
+        self._window_count = 0
+        self._window_end = 0.0
+        self._max_in_flight = 0
+
+    def sample(self, latency: float, in_flight: int) -> None:
+        """
+        Account the latency of a completed request, update the limit once per window.
+
+        Args:
+            latency (float): request latency in seconds
+            in_flight (int): requests in flight when the request started
+
+        """
+        self._window_sum += latency
+        self._window_count += 1
+        self._max_in_flight = max(self._max_in_flight, in_flight)
+        now = time.monotonic()
+
+        if self._window_count < settings.load_shedding.window_size and now < self._window_end:
+            return
+
+        self._update(self._window_sum / self._window_count)
+        self._window_sum = 0.0
+        self._window_count = 0
+        self._max_in_flight = 0
+        self._window_end = now + settings.load_shedding.window_time
+
+    def _update(self, short_latency: float) -> None:
+        config = settings.load_shedding
+
+        if self._long_latency <= 0:
+            self._long_latency = short_latency
+            return
+
+        self._long_latency += (short_latency - self._long_latency) / config.long_window
+
+        # the baseline must recover after a long period of high latency
+        if self._long_latency / short_latency > 2:  # noqa: PLR2004
+            self._long_latency *= 0.95
+
+        # an idle server must not inflate the limit it has never used
+        if self._max_in_flight < self.limit / 2:
+            return
+
+        gradient = max(0.5, min(1.0, config.tolerance * self._long_latency / short_latency))
+        new_limit = self.limit * gradient + math.sqrt(self.limit)
+        new_limit = self.limit * (1 - config.smoothing) + new_limit * config.smoothing
+        self.limit = max(config.min_limit, min(config.max_limit, new_limit))
+        concurrency_limit.set(self.limit)
+
+
+def _priority_paths() -> tuple[list[str], list[str]]:
+    config = settings.load_shedding
+    v1 = settings.api.v1
+    # built as the routers build their prefixes, so that they follow the api settings
+    prefix = f"{settings.api.prefix}{v1.prefix}"
+    critical = config.critical_paths
+    bulk = config.bulk_paths
+
+    if critical is None:
+        critical = [f"{prefix}{v1.auth}", settings.metrics.path]
+    if bulk is None:
+        bulk = [f"{prefix}{v1.users}/all", f"{prefix}{v1.tasks}/all"]
+
+    return critical, bulk
+
+
+@final
+class LoadSheddingMiddleware:
+    """
+    Reject the requests over the adaptive concurrency limit before any work is done.
+
+    Every priority may use its share of the limit, so that bulk requests are shed first
+    and critical ones last.
+    """
+
+    __slots__ = ("_prefixes", "app", "in_flight", "limiter")
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): next ASGI application
+
+        """
+        self.app = app
+        self.limiter = GradientLimiter()
+        self.in_flight = 0
+        critical, bulk = _priority_paths()
+        self._prefixes: list[tuple[str, PRIORITY]] = sorted(
+            [
+                *((path, "critical") for path in critical),
+                *((path, "bulk") for path in bulk),
+            ],
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        concurrency_limit.set(self.limiter.limit)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Admit or shed the request, measure the admitted ones.
+
+        Args:
+            scope (Scope): connection scope
+            receive (Receive): receive channel
+            send (Send): send channel
+
+        """
+        if scope["type"] != "http" or not settings.load_shedding.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        priority = self._priority(scope["path"])
+        in_flight = self.in_flight
+
+        if in_flight >= self.limiter.limit * settings.load_shedding.priority_shares[priority]:
+            http_requests_shed_total.labels(priority).inc()
+            await self._shed(send)
+            return
+
+        self.in_flight += 1
+        start = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            self.limiter.sample(time.perf_counter() - start, in_flight + 1)
+
+    def _priority(self, path: str) -> PRIORITY:
+        for prefix, priority in self._prefixes:
+            if path.startswith(prefix):
+                return priority
+        return "normal"
+
+    @staticmethod
+    async def _shed(send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_SHED_BODY)).encode()),
+                (b"retry-after", str(settings.load_shedding.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _SHED_BODY})
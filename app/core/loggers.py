@@ -1,14 +1,406 @@
+import copy
+import queue
+import random
 import sys
+import threading
+import traceback
+from collections.abc import Callable, Iterable, Mapping
+from typing import TYPE_CHECKING, Any, Final, final
 
+import orjson
+from fastapi import status
 from loguru import logger
 
 from app.core.config import settings
+from app.core.context import current_request_id
+
+if TYPE_CHECKING:
+    from loguru import Logger, Message, Record
+
+type ENCODER = Callable[[Message], str]
+type WRITER = Callable[[str], None]
+
+_STOP: Final[object] = object()
+_TEXT_FORMAT: Final[str] = (
+    "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+)
+_JSON_OPTIONS: Final[int] = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+_REDACTED: Final[str] = "[REDACTED]"
+
+
+def _json_default(obj: Any) -> Any:  # noqa: ANN401
+    if isinstance(obj, Mapping):
+        return dict(obj)  # type: ignore[reportUnknownArgumentType]
+    return str(obj)
+
+
+def serialize_record(message: "Message") -> str:
+    record = message.record
+    exception = record["exception"]
+    return orjson.dumps(
+        {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "message": record["message"],
+            "name": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+            "process": record["process"].id,
+            "thread": record["thread"].id,
+            "extra": record["extra"],
+            "exception": None
+            if exception is None
+            else {
+                "type": None if exception.type is None else exception.type.__name__,
+                "value": str(exception.value),
+                "traceback": "".join(
+                    traceback.format_exception(exception.type, exception.value, exception.traceback)
+                ),
+            },
+        },
+        default=_json_default,
+        option=_JSON_OPTIONS,
+    ).decode()
+
+
+def _write_stdout(text: str) -> None:
+    _ = sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+@final
+class LogPipeline:
+    """
+    Non-blocking log pipeline.
+
+    Loguru handlers only put formatted messages into a bounded queue. A background
+    thread drains the queue in batches, serializes and writes them to the sinks.
+    """
+
+    __slots__ = (
+        "_dropped_lock",
+        "_file_logger",
+        "_handler_ids",
+        "_queue",
+        "_thread",
+        "_writers",
+        "dropped",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the log pipeline."""
+        self._queue: queue.Queue[tuple[str, Message] | object] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._file_logger: Logger | None = None
+        self._writers: dict[str, tuple[ENCODER, WRITER]] = {}
+        self._handler_ids: list[int] = []
+        self._dropped_lock = threading.Lock()
+        self.dropped = 0
+
+    def start(self) -> None:
+        """Start the background writer thread."""
+        self._queue = queue.Queue(maxsize=settings.logging.queue_size)
+        self._file_logger = copy.deepcopy(logger)
+        self._file_logger.remove()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detach the handlers, flush the queued records and close the sinks."""
+        if self._thread is None:
+            return
+
+        if self.dropped:
+            logger.warning("{dropped} log records were dropped.", dropped=self.dropped)
+
+        for handler_id in self._handler_ids:
+            logger.remove(handler_id)
+
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        self._handler_ids.clear()
+        self._writers.clear()
+
+        if self._file_logger is not None:
+            self._file_logger.remove()
+            self._file_logger = None
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Wait for the records queued so far to be written.
+
+        Args:
+            timeout (float | None, optional): wait limit in seconds. Defaults to None.
+
+        Returns:
+            bool: the records were written in time
+
+        """
+        if self._thread is None:
+            return True
+
+        flushed = threading.Event()
+
+        try:
+            self._queue.put(flushed, timeout=timeout)
+        except queue.Full:
+            return False
+
+        return flushed.wait(timeout)
+
+    def add_stream(self, target: str, write: WRITER, **options: Any) -> None:  # noqa: ANN401
+        """
+        Add a handler writing formatted messages with the given function.
+
+        Args:
+            target (str): sink name
+            write (WRITER): function writing a batch of messages
+            options (Any): loguru handler options
+
+        """
+        self._add(target, str, write, options)
+
+    def add_file(
+        self,
+        target: str,
+        path: str,
+        encode: ENCODER = str,
+        **options: Any,  # noqa: ANN401
+    ) -> None:
+        """
+        Add a handler writing messages to a rotated file.
+
+        Args:
+            target (str): sink name
+            path (str): file path template
+            encode (ENCODER, optional): message serializer. Defaults to str.
+            options (Any): loguru handler options, file options are applied to the file
+
+        Raises:
+            RuntimeError: pipeline is not started
+
+        """
+        if self._file_logger is None:
+            exc_msg = "Log pipeline has not been started."
+            raise RuntimeError(exc_msg)
+
+        file_options = {
+            key: options.pop(key) for key in ("rotation", "retention", "compression", "encoding")
+        }
+        _ = self._file_logger.add(
+            sink=path,
+            level=0,
+            format="{message}",
+            filter=lambda record: record["extra"].get("target") == target,
+            **file_options,
+        )
+        file_logger = self._file_logger.bind(target=target).opt(raw=True)
+        self._add(target, encode, file_logger.info, options)
+
+    def _add(
+        self,
+        target: str,
+        encode: ENCODER,
+        write: WRITER,
+        options: dict[str, Any],
+    ) -> None:
+        self._writers[target] = (encode, write)
+        self._handler_ids.append(
+            logger.add(sink=lambda message: self._put(target, message), **options)
+        )
+
+    def _put(self, target: str, message: "Message") -> None:
+        try:
+            if settings.logging.overflow == "block":
+                self._queue.put((target, message), timeout=settings.logging.block_timeout)
+            else:
+                self._queue.put_nowait((target, message))
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        batch_size = settings.logging.batch_size
+
+        while True:
+            batch = [self._queue.get()]
+
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if not self._write(batch):
+                return
+
+    def _write(self, batch: list[tuple[str, "Message"] | object]) -> bool:
+        """
+        Write a batch of messages grouped by sink.
+
+        Args:
+            batch (list[tuple[str, Message] | object]): queued messages
+
+        Returns:
+            bool: the pipeline keeps running
+
+        """
+        chunks: dict[str, list[str]] = {}
+        flushed: list[threading.Event] = []
+        running = True
+
+        for item in batch:
+            if item is _STOP:
+                running = False
+                break
+
+            if isinstance(item, threading.Event):
+                flushed.append(item)
+                continue
+
+            target, message = item  # type: ignore[reportGeneralTypeIssues]
+            encode, _ = self._writers[target]
+            chunks.setdefault(target, []).append(encode(message))
+
+        for target, texts in chunks.items():
+            _, write = self._writers[target]
+
+            try:
+                write("".join(texts))
+            except Exception as e:  # noqa: BLE001
+                _ = sys.stderr.write(f"Log sink '{target}' failed: {e!r}\n")
+
+        for event in flushed:
+            event.set()
+
+        return running
+
+
+log_pipeline = LogPipeline()
+
+
+@final
+class HeaderRedactor:
+    """Keep only allowlisted headers and mask the sensitive ones before binding."""
+
+    __slots__ = ("_allowed", "_redacted")
+
+    def __init__(self, allowed: Iterable[str], redacted: Iterable[str]) -> None:
+        """
+        Precompile the header allowlist.
+
+        Args:
+            allowed (Iterable[str]): header names logged as is
+            redacted (Iterable[str]): header names logged with a masked value
+
+        """
+        self._allowed = frozenset(name.lower().encode("latin-1") for name in allowed)
+        self._redacted = frozenset(name.lower().encode("latin-1") for name in redacted)
+
+    def __call__(self, raw_headers: Iterable[tuple[bytes, bytes]]) -> dict[str, str]:
+        """
+        Filter the raw ASGI headers.
+
+        Args:
+            raw_headers (Iterable[tuple[bytes, bytes]]): lowercase raw headers
+
+        Returns:
+            dict[str, str]: headers safe to log
+
+        """
+        headers: dict[str, str] = {}
+
+        for name, value in raw_headers:
+            if name in self._allowed:
+                headers[name.decode("latin-1")] = value.decode("latin-1")
+            elif name in self._redacted:
+                headers[name.decode("latin-1")] = _REDACTED
+
+        return headers
+
+
+@final
+class RequestLogSampler:
+    """Decide whether a request is logged: sample successes, keep errors and slow requests."""
+
+    __slots__ = ("_default", "_routes", "_slow_threshold_ns", "_status_classes")
+
+    def __init__(
+        self,
+        default: float,
+        status_classes: Mapping[str, float],
+        routes: Mapping[str, float],
+        slow_threshold: float,
+    ) -> None:
+        """
+        Initialize the sampler.
+
+        Args:
+            default (float): default sampling rate
+            status_classes (Mapping[str, float]): sampling rate per status class ('2xx'),
+                the client and server errors are always logged
+            routes (Mapping[str, float]): sampling rate per route path
+            slow_threshold (float): requests slower than this (seconds) are always logged
+
+        """
+        self._default = default
+        self._status_classes = {int(key[0]): rate for key, rate in status_classes.items()}
+        self._routes = dict(routes)
+        self._slow_threshold_ns = int(slow_threshold * 1e9)
+
+    def __call__(self, route_path: str | None, status_code: int, process_time_ns: int) -> bool:
+        """
+        Make the sampling decision.
+
+        Args:
+            route_path (str | None): matched route path
+            status_code (int): response status code
+            process_time_ns (int): request processing time in nanoseconds
+
+        Returns:
+            bool: the request must be logged
+
+        """
+        if status_code >= status.HTTP_400_BAD_REQUEST or process_time_ns >= self._slow_threshold_ns:
+            return True
+
+        rate = self._routes.get(route_path, -1.0) if route_path is not None else -1.0
+
+        if rate < 0:
+            rate = self._status_classes.get(status_code // 100, self._default)
+
+        return rate >= 1 or random.random() < rate  # noqa: S311
+
+
+redact_headers = HeaderRedactor(
+    settings.logging.requests.header_allowlist,
+    settings.logging.requests.redacted_headers,
+)
+sample_request_log = RequestLogSampler(
+    settings.logging.requests.sample_rate,
+    settings.logging.requests.status_sample_rates,
+    settings.logging.requests.route_sample_rates,
+    settings.logging.requests.slow_threshold,
+)
+
+
+def _bind_request_id(record: "Record") -> None:
+    if (request_id := current_request_id()) is not None:
+        record["extra"]["request_id"] = request_id
 
 
 def setup_logger() -> None:
+    # the default handler is kept until here, so that importing the settings has no side effects
+    logger.remove()
+    settings.logging.path_folder.mkdir(exist_ok=True, parents=True)
+    logger.configure(patcher=_bind_request_id)
+    log_pipeline.start()
+
     if settings.logging.stream.enabled:
-        _ = logger.add(
-            sink=sys.stdout,
+        log_pipeline.add_stream(
+            "stream",
+            _write_stdout,
             level=settings.logging.stream.level,
             format=(
                 "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
@@ -20,12 +412,11 @@ def setup_logger() -> None:
         )
 
     if settings.logging.common_file.enabled:
-        _ = logger.add(
-            sink=settings.logging.common_file.path,
+        log_pipeline.add_file(
+            "common_file",
+            settings.logging.common_file.path,
             level=settings.logging.common_file.level,
-            format=(
-                "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
-            ),
+            format=_TEXT_FORMAT,
             rotation=settings.logging.common_file.rotation,
             retention=settings.logging.common_file.retention,
             compression="zip",
@@ -33,30 +424,35 @@ def setup_logger() -> None:
         )
 
     if settings.logging.error_file.enabled:
-        _ = logger.add(
-            sink=settings.logging.error_file.path,
+        log_pipeline.add_file(
+            "error_file",
+            settings.logging.error_file.path,
             level=settings.logging.error_file.level,
-            format=(
-                "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
-            ),
+            format=_TEXT_FORMAT,
             rotation=settings.logging.error_file.rotation,
             retention=settings.logging.error_file.retention,
             compression="zip",
             encoding="utf-8",
             backtrace=True,
-            diagnose=True,
+            diagnose=settings.logging.error_file.diagnose,
         )
 
     if settings.logging.json_file.enabled:
-        _ = logger.add(
-            sink=settings.logging.json_file.path,
+        log_pipeline.add_file(
+            "json_file",
+            settings.logging.json_file.path,
+            encode=serialize_record,
             level=settings.logging.json_file.level,
-            format="{message}",
+            # a callable format skips the traceback rendering, the record is serialized later
+            format=lambda _: "{message}\n",
             rotation=settings.logging.json_file.rotation,
             retention=settings.logging.json_file.retention,
             compression="zip",
             encoding="utf-8",
-            serialize=True,
         )
 
     logger.info("Logging setup completed successfully.")
+
+
+def shutdown_logger() -> None:
+    log_pipeline.stop()
@@ -0,0 +1,782 @@
+import bisect
+import contextlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import IO, Any, Final, Literal, final
+
+from app.core.config import settings
+
+type METRIC_TYPE = Literal["counter", "gauge", "histogram"]
+type STORE_KIND = Literal["live", "total"]
+
+CONTENT_TYPE: Final[str] = "text/plain; version=0.0.4; charset=utf-8"
+
+# File layout: used bytes (uint64), then entries of
+# key length (uint32), utf-8 key padded to 8 bytes alignment, value (float64).
+_USED: Final[struct.Struct] = struct.Struct("<Q")
+_KEY_LENGTH: Final[struct.Struct] = struct.Struct("<I")
+_VALUE: Final[struct.Struct] = struct.Struct("<d")
+_INITIAL_SIZE: Final[int] = 64 * 1024
+_SEPARATOR: Final[str] = "\x1f"
+
+
+@final
+class MmapStore:
+    """
+    Append-only file of float64 samples owned by one process.
+
+    The keys are allocated once, the values are then updated in place in the shared
+    memory mapping, so that recording a sample does not touch the file system.
+    """
+
+    __slots__ = ("_file", "_mmap", "_offsets", "_used", "path")
+
+    def __init__(self, path: Path) -> None:
+        """
+        Create the store file, an existing file of a recycled pid is truncated.
+
+        Args:
+            path (Path): store file path
+
+        """
+        self.path = path
+        self._file: IO[bytes] = path.open("w+b")
+        _ = self._file.truncate(_INITIAL_SIZE)
+        self._mmap = mmap.mmap(self._file.fileno(), _INITIAL_SIZE)
+        self._used = _USED.size
+        self._offsets: dict[str, int] = {}
+        _USED.pack_into(self._mmap, 0, self._used)
+
+    def offset(self, key: str) -> int:
+        """
+        Get the value offset of the key, allocate the entry if needed.
+
+        Args:
+            key (str): sample key
+
+        Returns:
+            int: value offset
+
+        """
+        if (offset := self._offsets.get(key)) is not None:
+            return offset
+
+        encoded = key.encode()
+        padded = len(encoded) + (-(_KEY_LENGTH.size + len(encoded)) % 8)
+        size = _KEY_LENGTH.size + padded + _VALUE.size
+
+        if self._used + size > len(self._mmap):
+            self._grow(self._used + size)
+
+        _KEY_LENGTH.pack_into(self._mmap, self._used, len(encoded))
+        start = self._used + _KEY_LENGTH.size
+        self._mmap[start : start + len(encoded)] = encoded
+        offset = start + padded
+        _VALUE.pack_into(self._mmap, offset, 0.0)
+
+        # the entry is published to the readers only once it is complete
+        self._used += size
+        _USED.pack_into(self._mmap, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+    def add(self, offset: int, amount: float) -> None:
+        """
+        Increment the value in place.
+
+        Args:
+            offset (int): value offset
+            amount (float): increment
+
+        """
+        _VALUE.pack_into(self._mmap, offset, _VALUE.unpack_from(self._mmap, offset)[0] + amount)
+
+    def set(self, offset: int, value: float) -> None:
+        """
+        Overwrite the value in place.
+
+        Args:
+            offset (int): value offset
+            value (float): new value
+
+        """
+        _VALUE.pack_into(self._mmap, offset, value)
+
+    def close(self) -> None:
+        """Unmap and close the store file."""
+        self._mmap.close()
+        self._file.close()
+
+    def _grow(self, required: int) -> None:
+        size = len(self._mmap)
+
+        while size < required:
+            size *= 2
+
+        self._mmap.close()
+        _ = self._file.truncate(size)
+        self._mmap = mmap.mmap(self._file.fileno(), size)
+
+
+def read_store(path: Path) -> Iterator[tuple[str, float]]:
+    """
+    Read the samples of a store file written by any process.
+
+    Args:
+        path (Path): store file path
+
+    Yields:
+        Iterator[tuple[str, float]]: sample keys and values
+
+    """
+    data = path.read_bytes()
+
+    if len(data) < _USED.size:
+        return
+
+    used = min(_USED.unpack_from(data)[0], len(data))
+    position = _USED.size
+
+    while position + _KEY_LENGTH.size <= used:
+        length = _KEY_LENGTH.unpack_from(data, position)[0]
+        start = position + _KEY_LENGTH.size
+        offset = start + length + (-(_KEY_LENGTH.size + length) % 8)
+        yield data[start : start + length].decode(), _VALUE.unpack_from(data, offset)[0]
+        position = offset + _VALUE.size
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+def _sample_line(name: str, labels: str, value: float) -> str:
+    if labels:
+        return f"{name}{{{labels}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+def _sample_key(sample: str, labels: str, le: str = "") -> str:
+    return _SEPARATOR.join((sample, labels, le))
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str]) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True))
+
+
+@final
+class _Child:
+    """Labeled series of a counter or a gauge."""
+
+    __slots__ = ("_offset", "_store")
+
+    def __init__(self, store: MmapStore, offset: int) -> None:
+        self._store = store
+        self._offset = offset
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Increment the value.
+
+        Args:
+            amount (float, optional): increment. Defaults to 1.0.
+
+        """
+        self._store.add(self._offset, amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        """
+        Decrement the value.
+
+        Args:
+            amount (float, optional): decrement. Defaults to 1.0.
+
+        """
+        self._store.add(self._offset, -amount)
+
+    def set(self, value: float) -> None:
+        """
+        Set the value.
+
+        Args:
+            value (float): new value
+
+        """
+        self._store.set(self._offset, value)
+
+
+@final
+class _HistogramChild:
+    """Labeled series of a histogram."""
+
+    __slots__ = ("_bounds", "_buckets", "_count", "_store", "_sum")
+
+    def __init__(
+        self,
+        store: MmapStore,
+        bounds: Sequence[float],
+        buckets: Sequence[int],
+        sum_offset: int,
+        count_offset: int,
+    ) -> None:
+        self._store = store
+        self._bounds = bounds
+        self._buckets = buckets
+        self._sum = sum_offset
+        self._count = count_offset
+
+    def observe(self, value: float) -> None:
+        """
+        Observe the value.
+
+        Args:
+            value (float): observed value
+
+        """
+        self._store.add(self._buckets[bisect.bisect_left(self._bounds, value)], 1.0)
+        self._store.add(self._sum, value)
+        self._store.add(self._count, 1.0)
+
+
+class Metric[Child]:
+    """Metric family, the samples are stored in the memory mapped file of the process."""
+
+    __slots__ = ("_children", "_registry", "documentation", "labelnames", "name", "type")
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        metric_type: METRIC_TYPE,
+    ) -> None:
+        """
+        Initialize the metric family.
+
+        Args:
+            registry (MetricsRegistry): owning registry
+            name (str): metric name
+            documentation (str): help text
+            labelnames (Sequence[str]): label names
+            metric_type (METRIC_TYPE): metric type
+
+        """
+        self._registry = registry
+        self._children: dict[tuple[str, ...], Child] = {}
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.type: METRIC_TYPE = metric_type
+
+    def reset(self) -> None:
+        """Forget the series bound to the store of another process."""
+        self._children.clear()
+
+
+@final
+class Counter(Metric[_Child]):
+    __slots__ = ()
+
+    def labels(self, *values: str) -> _Child:
+        """
+        Get the labeled series.
+
+        Args:
+            values (str): label values in the order of the label names
+
+        Returns:
+            _Child: series
+
+        """
+        if (child := self._children.get(values)) is None:
+            store = self._registry.store("total")
+            offset = store.offset(_sample_key(self.name, _labels_text(self.labelnames, values)))
+            child = self._children[values] = _Child(store, offset)
+        return child
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Increment the unlabeled counter.
+
+        Args:
+            amount (float, optional): increment. Defaults to 1.0.
+
+        """
+        self.labels().inc(amount)
+
+
+@final
+class Gauge(Metric[_Child]):
+    """Gauge summed over the live processes only."""
+
+    __slots__ = ()
+
+    def labels(self, *values: str) -> _Child:
+        """
+        Get the labeled series.
+
+        Args:
+            values (str): label values in the order of the label names
+
+        Returns:
+            _Child: series
+
+        """
+        if (child := self._children.get(values)) is None:
+            store = self._registry.store("live")
+            offset = store.offset(_sample_key(self.name, _labels_text(self.labelnames, values)))
+            child = self._children[values] = _Child(store, offset)
+        return child
+
+    def set(self, value: float) -> None:
+        """
+        Set the unlabeled gauge.
+
+        Args:
+            value (float): new value
+
+        """
+        self.labels().set(value)
+
+
+@final
+class Histogram(Metric[_HistogramChild]):
+    __slots__ = ("bounds", "les")
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float],
+    ) -> None:
+        """
+        Initialize the histogram family.
+
+        Args:
+            registry (MetricsRegistry): owning registry
+            name (str): metric name
+            documentation (str): help text
+            labelnames (Sequence[str]): label names
+            buckets (Sequence[float]): bucket upper bounds
+
+        """
+        super().__init__(registry, name, documentation, labelnames, "histogram")
+        self.bounds = tuple(sorted(float(bound) for bound in buckets))
+        self.les = (*(_format_value(bound) for bound in self.bounds), "+Inf")
+
+    def labels(self, *values: str) -> _HistogramChild:
+        """
+        Get the labeled series.
+
+        Args:
+            values (str): label values in the order of the label names
+
+        Returns:
+            _HistogramChild: series
+
+        """
+        if (child := self._children.get(values)) is None:
+            store = self._registry.store("total")
+            labels = _labels_text(self.labelnames, values)
+            child = self._children[values] = _HistogramChild(
+                store,
+                self.bounds,
+                [store.offset(_sample_key(f"{self.name}_bucket", labels, le)) for le in self.les],
+                store.offset(_sample_key(f"{self.name}_sum", labels)),
+                store.offset(_sample_key(f"{self.name}_count", labels)),
+            )
+        return child
+
+    def observe(self, value: float) -> None:
+        """
+        Observe the value in the unlabeled histogram.
+
+        Args:
+            value (float): observed value
+
+        """
+        self.labels().observe(value)
+
+
+@final
+class MetricsRegistry:
+    """
+    Multiprocess metrics registry.
+
+    Every worker process writes its samples to its own memory mapped files in a shared
+    directory, the exposition aggregates the files of all workers. Counters and
+    histograms of exited workers are kept, gauges are summed over the live workers only.
+    """
+
+    __slots__ = ("_metrics", "_pid", "_stores", "directory")
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Initialize the registry, the files are created on the first recorded sample.
+
+        Args:
+            directory (Path): shared directory of the worker files
+
+        """
+        self.directory = directory
+        self._metrics: dict[str, Metric[Any]] = {}
+        self._stores: dict[STORE_KIND, MmapStore] = {}
+        self._pid = os.getpid()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """
+        Register a counter.
+
+        Args:
+            name (str): metric name
+            documentation (str): help text
+            labelnames (Sequence[str], optional): label names. Defaults to ().
+
+        Returns:
+            Counter: counter family
+
+        """
+        return self._register(Counter(self, name, documentation, labelnames, "counter"))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """
+        Register a gauge.
+
+        Args:
+            name (str): metric name
+            documentation (str): help text
+            labelnames (Sequence[str], optional): label names. Defaults to ().
+
+        Returns:
+            Gauge: gauge family
+
+        """
+        return self._register(Gauge(self, name, documentation, labelnames, "gauge"))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] | None = None,
+    ) -> Histogram:
+        """
+        Register a histogram.
+
+        Args:
+            name (str): metric name
+            documentation (str): help text
+            labelnames (Sequence[str], optional): label names. Defaults to ().
+            buckets (Sequence[float] | None, optional): bucket upper bounds. Defaults to settings.
+
+        Returns:
+            Histogram: histogram family
+
+        """
+        return self._register(
+            Histogram(
+                self,
+                name,
+                documentation,
+                labelnames,
+                settings.metrics.buckets if buckets is None else buckets,
+            )
+        )
+
+    def store(self, kind: STORE_KIND) -> MmapStore:
+        """
+        Get the store of the current process.
+
+        Args:
+            kind (STORE_KIND): 'total' for summed samples, 'live' for live-only gauges
+
+        Returns:
+            MmapStore: process store
+
+        """
+        if (store := self._stores.get(kind)) is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            store = self._stores[kind] = MmapStore(self.directory / f"{kind}_{self._pid}.db")
+        return store
+
+    def collect(self) -> dict[str, float]:
+        """
+        Aggregate the samples of all worker processes.
+
+        Returns:
+            dict[str, float]: summed sample values by key
+
+        """
+        samples: dict[str, float] = {}
+
+        for path in self.directory.glob("*.db"):
+            kind, _, pid = path.stem.partition("_")
+
+            if not pid.isdigit() or (kind == "live" and not _pid_alive(int(pid))):
+                continue
+
+            with contextlib.suppress(FileNotFoundError):
+                for key, value in read_store(path):
+                    samples[key] = samples.get(key, 0.0) + value
+
+        return samples
+
+    def series(self, name: str) -> dict[str, float]:
+        """
+        Aggregate the labeled series of a counter or a gauge over all worker processes.
+
+        Args:
+            name (str): metric name
+
+        Returns:
+            dict[str, float]: summed values by label text
+
+        """
+        series: dict[str, float] = {}
+
+        for key, value in self.collect().items():
+            sample, labels, _ = key.split(_SEPARATOR)
+
+            if sample == name:
+                series[labels] = value
+
+        return series
+
+    def expose(self) -> bytes:
+        """
+        Render the aggregated samples in the Prometheus text format.
+
+        Returns:
+            bytes: exposition body
+
+        """
+        series: dict[str, list[tuple[str, str, float]]] = {}
+
+        for key, value in self.collect().items():
+            sample, labels, le = key.split(_SEPARATOR)
+            series.setdefault(sample, []).append((labels, le, value))
+
+        lines: list[str] = []
+
+        for metric in self._metrics.values():
+            lines.extend((
+                f"# HELP {metric.name} {_escape(metric.documentation)}",
+                f"# TYPE {metric.name} {metric.type}",
+            ))
+
+            if isinstance(metric, Histogram):
+                lines.extend(self._histogram_lines(metric, series))
+                continue
+
+            lines.extend(
+                _sample_line(metric.name, labels, value)
+                for labels, _, value in sorted(series.get(metric.name, ()))
+            )
+
+        lines.append("")
+        return "\n".join(lines).encode()
+
+    @staticmethod
+    def _histogram_lines(
+        metric: Histogram,
+        series: dict[str, list[tuple[str, str, float]]],
+    ) -> Iterator[str]:
+        buckets: dict[str, dict[str, float]] = {}
+
+        for labels, le, value in series.get(f"{metric.name}_bucket", ()):
+            buckets.setdefault(labels, {})[le] = value
+
+        for labels, counts in sorted(buckets.items()):
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0.0
+
+            for le in metric.les:
+                cumulative += counts.get(le, 0.0)
+                yield f'{metric.name}_bucket{{{prefix}le="{le}"}} {_format_value(cumulative)}'
+
+        for suffix in ("_sum", "_count"):
+            for labels, _, value in sorted(series.get(f"{metric.name}{suffix}", ())):
+                yield _sample_line(f"{metric.name}{suffix}", labels, value)
+
+    def clear(self) -> None:
+        """Remove the files left in the directory by the previous server run."""
+        for path in self.directory.glob("*.db"):
+            path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Close the stores of the current process."""
+        for store in self._stores.values():
+            store.close()
+
+        self._stores.clear()
+
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def _register[M: Metric[Any]](self, metric: M) -> M:
+        if metric.name in self._metrics:
+            exc_msg = f"Metric '{metric.name}' is already registered."
+            raise ValueError(exc_msg)
+
+        self._metrics[metric.name] = metric
+        return metric
+
+    def _reset(self) -> None:
+        # a forked worker must not write to the files of its parent
+        self._stores.clear()
+        self._pid = os.getpid()
+
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+def _default_directory() -> Path:
+    if settings.metrics.directory is not None:
+        return settings.metrics.directory
+    # the workers of one server share the parent process
+    return Path(tempfile.gettempdir()) / f"app-metrics-{os.getppid()}"
+
+
+registry = MetricsRegistry(_default_directory())
+
+http_requests_total = registry.counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request processing time until the response start.",
+    ("method", "route"),
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests being processed.",
+    ("method",),
+)
+http_requests_shed_total = registry.counter(
+    "http_requests_shed_total",
+    "HTTP requests rejected over the concurrency limit.",
+    ("priority",),
+)
+http_requests_cancelled_total = registry.counter(
+    "http_requests_cancelled_total",
+    "HTTP requests cancelled at the deadline or on client disconnect.",
+    ("reason",),
+)
+http_compression_bytes_total = registry.counter(
+    "http_compression_bytes_total",
+    "Response body bytes before and after compression.",
+    ("encoding", "stage"),
+)
+http_compression_skipped_total = registry.counter(
+    "http_compression_skipped_total",
+    "Responses sent uncompressed to clients accepting compression.",
+    ("reason",),
+)
+app_workers_ready = registry.gauge(
+    "app_workers_ready",
+    "Workers done with the startup warmup and ready to serve.",
+)
+app_warmup_seconds = registry.histogram(
+    "app_warmup_seconds",
+    "Startup warmup time of the workers.",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+concurrency_limit = registry.gauge(
+    "concurrency_limit",
+    "Adaptive limit of in-flight HTTP requests.",
+)
+db_pool_size = registry.gauge("db_pool_size", "Database connection pool size.")
+db_pool_checked_out = registry.gauge(
+    "db_pool_checked_out",
+    "Database connections checked out of the pool.",
+)
+db_pool_overflow = registry.gauge(
+    "db_pool_overflow",
+    "Database connections opened over the pool size.",
+)
+db_pool_exhausted_total = registry.counter(
+    "db_pool_exhausted_total",
+    "Checkouts which left no free connection in the pool.",
+)
+db_pool_wait_seconds = registry.histogram(
+    "db_pool_wait_seconds",
+    "Time to check out a database connection, bulkhead wait included.",
+    ("bulkhead",),
+)
+db_bulkhead_in_use = registry.gauge(
+    "db_bulkhead_in_use",
+    "Connections held by the routes of the bulkhead.",
+    ("bulkhead",),
+)
+db_bulkhead_saturation_total = registry.counter(
+    "db_bulkhead_saturation_total",
+    "Connection requests queued because the bulkhead quota was used up.",
+    ("bulkhead",),
+)
+db_bulkhead_rejections_total = registry.counter(
+    "db_bulkhead_rejections_total",
+    "Requests rejected after waiting for a bulkhead slot.",
+    ("bulkhead",),
+)
+db_retries_total = registry.counter(
+    "db_retries_total",
+    "Reads failed on a lost connection by outcome: retried, exhausted, budget, deadline.",
+    ("outcome",),
+)
+db_compiled_cache_total = registry.counter(
+    "db_compiled_cache_total",
+    "Statement compilations by result: hit, miss, uncached, disabled.",
+    ("result",),
+)
+db_prepared_statements_total = registry.counter(
+    "db_prepared_statements_total",
+    "Prepared statement cache lookups by result: hit, miss, disabled.",
+    ("result",),
+)
+db_statements_total = registry.counter(
+    "db_statements_total",
+    "Statements executed by route and repository method.",
+    ("route", "db_method"),
+)
+redis_command_duration_seconds = registry.histogram(
+    "redis_command_duration_seconds",
+    "Redis command latency by command and outcome.",
+    ("command", "outcome"),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+rate_limit_rejections_total = registry.counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by the rate limiter.",
+    ("scope", "role"),
+)
+cache_requests_total = registry.counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result ('hit' or 'miss').",
+    ("cache", "result"),
+)
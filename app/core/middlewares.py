@@ -1,49 +1,168 @@
 import time
-from typing import override
+from typing import Any, final
 
-from fastapi import Request, Response
+from fastapi import status
 from loguru import logger
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    @override
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        start_time = time.time()
-        method = request.method
-        path = request.url.path
-        client = request.client
-        client_ip = client.host if client is not None else "unknown"
-
-        logger_request = logger.bind(
-            path=path,
-            method=method,
-            client_ip=client_ip,
-            cookies=request.cookies,
-        )
-        logger_request.bind(
-            type="request",
-            headers=request.headers,
-        ).info(
-            "Request: {method} {path} from {client_ip}",
-            method=method,
-            path=path,
-            client_ip=client_ip,
-        )
-
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-
-        logger_request.bind(
-            type="response",
-            headers=response.headers,
-            process_time=str(process_time),
-        ).info(
-            "Response: {method} {path} returned {status_code} to {client_ip}",
-            method=method,
-            path=path,
-            status_code=response.status_code,
-            client_ip=client_ip,
-        )
-        return response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.loggers import redact_headers, sample_request_log
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    http_requests_total,
+)
+from app.core.timing import ServerTiming, server_timing
+from app.database.instrumentation import QueryStats, query_stats
+
+
+def _log_exchange(
+    scope: Scope,
+    response_headers: list[tuple[bytes, bytes]],
+    status_code: int,
+    **details: Any,  # noqa: ANN401
+) -> None:
+    """
+    Log the request and the response records.
+
+    Args:
+        scope (Scope): connection scope
+        response_headers (list[tuple[bytes, bytes]]): raw response headers
+        status_code (int): response status code
+        details (Any): response record fields
+
+    """
+    method = scope["method"]
+    path = scope["path"]
+    client = scope.get("client")
+    client_ip = client[0] if client else "unknown"
+
+    logger_request = logger.bind(path=path, method=method, client_ip=client_ip)
+    logger_request.bind(
+        type="request",
+        headers=redact_headers(scope["headers"]),
+    ).info(
+        "Request: {method} {path} from {client_ip}",
+        method=method,
+        path=path,
+        client_ip=client_ip,
+    )
+    logger_request.bind(
+        type="response",
+        headers=redact_headers(response_headers),
+        **details,
+    ).info(
+        "Response: {method} {path} returned {status_code} to {client_ip}",
+        method=method,
+        path=path,
+        status_code=status_code,
+        client_ip=client_ip,
+    )
+
+
+def _observe_exchange(
+    method: str,
+    route_path: str | None,
+    status_code: int,
+    process_time_ns: int,
+) -> None:
+    """
+    Record the request metrics.
+
+    Args:
+        method (str): request method
+        route_path (str | None): matched route path
+        status_code (int): response status code
+        process_time_ns (int): request processing time in nanoseconds
+
+    """
+    route = route_path or "unmatched"
+    http_requests_total.labels(method, route, str(status_code)).inc()
+    http_request_duration_seconds.labels(method, route).observe(process_time_ns / 1e9)
+
+
+@final
+class LoggingMiddleware:
+    """Pure ASGI request/response logging and metrics middleware."""
+
+    __slots__ = ("app",)
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initialize the middleware.
+
+        Args:
+            app (ASGIApp): next ASGI application
+
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Log the sampled requests, record the metrics, add the processing time headers.
+
+        Args:
+            scope (Scope): connection scope
+            receive (Receive): receive channel
+            send (Send): send channel
+
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter_ns()
+        response_started = False
+        timing = ServerTiming() if settings.server_timing.enabled else None
+        timing_token = server_timing.set(timing)
+        stats = QueryStats(scope["path"])
+        stats_token = query_stats.set(stats)
+        http_requests_in_progress.labels(scope["method"]).inc()
+
+        def finish_exchange(response_headers: list[tuple[bytes, bytes]], status_code: int) -> int:
+            process_time_ns = time.perf_counter_ns() - start_time
+            route = scope.get("route")
+            route_path = route.path if route is not None else None
+
+            _observe_exchange(scope["method"], route_path, status_code, process_time_ns)
+
+            if sample_request_log(route_path, status_code, process_time_ns):
+                _log_exchange(
+                    scope,
+                    response_headers,
+                    status_code,
+                    process_time=str(process_time_ns / 1e9),
+                    timings=timing.fields() if timing is not None else {},
+                    queries=stats.fields(),
+                )
+
+            return process_time_ns
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+
+            if message["type"] == "http.response.start":
+                response_started = True
+                headers = MutableHeaders(scope=message)
+                process_time_ns = finish_exchange(message["headers"], message["status"])
+                headers.append("X-Process-Time", str(process_time_ns / 1e9))
+
+                if timing is not None and settings.server_timing.header:
+                    if stats.count:
+                        timing.describe("sql", f"count={stats.count}")
+
+                    headers.append("Server-Timing", timing.header(process_time_ns))
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not response_started:
+                _ = finish_exchange([], status.HTTP_500_INTERNAL_SERVER_ERROR)
+            raise
+        finally:
+            http_requests_in_progress.labels(scope["method"]).dec()
+            query_stats.reset(stats_token)
+            server_timing.reset(timing_token)
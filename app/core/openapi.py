@@ -0,0 +1,127 @@
+import functools
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Final
+
+import fastapi
+import orjson
+from fastapi import FastAPI
+from loguru import logger
+
+from app.core.config import settings
+
+_SOURCES: Final[Path] = Path(__file__).resolve().parent.parent
+_FINGERPRINT_KEY: Final[str] = "x-schema-fingerprint"
+# the settings shaping the paths and the routers of the schema
+_SCHEMA_SETTINGS: Final[set[str]] = {"api", "metrics", "health"}
+
+
+@functools.cache
+def source_fingerprint() -> str:
+    """
+    Hash the application sources the schema is generated from.
+
+    Computed once per process, the forked workers inherit the digest of the master.
+
+    Returns:
+        str: sources digest
+
+    """
+    digest = hashlib.sha256()
+
+    for path in sorted(_SOURCES.rglob("*.py")):
+        digest.update(path.relative_to(_SOURCES).as_posix().encode())
+        digest.update(path.read_bytes())
+
+    return digest.hexdigest()
+
+
+def schema_fingerprint(app: FastAPI) -> str:
+    """
+    Hash everything the schema depends on: sources, settings, routes and FastAPI.
+
+    Args:
+        app (FastAPI): application
+
+    Returns:
+        str: schema digest
+
+    """
+    routes = sorted(
+        (getattr(route, "path", ""), *sorted(getattr(route, "methods", None) or ()))
+        for route in app.routes
+    )
+    digest = hashlib.sha256(source_fingerprint().encode())
+    digest.update(fastapi.__version__.encode())
+    digest.update(orjson.dumps([app.title, app.version, routes]))
+    digest.update(settings.model_dump_json(include=_SCHEMA_SETTINGS).encode())
+    return digest.hexdigest()
+
+
+def _load(path: Path, fingerprint: str) -> dict[str, Any] | None:
+    try:
+        schema = orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+    if not isinstance(schema, dict) or schema.get(_FINGERPRINT_KEY) != fingerprint:
+        return None
+
+    return schema  # type: ignore[reportUnknownVariableType]
+
+
+def _save(path: Path, schema: dict[str, Any]) -> None:
+    # the workers may write it at once, the file is replaced atomically
+    temporary = path.with_name(f".{path.name}.{os.getpid()}")
+
+    try:
+        _ = temporary.write_bytes(orjson.dumps(schema))
+        _ = temporary.replace(path)
+    except OSError as error:
+        logger.warning("OpenAPI schema not cached to {path}: {error}", path=path, error=error)
+        temporary.unlink(missing_ok=True)
+
+
+def cached_openapi(app: FastAPI) -> dict[str, Any]:
+    """
+    Get the OpenAPI schema, prebuilt on disk or generated once and saved.
+
+    Args:
+        app (FastAPI): application
+
+    Returns:
+        dict[str, Any]: OpenAPI schema
+
+    """
+    if app.openapi_schema is not None:
+        return app.openapi_schema
+
+    if (path := settings.openapi.cache_path) is None:
+        return FastAPI.openapi(app)
+
+    fingerprint = schema_fingerprint(app)
+
+    if (schema := _load(path, fingerprint)) is None:
+        schema = FastAPI.openapi(app) | {_FINGERPRINT_KEY: fingerprint}
+        _save(path, schema)
+
+    app.openapi_schema = schema
+    return schema
+
+
+def main() -> None:
+    """Prebuild the OpenAPI schema cache."""
+    from app.main import app  # noqa: PLC0415
+
+    if settings.openapi.cache_path is None:
+        logger.warning("OpenAPI schema cache is disabled.")
+        return
+
+    settings.openapi.cache_path.unlink(missing_ok=True)
+    _ = cached_openapi(app)
+    logger.info("OpenAPI schema cached to {path}.", path=settings.openapi.cache_path)
+
+
+if __name__ == "__main__":
+    main()
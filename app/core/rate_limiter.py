@@ -0,0 +1,538 @@
+import asyncio
+import math
+import time
+from collections.abc import Callable, Iterable
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, Final, final
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from loguru import logger
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from starlette.routing import BaseRoute
+
+import app.core.exceptions as exc
+from app.core.config import settings
+from app.core.deadlines import remaining_time
+from app.core.metrics import rate_limit_rejections_total, redis_command_duration_seconds
+from app.core.security import Token
+from app.schemas import USER_ROLE, Role
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+type COST = int | Callable[[Request], int]
+
+RATE_COST_ATTR: Final[str] = "__rate_cost__"
+
+# Atomic sliding-window counter kept in redis. The usage of the previous fixed window
+# is weighted by its overlap with the sliding window. Grants up to ARGV[3] units to the
+# caller, a negative request returns unspent units. Returns the granted units, the
+# remaining quota and the milliseconds until the current window resets. Time is taken
+# from the redis server so that every worker counts against the same clock.
+_LEASE_SCRIPT: Final[str] = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local current = math.floor(now / window)
+local elapsed = now - current * window
+local current_key = KEYS[1] .. ":" .. current
+local previous = tonumber(redis.call("GET", KEYS[1] .. ":" .. (current - 1))) or 0
+local used = tonumber(redis.call("GET", current_key)) or 0
+local weighted = previous * (window - elapsed) / window + used
+local granted = math.max(requested, -used)
+if requested > 0 then
+    granted = math.max(0, math.min(requested, math.floor(limit - weighted)))
+end
+if granted ~= 0 then
+    redis.call("INCRBY", current_key, granted)
+    redis.call("EXPIRE", current_key, window * 2)
+end
+local remaining = math.max(0, math.floor(limit - weighted - granted))
+return {granted, remaining, math.ceil((window - elapsed) * 1000)}
+"""
+
+
+@final
+class RateLimit:
+    __slots__ = ("capacity", "policy", "rate", "seconds")
+
+    def __init__(self, times: int, seconds: int) -> None:
+        """
+        Initialize the rate limit.
+
+        Args:
+            times (int): number of cost units allowed per period
+            seconds (int): period in seconds
+
+        """
+        self.capacity = times
+        self.seconds = seconds
+        self.rate = times / seconds
+        self.policy = f"{times};w={seconds}"
+
+
+@final
+class RateLimitState:
+    __slots__ = ("limit", "remaining", "reset", "retry_after")
+
+    def __init__(self, limit: RateLimit, remaining: int, reset: int, retry_after: int) -> None:
+        """
+        Initialize the result of the rate limit check.
+
+        Args:
+            limit (RateLimit): applied limit
+            remaining (int): remaining quota units
+            reset (int): seconds until the quota is restored
+            retry_after (int): seconds to wait before retrying, zero if the request is allowed
+
+        """
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> dict[str, str]:
+        """
+        Standard ``RateLimit-*`` response headers.
+
+        Returns:
+            dict[str, str]: response headers
+
+        """
+        return {
+            "RateLimit-Limit": str(self.limit.capacity),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset),
+            "RateLimit-Policy": self.limit.policy,
+        }
+
+
+@final
+class _TokenBucket:
+    __slots__ = ("lease", "limit", "remaining", "reset_at", "synced", "tokens", "updated_at")
+
+    def __init__(self, limit: RateLimit, *, synced: bool, now: float) -> None:
+        """
+        Initialize the bucket.
+
+        Args:
+            limit (RateLimit): bucket limit
+            synced (bool): bucket is synchronized with redis
+            now (float): monotonic time of creation
+
+        """
+        self.limit = limit
+        self.synced = synced
+        self.tokens = 0.0 if synced else float(limit.capacity)
+        self.remaining = 0
+        self.reset_at = now
+        self.updated_at = now
+        self.lease: asyncio.Task[None] | None = None
+
+    def switch(self, *, synced: bool) -> None:
+        """
+        Switch between leased and local-only tokens.
+
+        Leased tokens belong to the global window, local-only buckets restart full.
+
+        Args:
+            synced (bool): bucket is synchronized with redis
+
+        """
+        self.synced = synced
+        self.tokens = 0.0 if synced else float(self.limit.capacity)
+
+    def state(self, now: float, retry_after: float) -> RateLimitState:
+        """
+        Describe the bucket as a rate limit check result.
+
+        Args:
+            now (float): current monotonic time
+            retry_after (float): seconds to wait before retrying
+
+        Returns:
+            RateLimitState: rate limit check result
+
+        """
+        if self.synced:
+            remaining = self.remaining + math.floor(self.tokens)
+            reset = self.reset_at - now
+        else:
+            remaining = math.floor(self.tokens)
+            reset = (self.limit.capacity - self.tokens) / self.limit.rate
+
+        return RateLimitState(
+            limit=self.limit,
+            remaining=remaining,
+            reset=max(0, math.ceil(reset)),
+            retry_after=math.ceil(retry_after),
+        )
+
+
+@final
+class TokenBucketLimiter:
+    """
+    In-process token buckets backed by a sliding-window counter in redis.
+
+    Each worker leases quota from redis in chunks and spends it locally, so most
+    requests never leave the process. When redis is slow or unavailable the
+    buckets refill locally until redis becomes reachable again.
+    """
+
+    __slots__ = ("_buckets", "_reconciler", "_redis_retry_at", "_script")
+
+    def __init__(self) -> None:
+        """Initialize the limiter."""
+        self._buckets: dict[str, _TokenBucket] = {}
+        self._script: AsyncScript | None = None
+        self._redis_retry_at = 0.0
+        self._reconciler: asyncio.Task[None] | None = None
+
+    async def init(self, redis_connection: Redis) -> None:
+        """
+        Connect the limiter to redis and start the reconciliation loop.
+
+        Args:
+            redis_connection (Redis): redis client
+
+        """
+        self._script = redis_connection.register_script(_LEASE_SCRIPT)
+        self._reconciler = asyncio.create_task(self._reconcile_forever())
+
+    async def warm_up(self) -> None:
+        """Load the lease script, so that the first leases skip the NOSCRIPT round trip."""
+        if self._script is not None:
+            _ = await self._script.registered_client.script_load(_LEASE_SCRIPT)
+
+    async def close(self) -> None:
+        """Stop the reconciliation loop and return unspent quota to redis."""
+        if self._reconciler is not None:
+            _ = self._reconciler.cancel()
+
+            with suppress(asyncio.CancelledError):
+                await self._reconciler
+
+            self._reconciler = None
+
+        # a bucket with a lease in flight is not reconciled, its quota would be lost
+        if leases := [bucket.lease for bucket in self._buckets.values() if bucket.lease]:
+            _ = await asyncio.wait(leases, timeout=settings.drain.timeout)
+
+        await self._reconcile(force=True)
+        self._script = None
+
+    @property
+    def synced(self) -> bool:
+        """
+        Whether buckets are currently synchronized with redis.
+
+        Returns:
+            bool: redis is connected and not in backoff
+
+        """
+        return self._script is not None and time.monotonic() >= self._redis_retry_at
+
+    async def acquire(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitState:
+        """
+        Take quota units from the bucket.
+
+        Args:
+            key (str): bucket key
+            limit (RateLimit): bucket limit
+            cost (int, optional): number of units to take. Defaults to 1.
+
+        Returns:
+            RateLimitState: rate limit check result
+
+        """
+        now = time.monotonic()
+        synced = self.synced
+
+        if (bucket := self._buckets.get(key)) is None:
+            bucket = self._buckets[key] = _TokenBucket(limit, synced=synced, now=now)
+        elif bucket.synced != synced:
+            bucket.switch(synced=synced)
+        elif not synced:
+            elapsed = now - bucket.updated_at
+            bucket.tokens = min(limit.capacity, bucket.tokens + elapsed * limit.rate)
+
+        bucket.updated_at = now
+
+        if synced and bucket.tokens < cost:
+            await self._lease(key, bucket, cost)
+
+            if not self.synced and bucket.synced:
+                bucket.switch(synced=False)
+
+        return bucket.state(now, self._take(key, bucket, cost))
+
+    def _take(self, key: str, bucket: _TokenBucket, cost: int) -> float:
+        if bucket.tokens < cost:
+            if bucket.synced:
+                return max(bucket.reset_at - time.monotonic(), 1.0)
+            return (cost - bucket.tokens) / bucket.limit.rate
+
+        bucket.tokens -= cost
+
+        if (
+            bucket.synced
+            and bucket.lease is None
+            and bucket.remaining > 0
+            and bucket.tokens < self._lease_size(bucket) / 2
+        ):
+            bucket.lease = asyncio.create_task(self._fetch_lease(key, bucket, 0))
+
+        return 0.0
+
+    async def _lease(self, key: str, bucket: _TokenBucket, cost: int) -> None:
+        if bucket.lease is None:
+            bucket.lease = asyncio.create_task(self._fetch_lease(key, bucket, cost))
+
+        await asyncio.shield(bucket.lease)
+
+    async def _fetch_lease(self, key: str, bucket: _TokenBucket, cost: int) -> None:
+        try:
+            requested = max(cost, self._lease_size(bucket))
+            result = await self._call_script(key, bucket.limit, requested)
+
+            if result is not None and bucket.synced:
+                granted, bucket.remaining, reset_ms = result
+                bucket.tokens += granted
+                bucket.reset_at = time.monotonic() + reset_ms / 1000
+        finally:
+            bucket.lease = None
+
+    async def _call_script(
+        self,
+        key: str,
+        limit: RateLimit,
+        requested: int,
+    ) -> tuple[int, int, int] | None:
+        if self._script is None:
+            return None
+
+        # the call must not outlive the request it is made for
+        timeout = settings.rate_limit.redis_timeout
+
+        if (budget := remaining_time()) is not None:
+            if budget <= 0:
+                return None
+            timeout = min(timeout, budget)
+
+        capped = timeout < settings.rate_limit.redis_timeout
+        start = time.perf_counter()
+
+        try:
+            granted, remaining, reset_ms = await asyncio.wait_for(
+                self._script(
+                    keys=[f"{settings.rate_limit.key_prefix}:{key}"],
+                    args=[limit.capacity, limit.seconds, requested],
+                ),
+                timeout=timeout,
+            )
+        except (RedisError, OSError, TimeoutError) as e:
+            redis_command_duration_seconds.labels("evalsha", "error").observe(
+                time.perf_counter() - start
+            )
+
+            # the request ran out of time, redis is not to blame
+            if capped and isinstance(e, TimeoutError):
+                return None
+
+            self._redis_retry_at = time.monotonic() + settings.rate_limit.redis_backoff
+            logger.bind(type="rate_limiter").warning(
+                "Redis is unavailable, falling back to local rate limiting: {exc_msg}",
+                exc_msg=repr(e),
+            )
+            return None
+
+        redis_command_duration_seconds.labels("evalsha", "ok").observe(time.perf_counter() - start)
+        return int(granted), int(remaining), int(reset_ms)
+
+    async def _reconcile_forever(self) -> None:
+        while True:
+            await asyncio.sleep(settings.rate_limit.reconcile_interval)
+            await self._reconcile()
+
+    async def _reconcile(self, *, force: bool = False) -> None:
+        """
+        Drop idle buckets and return their unspent leased quota to redis.
+
+        Args:
+            force (bool, optional): drop every bucket. Defaults to False.
+
+        """
+        now = time.monotonic()
+        idle = [
+            (key, bucket)
+            for key, bucket in self._buckets.items()
+            if bucket.lease is None and (force or now - bucket.updated_at >= bucket.limit.seconds)
+        ]
+
+        for key, bucket in idle:
+            del self._buckets[key]
+
+            if bucket.synced and bucket.tokens >= 1 and self.synced:
+                _ = await self._call_script(key, bucket.limit, -math.floor(bucket.tokens))
+
+    @staticmethod
+    def _lease_size(bucket: _TokenBucket) -> int:
+        return min(settings.rate_limit.lease_size, bucket.limit.capacity)
+
+
+limiter = TokenBucketLimiter()
+
+
+def rate_cost[Endpoint: Callable[..., Any]](cost: COST) -> Callable[[Endpoint], Endpoint]:
+    """
+    Declare the rate limit cost of the endpoint.
+
+    Args:
+        cost (COST): units per request or a function of the request
+
+    Returns:
+        Callable[[Endpoint], Endpoint]: endpoint decorator
+
+    """
+
+    def decorator(endpoint: Endpoint) -> Endpoint:
+        setattr(endpoint, RATE_COST_ATTR, cost)
+        return endpoint
+
+    return decorator
+
+
+def page_cost(request: Request, items_per_unit: int = 10) -> int:
+    """
+    Cost of a list request, proportional to the requested page size.
+
+    Args:
+        request (Request): request from the client
+        items_per_unit (int, optional): items per cost unit. Defaults to 10.
+
+    Returns:
+        int: request cost
+
+    """
+    try:
+        limit = int(request.query_params.get("limit", items_per_unit))
+    except ValueError:
+        limit = items_per_unit
+
+    return max(1, math.ceil(limit / items_per_unit))
+
+
+@final
+class RateLimiter:
+    """
+    Declarative identity-aware rate limit.
+
+    Authenticated clients are limited by user id within their role tier, guests by IP.
+    """
+
+    __slots__ = ("limits", "scope")
+
+    def __init__(
+        self,
+        times: int | None = None,
+        seconds: int | None = None,
+        scope: str | None = None,
+    ) -> None:
+        """
+        Initialize the rate limit dependency.
+
+        Args:
+            times (int | None, optional): units allowed per period. Defaults to the role tier.
+            seconds (int | None, optional): period in seconds. Defaults to settings.
+            scope (str | None, optional): shared bucket name. Defaults to the route path.
+
+        """
+        seconds = seconds or settings.rate_limit.seconds
+        tiers = settings.rate_limit.tiers
+        self.limits: dict[USER_ROLE, RateLimit] = {
+            Role.guest: RateLimit(times or tiers.guest, seconds),
+            Role.user: RateLimit(times or tiers.user, seconds),
+            Role.admin: RateLimit(times or tiers.admin, seconds),
+        }
+        self.scope = scope
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        """
+        Check the client's rate limit.
+
+        Args:
+            request (Request): request from the client
+            response (Response): response to the client
+
+        Raises:
+            TooManyRequestsError: rate limit exceeded
+
+        """
+        if not settings.rate_limit.enabled:
+            return
+
+        route = request.scope["route"]
+        scope = self.scope or route.path
+        cost = getattr(route.endpoint, RATE_COST_ATTR, 1)
+
+        if callable(cost):
+            cost = cost(request)
+
+        payload = Token.identify(request)
+
+        if payload is None or payload.user_role == Role.guest:
+            client = request.client
+            role, identity = Role.guest, f"ip:{client.host if client is not None else 'unknown'}"
+        else:
+            role, identity = payload.user_role, f"user:{payload.user_id}"
+
+        # a request costing more than the bucket holds would be refused forever
+        limit = self.limits[role]
+        state = await limiter.acquire(
+            f"{scope}:{role}:{identity}", limit, min(cost, limit.capacity)
+        )
+
+        if state.retry_after:
+            rate_limit_rejections_total.labels(scope, role).inc()
+            raise exc.TooManyRequestsError(state.retry_after, state.headers)
+
+        response.headers.update(state.headers)
+
+
+def check_rate_costs(routes: Iterable[BaseRoute]) -> None:
+    """
+    Check that the fixed cost of every rate limited route fits in each tier.
+
+    Args:
+        routes (Iterable[BaseRoute]): application routes
+
+    Raises:
+        ValueError: route cost over a tier capacity
+
+    """
+    for route in routes:
+        if not isinstance(route, APIRoute):
+            continue
+
+        cost = getattr(route.endpoint, RATE_COST_ATTR, 1)
+
+        # the request-dependent costs are capped at the capacity when applied
+        if callable(cost):
+            continue
+
+        for dependency in route.dependant.dependencies:
+            if not isinstance(dependency.call, RateLimiter):
+                continue
+
+            for role, limit in dependency.call.limits.items():
+                if cost > limit.capacity:
+                    exc_msg = (
+                        f"{route.path} costs {cost} units, over the {role} tier capacity "
+                        f"of {limit.capacity}."
+                    )
+                    raise ValueError(exc_msg)
@@ -0,0 +1,110 @@
+import functools
+import inspect
+from collections.abc import Callable, Coroutine
+from typing import Any, Final, override
+
+import pydantic_core
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+from app.core.timing import timed
+
+type ENDPOINT = Callable[..., Coroutine[Any, Any, Any]]
+
+_RESPONSE_PARAM: Final[str] = "__trusted_response"
+
+
+class TimedJSONResponse(ORJSONResponse):
+    """JSON response measuring the body serialization into the request timing."""
+
+    @override
+    def render(self, content: Any) -> bytes:
+        with timed("encode"):
+            return super().render(content)
+
+
+class TrustedJSONResponse(Response):
+    """JSON response serializing pydantic models straight to bytes with pydantic-core."""
+
+    media_type = "application/json"
+
+    @override
+    def render(self, content: Any) -> bytes:
+        with timed("encode"):
+            return pydantic_core.to_json(content, by_alias=True)
+
+
+def _trusted_endpoint(endpoint: ENDPOINT, status_code: int | None) -> ENDPOINT:
+    """
+    Wrap the endpoint to answer its return value without the response model validation.
+
+    FastAPI skips the validation and serialization of a returned response, so the
+    wrapper builds it, taking the status code and headers set on the injected one.
+
+    Args:
+        endpoint (ENDPOINT): route endpoint
+        status_code (int | None): default status code of the route
+
+    Returns:
+        ENDPOINT: wrapped endpoint with the same signature
+
+    """
+    signature = inspect.signature(endpoint)
+    parameters = list(signature.parameters.values())
+    response_param = next((p.name for p in parameters if p.annotation is Response), None)
+    injected = response_param is None
+
+    if response_param is None:
+        response_param = _RESPONSE_PARAM
+        parameters.append(
+            inspect.Parameter(
+                _RESPONSE_PARAM,
+                inspect.Parameter.KEYWORD_ONLY,
+                annotation=Response,
+            )
+        )
+
+    @functools.wraps(endpoint)
+    async def wrapper(**kwargs: Any) -> Response:  # noqa: ANN401
+        sub_response: Response = kwargs.pop(response_param) if injected else kwargs[response_param]
+        content = await endpoint(**kwargs)
+
+        if isinstance(content, Response):
+            return content
+
+        response = TrustedJSONResponse(
+            content,
+            status_code=sub_response.status_code or status_code or 200,
+        )
+        response.raw_headers.extend(sub_response.headers.raw)
+        return response
+
+    wrapper.__signature__ = signature.replace(parameters=parameters)  # type: ignore[reportFunctionMemberAccess]
+    return wrapper
+
+
+class TrustedRoute(APIRoute):
+    """
+    Route serializing the endpoint output without re-validating it.
+
+    The services already build the response models with model_validate, FastAPI would
+    validate them again against the return annotation, dump them to python objects and
+    encode these with json. The return annotation still documents the response schema.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:  # noqa: ANN401
+        """
+        Initialize the route.
+
+        Args:
+            path (str): route path
+            endpoint (Callable[..., Any]): route endpoint
+            kwargs (Any): APIRoute options
+
+        """
+        if settings.responses.trusted and inspect.iscoroutinefunction(endpoint):
+            endpoint = _trusted_endpoint(endpoint, kwargs.get("status_code"))
+
+        super().__init__(path, endpoint, **kwargs)
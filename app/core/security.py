@@ -1,18 +1,26 @@
-from typing import Annotated
+import functools
+from contextlib import suppress
+from typing import TYPE_CHECKING, Annotated, Final
 
 import jwt
-from fastapi import Cookie, Response
-from passlib.context import CryptContext
+from fastapi import Cookie, HTTPException, Request, Response
 
 import app.core.exceptions as exc
 from app.core.config import settings
+from app.core.timing import timed
 from app.schemas import Payload, Role, TokensCreate, TokensRead, TokenType
 
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+_CLAIMS_STATE: Final[str] = "token_claims"
+
 
 class Token:
     async def __call__(
         self,
         tokens: Annotated[TokensRead, Cookie()],
+        request: Request,
         response: Response,
     ) -> Payload:
         """
@@ -24,20 +32,24 @@ class Token:
 
         Args:
             tokens (TokensRead): client's tokens
+            request (Request): request from the client
             response (Response): response to the client
 
         Returns:
             Payload: payload data
 
         """
-        if tokens.access_token is None:
-            if tokens.refresh_token is None:
-                return Payload(user_id=0, user_role=Role.guest, token_type=TokenType.guest_token)
+        with timed("token"):
+            if tokens.access_token is None:
+                if tokens.refresh_token is None:
+                    return Payload(
+                        user_id=0, user_role=Role.guest, token_type=TokenType.guest_token
+                    )
 
-            payload = self._decode(tokens.refresh_token)
-            return self._decode(self._update_tokens(response, payload))
+                payload = self._claims(request, tokens.refresh_token)
+                return self._decode(self._update_tokens(response, payload))
 
-        return self._decode(tokens.access_token)
+            return self._claims(request, tokens.access_token)
 
     @classmethod
     def _update_tokens(cls, response: Response, payload: Payload) -> str:
@@ -74,6 +86,41 @@ class Token:
         else:
             return Payload(**payload_data)
 
+    @classmethod
+    def _claims(cls, request: Request, token: str) -> Payload:
+        # the rate limiter and every auth dependency of the request read the same tokens
+        claims: dict[str, Payload] | None = getattr(request.state, _CLAIMS_STATE, None)
+
+        if claims is None:
+            claims = {}
+            setattr(request.state, _CLAIMS_STATE, claims)
+
+        if (payload := claims.get(token)) is None:
+            payload = claims[token] = cls._decode(token)
+
+        return payload
+
+    @classmethod
+    def identify(cls, request: Request) -> Payload | None:
+        """
+        Decode the client's identity without validating or refreshing the session.
+
+        The decoded tokens are kept on the request for the auth dependencies.
+
+        Args:
+            request (Request): request from the client
+
+        Returns:
+            Payload | None: payload data of the first valid token
+
+        """
+        for token_type in (TokenType.access_token, TokenType.refresh_token):
+            if (token := request.cookies.get(token_type)) is not None:
+                with suppress(HTTPException):
+                    return cls._claims(request, token)
+
+        return None
+
     @classmethod
     def create(cls, payload: Payload) -> str:
         """
@@ -117,7 +164,19 @@ class Token:
 
 
 class Password:
-    context = CryptContext(schemes=["bcrypt"])
+    @staticmethod
+    @functools.cache
+    def context() -> "CryptContext":
+        """
+        Build the hashing context on the first use, passlib is not imported at startup.
+
+        Returns:
+            CryptContext: password hashing context
+
+        """
+        from passlib.context import CryptContext  # noqa: PLC0415
+
+        return CryptContext(schemes=["bcrypt"])
 
     @classmethod
     def verify(cls, plain_password: str, hashed_password: str) -> bool:
@@ -132,7 +191,7 @@ class Password:
             bool: comparison status
 
         """
-        return cls.context.verify(plain_password, hashed_password)
+        return cls.context().verify(plain_password, hashed_password)
 
     @classmethod
     def hash(cls, password: str) -> str:
@@ -146,4 +205,4 @@ class Password:
             str: hashed password
 
         """
-        return cls.context.hash(password)
+        return cls.context().hash(password)
@@ -0,0 +1,273 @@
+import gc
+import importlib
+import os
+import random
+import resource
+import signal
+import time
+from pathlib import Path
+from types import FrameType
+from typing import TYPE_CHECKING, Final, final, override
+
+import uvicorn
+from loguru import logger
+
+from app.core.config import settings
+from app.core.drain import drain
+from app.core.metrics import registry
+
+if TYPE_CHECKING:
+    import socket
+
+    from fastapi import FastAPI
+
+APP: Final[str] = "app.main:app"
+_STATM: Final[Path] = Path("/proc/self/statm")
+_MIN_WORKER_LIFETIME: Final[float] = 1.0
+_REAP_INTERVAL: Final[float] = 0.1
+
+
+def current_rss() -> int:
+    """
+    Get the resident set size of the current process.
+
+    Returns:
+        int: resident memory in bytes, the peak one where /proc is not available
+
+    """
+    try:
+        resident_pages = int(_STATM.read_bytes().split()[1])
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class RecyclingServer(uvicorn.Server):
+    """
+    Uvicorn server draining on shutdown and recycled over its memory limit.
+
+    The first exit signal starts the drain instead of stopping the server, which
+    shuts down once the grace period is over. A second signal stops it at once.
+    """
+
+    @override
+    def handle_exit(self, sig: int, frame: FrameType | None) -> None:
+        if drain.draining or settings.drain.grace == 0:
+            super().handle_exit(sig, frame)
+            return
+
+        # signal handler: no logging nor metrics, the tick announces the drain
+        drain.request()
+
+    @override
+    async def on_tick(self, counter: int) -> bool:
+        drain.announce()
+
+        if drain.refusing:
+            return True
+
+        limit_mb = settings.run.max_memory_mb
+
+        # the server ticks every 0.1 s, the memory is checked once a second
+        if limit_mb is not None and counter % 10 == 0 and (rss := current_rss()) > limit_mb << 20:
+            logger.warning(
+                "Worker {pid} uses {rss_mb} MB over the {limit_mb} MB limit, recycling it.",
+                pid=os.getpid(),
+                rss_mb=rss >> 20,
+                limit_mb=limit_mb,
+            )
+            return True
+
+        return await super().on_tick(counter)
+
+
+def server_config(max_requests: int | None = None) -> uvicorn.Config:
+    """
+    Build the uvicorn configuration from the run settings.
+
+    Args:
+        max_requests (int | None, optional): requests before the worker exits.
+            Defaults to None.
+
+    Returns:
+        uvicorn.Config: server configuration
+
+    """
+    run = settings.run
+    return uvicorn.Config(
+        APP,
+        host=run.host,
+        port=run.port,
+        loop=run.loop,
+        http=run.http,
+        backlog=run.backlog,
+        timeout_keep_alive=run.keep_alive,
+        timeout_graceful_shutdown=int(run.graceful_timeout),
+        limit_max_requests=max_requests,
+    )
+
+
+@final
+class Supervisor:
+    """
+    Pre-fork master process.
+
+    The application is imported once and its objects are moved to the permanent
+    generation with gc.freeze(), so that the garbage collector of the workers does not
+    touch, and copy, the pages shared with the master. Exited workers are replaced,
+    which recycles them after max_requests or max_memory_mb.
+    """
+
+    __slots__ = ("_signals", "_socket", "_stopping", "_workers")
+
+    def __init__(self) -> None:
+        """Initialize the supervisor."""
+        self._workers: dict[int, float] = {}
+        self._signals = {signal.SIGCHLD, signal.SIGINT, signal.SIGTERM}
+        self._socket: socket.socket | None = None
+        self._stopping = False
+
+    def run(self) -> int:
+        """
+        Preload the application, fork the workers and supervise them until stopped.
+
+        Returns:
+            int: exit code
+
+        """
+        # no collection may run between the import and the freeze
+        gc.disable()
+        module, _, name = APP.partition(":")
+        application: FastAPI = getattr(importlib.import_module(module), name)
+        # the workers inherit the schema instead of each building it on the first /docs hit
+        _ = application.openapi()
+        registry.clear()
+        self._socket = server_config().bind_socket()
+        gc.collect()
+        gc.freeze()
+
+        _ = signal.pthread_sigmask(signal.SIG_BLOCK, self._signals)
+        logger.info("Master {pid} starts {count} workers.", pid=os.getpid(), count=self.count)
+
+        try:
+            for _ in range(self.count):
+                self._spawn()
+
+            while not self._stopping:
+                if signal.sigwait(self._signals) == signal.SIGCHLD:
+                    self._reap(respawn=True)
+                else:
+                    self._stop()
+        finally:
+            self._socket.close()
+
+        return 0
+
+    @property
+    def count(self) -> int:
+        """
+        Number of the workers to run.
+
+        Returns:
+            int: worker count
+
+        """
+        return max(1, settings.run.workers)
+
+    def _spawn(self) -> None:
+        if (pid := os.fork()) != 0:
+            self._workers[pid] = time.monotonic()
+            return
+
+        exit_code = 0
+
+        try:
+            _ = signal.pthread_sigmask(signal.SIG_UNBLOCK, self._signals)
+
+            gc.enable()
+            self._serve()
+        except BaseException:  # noqa: BLE001
+            logger.exception("Worker {pid} crashed.", pid=os.getpid())
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _serve(self) -> None:
+        run = settings.run
+        max_requests = run.max_requests
+
+        # the jitter keeps the workers started together from recycling together
+        if max_requests is not None:
+            max_requests += random.randint(0, run.max_requests_jitter)  # noqa: S311
+
+        server = RecyclingServer(server_config(max_requests))
+        server.run(sockets=[self._socket] if self._socket is not None else None)
+
+    def _reap(self, *, respawn: bool) -> None:
+        while self._workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+
+            if pid == 0:
+                return
+
+            if (started := self._workers.pop(pid, None)) is None:
+                continue
+
+            exit_code = os.waitstatus_to_exitcode(status)
+            logger.info("Worker {pid} exited with code {code}.", pid=pid, code=exit_code)
+
+            if not respawn:
+                continue
+
+            # a worker failing at startup must not turn the master into a fork loop
+            if time.monotonic() - started < _MIN_WORKER_LIFETIME:
+                time.sleep(_MIN_WORKER_LIFETIME)
+
+            self._spawn()
+
+    def _stop(self) -> None:
+        self._stopping = True
+        logger.info("Master {pid} stops the workers.", pid=os.getpid())
+        self._signal_workers(signal.SIGTERM)
+        # the workers drain, finish the in-flight requests, then run the lifespan shutdown
+        grace = settings.drain.grace + settings.run.graceful_timeout + settings.drain.timeout
+        deadline = time.monotonic() + grace
+
+        while self._workers and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(_REAP_INTERVAL)
+
+        if self._workers:
+            logger.warning("Killing {count} workers still running.", count=len(self._workers))
+            self._signal_workers(signal.SIGKILL)
+
+            for pid in self._workers:
+                _ = os.waitpid(pid, 0)
+
+            self._workers.clear()
+
+    def _signal_workers(self, signum: signal.Signals) -> None:
+        for pid in self._workers:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                continue
+
+
+def main() -> int:
+    """
+    Run the production server.
+
+    Returns:
+        int: exit code
+
+    """
+    if not hasattr(os, "fork"):
+        RecyclingServer(server_config()).run()
+        return 0
+
+    return Supervisor().run()
@@ -0,0 +1,135 @@
+import time
+from collections.abc import Callable, Coroutine, Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, final
+
+
+@final
+class ServerTiming:
+    """Per-request breakdown of the processing time."""
+
+    __slots__ = ("descriptions", "durations")
+
+    def __init__(self) -> None:
+        """Initialize the request timing."""
+        self.durations: dict[str, int] = {}
+        self.descriptions: dict[str, str] = {}
+
+    def add(self, name: str, duration_ns: int) -> None:
+        """
+        Add the duration to the metric.
+
+        Args:
+            name (str): metric name
+            duration_ns (int): duration in nanoseconds
+
+        """
+        self.durations[name] = self.durations.get(name, 0) + duration_ns
+
+    def describe(self, name: str, description: str) -> None:
+        """
+        Attach a description to the metric.
+
+        Args:
+            name (str): metric name
+            description (str): metric description
+
+        """
+        self.descriptions[name] = description
+
+    def header(self, total_ns: int) -> str:
+        """
+        Render the ``Server-Timing`` header value.
+
+        Args:
+            total_ns (int): total processing time in nanoseconds
+
+        Returns:
+            str: header value
+
+        """
+        metrics = [
+            f'{name};desc="{self.descriptions[name]}";dur={ns / 1e6:.3f}'
+            if name in self.descriptions
+            else f"{name};dur={ns / 1e6:.3f}"
+            for name, ns in self.durations.items()
+        ]
+        metrics.append(f"total;dur={total_ns / 1e6:.3f}")
+        return ", ".join(metrics)
+
+    def fields(self) -> dict[str, float]:
+        """
+        Durations in milliseconds for structured logging.
+
+        Returns:
+            dict[str, float]: metric durations
+
+        """
+        return {name: round(ns / 1e6, 3) for name, ns in self.durations.items()}
+
+
+server_timing: ContextVar[ServerTiming | None] = ContextVar("server_timing", default=None)
+
+
+def record_timing(name: str, duration_ns: int) -> None:
+    """
+    Add the duration to the current request timing, if any.
+
+    Args:
+        name (str): metric name
+        duration_ns (int): duration in nanoseconds
+
+    """
+    if (timing := server_timing.get()) is not None:
+        timing.add(name, duration_ns)
+
+
+@contextmanager
+def timed(name: str) -> Generator[None]:
+    """
+    Measure the block into the current request timing.
+
+    Args:
+        name (str): metric name
+
+    Yields:
+        Generator[None]: measured block
+
+    """
+    if (timing := server_timing.get()) is None:
+        yield
+        return
+
+    start = time.perf_counter_ns()
+
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter_ns() - start)
+
+
+def timed_async[**P, R](
+    name: str,
+) -> Callable[[Callable[P, Coroutine[Any, Any, R]]], Callable[P, Coroutine[Any, Any, R]]]:
+    """
+    Measure the coroutine function into the current request timing.
+
+    Args:
+        name (str): metric name
+
+    Returns:
+        Callable: coroutine function decorator
+
+    """
+
+    def decorator(func: Callable[P, Coroutine[Any, Any, R]]) -> Callable[P, Coroutine[Any, Any, R]]:
+        @wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            with timed(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
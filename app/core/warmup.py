@@ -0,0 +1,85 @@
+import asyncio
+import time
+from typing import final
+
+from fastapi import FastAPI
+from loguru import logger
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.core.metrics import app_warmup_seconds, app_workers_ready
+from app.core.rate_limiter import limiter
+from app.database import SqlAlchemyDB
+from app.database.warmup import warm_up_database
+
+
+@final
+class Readiness:
+    """Whether the worker is ready to take traffic."""
+
+    __slots__ = ("_ready",)
+
+    def __init__(self) -> None:
+        """Initialize the readiness, not ready until the warmup is over."""
+        self._ready = False
+
+    @property
+    def ready(self) -> bool:
+        """
+        Readiness of the worker.
+
+        Returns:
+            bool: True once the worker may take traffic
+
+        """
+        return self._ready
+
+    def set(self, *, ready: bool) -> None:
+        """
+        Report the readiness.
+
+        Args:
+            ready (bool): worker readiness
+
+        """
+        self._ready = ready
+        app_workers_ready.set(int(ready))
+
+
+readiness = Readiness()
+
+
+async def warm_up(app: FastAPI, db: SqlAlchemyDB) -> None:
+    """
+    Open the connections and prime the caches before reporting the worker ready.
+
+    A failed or timed out warmup is logged and the worker serves cold.
+
+    Args:
+        app (FastAPI): application
+        db (SqlAlchemyDB): database helper
+
+    """
+    config = settings.warmup
+
+    if config.enabled:
+        started = time.perf_counter()
+
+        try:
+            async with asyncio.timeout(config.timeout):
+                await limiter.warm_up()
+                await warm_up_database(db.session_factory, app.routes)
+        # the connections are warmed up in a task group, their errors come grouped
+        except* (TimeoutError, OSError, RedisError, SQLAlchemyError) as errors:
+            logger.warning(
+                "Warmup failed, serving cold: {errors!r}", errors=list(errors.exceptions)
+            )
+        else:
+            logger.info(
+                "Warmup completed in {seconds:.2f} s.", seconds=time.perf_counter() - started
+            )
+        finally:
+            app_warmup_seconds.observe(time.perf_counter() - started)
+
+    readiness.set(ready=True)
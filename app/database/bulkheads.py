@@ -0,0 +1,149 @@
+import asyncio
+from collections.abc import Callable, Mapping
+from typing import Any, Final, final
+
+from loguru import logger
+
+import app.core.exceptions as exc
+from app.core.config import settings
+from app.core.context import request_context
+from app.core.metrics import (
+    db_bulkhead_in_use,
+    db_bulkhead_rejections_total,
+    db_bulkhead_saturation_total,
+)
+
+BULKHEAD_ATTR: Final[str] = "__bulkhead__"
+READ_METHODS: Final[frozenset[str]] = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def bulkhead[Endpoint: Callable[..., Any]](name: str) -> Callable[[Endpoint], Endpoint]:
+    """
+    Assign the endpoint to a database connection quota.
+
+    Endpoints without a bulkhead use 'read' for safe methods and 'write' otherwise.
+
+    Args:
+        name (str): bulkhead name from settings.db.bulkheads.quotas
+
+    Returns:
+        Callable[[Endpoint], Endpoint]: endpoint decorator
+
+    """
+
+    def decorator(endpoint: Endpoint) -> Endpoint:
+        setattr(endpoint, BULKHEAD_ATTR, name)
+        return endpoint
+
+    return decorator
+
+
+@final
+class Bulkhead:
+    """Quota of concurrently checked out connections shared by a class of routes."""
+
+    __slots__ = ("_semaphore", "limit", "name")
+
+    def __init__(self, name: str, limit: int) -> None:
+        """
+        Initialize the bulkhead.
+
+        Args:
+            name (str): bulkhead name
+            limit (int): connections the routes of the class may hold at once
+
+        """
+        self.name = name
+        self.limit = limit
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> None:
+        """
+        Take a connection slot, wait for a free one up to the configured timeout.
+
+        Raises:
+            ServiceUnavailableError: no slot was released in time
+
+        """
+        if self._semaphore.locked():
+            db_bulkhead_saturation_total.labels(self.name).inc()
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+
+            try:
+                async with asyncio.timeout(settings.db.bulkheads.acquire_timeout):
+                    _ = await self._semaphore.acquire()
+            except TimeoutError:
+                db_bulkhead_rejections_total.labels(self.name).inc()
+                logger.bind(type="db_pool", bulkhead=self.name).warning(
+                    "Bulkhead '{bulkhead}' is saturated, rejecting the request.",
+                    bulkhead=self.name,
+                )
+                raise exc.ServiceUnavailableError(
+                    settings.db.bulkheads.retry_after,
+                    "Database capacity is exhausted.",
+                ) from None
+
+            if (waited := loop.time() - start) >= settings.db.bulkheads.slow_wait:
+                logger.bind(type="db_pool", bulkhead=self.name, waited=waited).warning(
+                    "Bulkhead '{bulkhead}' is saturated, waited {waited:.3f} s for a connection.",
+                    bulkhead=self.name,
+                    waited=waited,
+                )
+        else:
+            _ = await self._semaphore.acquire()
+
+        db_bulkhead_in_use.labels(self.name).inc()
+
+    def release(self) -> None:
+        """Return the connection slot."""
+        self._semaphore.release()
+        db_bulkhead_in_use.labels(self.name).dec()
+
+
+@final
+class Bulkheads:
+    """Route classes isolated from each other in the connection pool."""
+
+    __slots__ = ("_bulkheads",)
+
+    def __init__(self, quotas: Mapping[str, int]) -> None:
+        """
+        Initialize the bulkheads.
+
+        Args:
+            quotas (Mapping[str, int]): connection quota by bulkhead name
+
+        """
+        self._bulkheads = {name: Bulkhead(name, limit) for name, limit in quotas.items()}
+        capacity = settings.db.pool_size + settings.db.max_overflow
+
+        if (total := sum(quotas.values())) > capacity:
+            logger.warning(
+                "Bulkhead quotas ({total}) exceed the pool capacity ({capacity}), "
+                "route classes may still queue behind each other in the pool.",
+                total=total,
+                capacity=capacity,
+            )
+
+    def resolve(self) -> Bulkhead | None:
+        """
+        Get the bulkhead of the request being processed.
+
+        Returns:
+            Bulkhead | None: bulkhead, None outside of a request or for an unknown name
+
+        """
+        if not settings.db.bulkheads.enabled or (context := request_context.get()) is None:
+            return None
+
+        route = context.scope.get("route")
+        name = getattr(route.endpoint, BULKHEAD_ATTR, None) if route is not None else None
+
+        if name is None:
+            name = "read" if context.scope["method"] in READ_METHODS else "write"
+
+        return self._bulkheads.get(name)
+
+
+bulkheads = Bulkheads(settings.db.bulkheads.quotas)
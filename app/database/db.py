@@ -1,16 +1,131 @@
+import uuid
 from abc import ABC, abstractmethod
 from collections.abc import AsyncGenerator
-from typing import Self, final, override
+from typing import Any, Self, final, override
 
+from sqlalchemy import Connection, event, func, make_url, select, true
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session, SessionTransaction
+from sqlalchemy.pool import QueuePool
 
 import app.core.exceptions as exc
 from app.core.config import settings
+from app.core.deadlines import remaining_time
+from app.core.metrics import (
+    db_pool_checked_out,
+    db_pool_exhausted_total,
+    db_pool_overflow,
+    db_pool_size,
+)
+from app.database.instrumentation import instrument_engine
+
+
+def _instrument_pool(engine: AsyncEngine) -> None:
+    """
+    Mirror the connection pool usage into the metrics.
+
+    Args:
+        engine (AsyncEngine): database engine
+
+    """
+    pool = engine.sync_engine.pool
+
+    if not isinstance(pool, QueuePool):
+        return
+
+    capacity = pool.size() + settings.db.max_overflow
+
+    def update(*_: object) -> int:
+        checked_out = pool.checkedout()
+        db_pool_checked_out.set(checked_out)
+        db_pool_overflow.set(max(pool.overflow(), 0))
+        return checked_out
+
+    def checkout(*_: object) -> None:
+        if update() >= capacity:
+            db_pool_exhausted_total.inc()
+
+    db_pool_size.set(pool.size())
+    event.listen(pool, "checkout", checkout)
+    event.listen(pool, "checkin", update)
+
+
+class DeadlineSession(Session):
+    """Session applying the request budget as the statement timeout of each transaction."""
+
+
+def _pool_statement_timeout() -> float | None:
+    # PgBouncer does not pass the startup parameters on, every transaction sets its own
+    if not settings.deadlines.statement_timeout or settings.db.statements.pgbouncer:
+        return None
+    return settings.deadlines.default
+
+
+@event.listens_for(DeadlineSession, "after_begin")
+def _apply_deadline(
+    _session: Session, _transaction: SessionTransaction, connection: Connection
+) -> None:
+    if not settings.deadlines.statement_timeout or connection.dialect.name != "postgresql":
+        return
+
+    if (budget := remaining_time()) is None:
+        return
+
+    # near the connection default a SET would cost a round trip for nothing, a longer
+    # budget must still raise the default or its statements are cancelled early
+    if (default := _pool_statement_timeout()) is not None and (
+        abs(budget - default) <= settings.deadlines.statement_timeout_slack
+    ):
+        return
+
+    # set_config(..., is_local => true) is SET LOCAL with a bound parameter, zero would
+    # disable the timeout, an expired budget is left to the request timeout
+    timeout_ms = max(1, int(budget * 1000))
+    _ = connection.execute(select(func.set_config("statement_timeout", str(timeout_ms), true())))
+
+
+def _statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+
+def _connect_args(url: str) -> dict[str, Any]:
+    """
+    Driver arguments of the prepared statement cache.
+
+    Args:
+        url (str): connection url
+
+    Returns:
+        dict[str, Any]: asyncpg connection arguments, empty for the other drivers
+
+    """
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+
+    config = settings.db.statements
+
+    if config.pgbouncer:
+        # the next transaction may run on another server connection, where neither the
+        # cached statements nor the numbered names of asyncpg exist
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _statement_name,
+        }
+
+    connect_args: dict[str, Any] = {
+        "prepared_statement_cache_size": config.prepared_statement_cache_size
+    }
+
+    if (timeout := _pool_statement_timeout()) is not None:
+        connect_args["server_settings"] = {"statement_timeout": str(int(timeout * 1000))}
+
+    return connect_args
 
 
 class DbBase[Engine, Session, SessionFactory](ABC):
@@ -93,20 +208,61 @@ class SqlAlchemyDB(DbBase[AsyncEngine, AsyncSession, async_sessionmaker[AsyncSes
             echo_pool=settings.db.echo_pool,
             pool_size=settings.db.pool_size,
             max_overflow=settings.db.max_overflow,
+            pool_pre_ping=settings.db.pool_pre_ping,
+            pool_recycle=settings.db.pool_recycle,
+            query_cache_size=settings.db.statements.compiled_cache_size,
+            connect_args=_connect_args(url),
         )
+        _instrument_pool(self._engine)
+        instrument_engine(self._engine)
         self._session_factory = async_sessionmaker(
             bind=self._engine,
+            sync_session_class=DeadlineSession,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
         )
 
+    @property
+    def saturated(self) -> bool:
+        """
+        Whether every connection the pool may open is checked out.
+
+        Returns:
+            bool: True when a checkout would wait for a connection
+
+        """
+        if self._engine is None:
+            return False
+
+        pool = self._engine.sync_engine.pool
+
+        if not isinstance(pool, QueuePool):
+            return False
+
+        return pool.checkedout() >= pool.size() + settings.db.max_overflow
+
+    async def ping(self) -> None:
+        """
+        Run a trivial statement on a pooled connection.
+
+        Raises:
+            DatabaseSessionError: engine is not initialized
+
+        """
+        if self._engine is None:
+            raise exc.DatabaseSessionError
+
+        async with self._engine.connect() as connection:
+            _ = await connection.execute(select(1))
+
     @override
     async def close(self) -> None:
         if self._engine is None:
             return
 
         await self._engine.dispose()
+        db_pool_size.set(0)
         self._engine = None
         self._session_factory = None
 
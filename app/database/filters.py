@@ -0,0 +1,302 @@
+import operator
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any, Final, Literal, Protocol, final
+
+from sqlalchemy import (
+    BindParameter,
+    ColumnElement,
+    Integer,
+    PrimaryKeyConstraint,
+    Select,
+    Table,
+    UniqueConstraint,
+    bindparam,
+    select,
+)
+from sqlalchemy.orm import DeclarativeBase
+
+from app.core.exceptions import QueryValueError
+
+type OPERATOR = Literal["eq", "in", "gte", "lte", "prefix", "contains", "null"]
+type SORT_KEY = tuple[str, bool]
+type COMPARISON = Callable[[ColumnElement[Any], BindParameter[Any]], ColumnElement[bool]]
+type SIGNATURE = tuple[tuple[tuple[str, bool], ...], tuple[SORT_KEY, ...]]
+
+_TIEBREAKER: Final[str] = "id"
+_LIKE_ESCAPE: Final[str] = "/"
+_MAX_SHAPES: Final[int] = 256
+_COMPARISONS: Final[dict[str, COMPARISON]] = {
+    "eq": operator.eq,
+    "gte": operator.ge,
+    "lte": operator.le,
+    "in": lambda column, parameter: column.in_(parameter),
+    "prefix": lambda column, parameter: column.like(parameter, escape=_LIKE_ESCAPE),
+    "contains": lambda column, parameter: column.ilike(parameter, escape=_LIKE_ESCAPE),
+}
+
+
+class SearchFilters(Protocol):
+    """Pagination and sort parameters shared by the search filter schemas."""
+
+    limit: int
+    offset: int
+    sort_by: str
+
+
+def _escape_like(value: str) -> str:
+    return (
+        value.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2)
+        .replace("%", f"{_LIKE_ESCAPE}%")
+        .replace("_", f"{_LIKE_ESCAPE}_")
+    )
+
+
+def indexed_columns(table: Table) -> frozenset[str]:
+    """
+    Columns leading an index of the table, the ones an ordered scan can sort by.
+
+    Args:
+        table (Table): mapped table
+
+    Returns:
+        frozenset[str]: column names
+
+    """
+    leading = [
+        next(iter(constraint.columns)).name
+        for constraint in table.constraints
+        if isinstance(constraint, PrimaryKeyConstraint | UniqueConstraint) and constraint.columns
+    ]
+    leading.extend(
+        next(iter(index.columns)).name for index in table.indexes if len(index.columns) > 0
+    )
+    return frozenset(leading)
+
+
+def pattern_indexed_columns(table: Table) -> frozenset[str]:
+    """
+    Columns leading a pattern ops index, the ones a LIKE prefix can search.
+
+    Under a non-C collation a default btree index does not serve LIKE 'prefix%'.
+
+    Args:
+        table (Table): mapped table
+
+    Returns:
+        frozenset[str]: column names
+
+    """
+    leading: list[str] = []
+
+    for index in table.indexes:
+        if len(index.columns) == 0:
+            continue
+
+        column = next(iter(index.columns)).name
+        ops = index.dialect_options["postgresql"]["ops"] or {}
+
+        if str(ops.get(column, "")).endswith("_pattern_ops"):
+            leading.append(column)
+
+    return frozenset(leading)
+
+
+@final
+class FilterField:
+    """Search filter field applied to a model column."""
+
+    __slots__ = ("column", "operator")
+
+    def __init__(self, column: str, operator: OPERATOR = "eq") -> None:
+        """
+        Initialize the filter field.
+
+        Args:
+            column (str): filtered column name
+            operator (OPERATOR, optional): comparison with the field value. Defaults to "eq".
+
+        """
+        self.column = column
+        self.operator: OPERATOR = operator
+
+    def parameter(self, value: Any) -> Any:  # noqa: ANN401
+        """
+        Convert the field value to the bound parameter value.
+
+        Args:
+            value (Any): field value
+
+        Returns:
+            Any: parameter value
+
+        """
+        if self.operator == "prefix":
+            return f"{_escape_like(value)}%"
+        if self.operator == "contains":
+            return f"%{_escape_like(value)}%"
+        return value
+
+    def clause(
+        self, column: ColumnElement[Any], name: str, *, is_null: bool
+    ) -> ColumnElement[bool]:
+        """
+        Build the condition on the column.
+
+        Args:
+            column (ColumnElement[Any]): filtered column
+            name (str): bound parameter name
+            is_null (bool): null test value, for the 'null' operator
+
+        Returns:
+            ColumnElement[bool]: filter condition
+
+        """
+        if self.operator == "null":
+            return column.is_(None) if is_null else column.is_not(None)
+
+        parameter = bindparam(name, expanding=self.operator == "in")
+        return _COMPARISONS[self.operator](column, parameter)
+
+
+@final
+class FilterSpec[Model: DeclarativeBase]:
+    """
+    Declarative search filter of a model.
+
+    The sort keys are restricted to the indexed columns and always end with the id, so
+    that the pages are stable. The query of each filter signature, the fields set and
+    the sort, is built once with bound parameters: the later requests skip both the
+    query construction and the SQL compilation.
+    """
+
+    __slots__ = ("_columns", "_fields", "_model", "_scope", "_shapes", "sortable")
+
+    def __init__(
+        self,
+        model: type[Model],
+        fields: Mapping[str, FilterField],
+        sortable: Iterable[str] = (_TIEBREAKER,),
+        scope: Iterable[str] = (),
+    ) -> None:
+        """
+        Initialize the filter specification.
+
+        Args:
+            model (type[Model]): filtered model
+            fields (Mapping[str, FilterField]): filter fields by schema attribute name
+            sortable (Iterable[str], optional): sort key columns. Defaults to the id.
+            scope (Iterable[str], optional): columns always compared to the caller's
+                values. Defaults to ().
+
+        Raises:
+            TypeError: model is not mapped to a table
+            ValueError: unknown column, sort key or prefix filter without an index
+
+        """
+        table = model.__table__
+
+        if not isinstance(table, Table):
+            exc_msg = f"{model.__name__} is not mapped to a table."
+            raise TypeError(exc_msg)
+
+        self._model = model
+        self._columns = table.columns
+        self._fields = dict(fields)
+        self._scope = tuple(scope)
+        self.sortable = frozenset((*sortable, _TIEBREAKER))
+        self._shapes: dict[SIGNATURE, Select[Any]] = {}
+
+        columns = {field.column for field in self._fields.values()} | set(self._scope)
+
+        if unknown := columns - set(self._columns.keys()):
+            exc_msg = f"{table.name} has no columns {sorted(unknown)}."
+            raise ValueError(exc_msg)
+
+        if unindexed := self.sortable - indexed_columns(table):
+            exc_msg = f"{table.name} sort keys without an index: {sorted(unindexed)}."
+            raise ValueError(exc_msg)
+
+        prefixed = {field.column for field in self._fields.values() if field.operator == "prefix"}
+
+        if unindexed := prefixed - pattern_indexed_columns(table):
+            exc_msg = f"{table.name} prefix filters without a pattern index: {sorted(unindexed)}."
+            raise ValueError(exc_msg)
+
+    def query(self, filters: SearchFilters, **scope: object) -> tuple[Select[Any], dict[str, Any]]:
+        """
+        Get the query of the search filter and its parameters.
+
+        Args:
+            filters (SearchFilters): search filter
+            scope (object): values of the scope columns
+
+        Returns:
+            tuple[Select[Any], dict[str, Any]]: column values query and bound parameters
+
+        """
+        params: dict[str, Any] = {f"scope_{name}": scope[name] for name in self._scope}
+        params["limit"] = filters.limit
+        params["offset"] = filters.offset
+        active: list[tuple[str, bool]] = []
+
+        for name, field in self._fields.items():
+            if (value := getattr(filters, name)) is None:
+                continue
+
+            # the null tests change the query text, the other values are parameters
+            if field.operator == "null":
+                active.append((name, bool(value)))
+            else:
+                active.append((name, False))
+                params[f"filter_{name}"] = field.parameter(value)
+
+        signature = (tuple(active), self._sort_keys(filters.sort_by))
+
+        if (query := self._shapes.get(signature)) is None:
+            query = self._build(signature)
+
+            # the shapes are bounded by the fields and sort keys, the cap guards the memory
+            if len(self._shapes) < _MAX_SHAPES:
+                self._shapes[signature] = query
+
+        return query, params
+
+    def _sort_keys(self, sort_by: str) -> tuple[SORT_KEY, ...]:
+        keys: list[SORT_KEY] = []
+
+        for item in sort_by.split(","):
+            key = item.strip()
+            name = key.removeprefix("-")
+
+            if name not in self.sortable:
+                raise QueryValueError(name, "sort-by")
+
+            # a repeated key cannot change the order
+            if all(name != known for known, _ in keys):
+                keys.append((name, key.startswith("-")))
+
+        if all(name != _TIEBREAKER for name, _ in keys):
+            keys.append((_TIEBREAKER, False))
+
+        return tuple(keys)
+
+    def _build(self, signature: SIGNATURE) -> Select[Any]:
+        active, sort_keys = signature
+        columns = self._columns
+        query = select(self._model).with_only_columns(*columns)
+
+        for name in self._scope:
+            query = query.where(columns[name] == bindparam(f"scope_{name}"))
+
+        for name, is_null in active:
+            field = self._fields[name]
+            query = query.where(
+                field.clause(columns[field.column], f"filter_{name}", is_null=is_null)
+            )
+
+        order = [columns[name].desc() if desc else columns[name].asc() for name, desc in sort_keys]
+        return (
+            query.order_by(*order)
+            .limit(bindparam("limit", type_=Integer))
+            .offset(bindparam("offset", type_=Integer))
+        )
@@ -0,0 +1,298 @@
+import functools
+import re
+import time
+from collections.abc import Callable, Coroutine
+from contextvars import ContextVar
+from typing import Any, Concatenate, Final, final
+from urllib.parse import quote
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext, ExecutionContext
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.context import request_context
+from app.core.metrics import (
+    db_compiled_cache_total,
+    db_prepared_statements_total,
+    db_statements_total,
+)
+from app.core.timing import record_timing
+
+_START_KEY: Final[str] = "query_start_ns"
+_WHITESPACE: Final[re.Pattern[str]] = re.compile(r"\s+")
+_STRING_LITERAL: Final[re.Pattern[str]] = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL: Final[re.Pattern[str]] = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER: Final[re.Pattern[str]] = re.compile(r"\$\d+|%\(\w+\)s|%s|:\w+|\?")
+_PLACEHOLDER_LIST: Final[re.Pattern[str]] = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_COMPILED_CACHE_RESULTS: Final[dict[CacheStats, str]] = {
+    CacheStats.CACHE_HIT: "hit",
+    CacheStats.CACHE_MISS: "miss",
+    CacheStats.NO_CACHE_KEY: "uncached",
+    CacheStats.CACHING_DISABLED: "disabled",
+    CacheStats.NO_DIALECT_SUPPORT: "disabled",
+}
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce the statement to its shape: literals and bound parameters become '?'.
+
+    Args:
+        statement (str): SQL statement
+
+    Returns:
+        str: normalized statement
+
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+@final
+class QueryStats:
+    """SQL statements executed on behalf of one request."""
+
+    __slots__ = ("count", "path", "shapes", "slowest_ns", "slowest_statement", "total_ns")
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the request statistics.
+
+        Args:
+            path (str): request path
+
+        """
+        self.path = path
+        self.count = 0
+        self.total_ns = 0
+        self.slowest_ns = 0
+        self.slowest_statement: str | None = None
+        self.shapes: dict[str, int] = {}
+
+    def add(self, statement: str, duration_ns: int) -> None:
+        """
+        Account the executed statement, warn about the N+1 pattern.
+
+        Args:
+            statement (str): SQL statement
+            duration_ns (int): execution time in nanoseconds
+
+        """
+        self.count += 1
+        self.total_ns += duration_ns
+
+        if duration_ns > self.slowest_ns:
+            self.slowest_ns = duration_ns
+            self.slowest_statement = statement
+
+        # the raw statement text is a cheap shape key, literals are bound parameters
+        executions = self.shapes[statement] = self.shapes.get(statement, 0) + 1
+
+        if executions == settings.db.queries.n_plus_one_threshold + 1:
+            logger.bind(type="sql", path=self.path, statement=normalize_sql(statement)).warning(
+                "Possible N+1 query: the same statement ran over {threshold} times for {path}",
+                threshold=settings.db.queries.n_plus_one_threshold,
+                path=self.path,
+            )
+
+    def fields(self) -> dict[str, Any]:
+        """
+        Totals for structured logging.
+
+        Returns:
+            dict[str, Any]: statement count, total and slowest time in milliseconds
+
+        """
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ns / 1e6, 3),
+            "slowest_ms": round(self.slowest_ns / 1e6, 3),
+            "slowest": None
+            if self.slowest_statement is None
+            else normalize_sql(self.slowest_statement),
+        }
+
+
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+repository_method: ContextVar[str | None] = ContextVar("repository_method", default=None)
+
+
+def tag_statements[Repository, **P, R](
+    func: Callable[Concatenate[Repository, P], Coroutine[Any, Any, R]],
+) -> Callable[Concatenate[Repository, P], Coroutine[Any, Any, R]]:
+    """
+    Tag the statements executed by the repository method with its name.
+
+    The outermost tagged method wins, so that nested calls keep the caller's name.
+
+    Args:
+        func (Callable): repository coroutine method
+
+    Returns:
+        Callable: tagged method
+
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self: Repository, *args: P.args, **kwargs: P.kwargs) -> R:
+        if repository_method.get() is not None:
+            return await func(self, *args, **kwargs)
+
+        token = repository_method.set(f"{type(self).__name__}.{func.__name__}")
+
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            repository_method.reset(token)
+
+    return wrapper
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_comment(tags: tuple[tuple[str, str], ...]) -> str:
+    pairs = ",".join(f"{key}='{quote(value, safe='')}'" for key, value in tags)
+    return f" /*{pairs}*/"
+
+
+def sql_comment() -> str:
+    """
+    Render the sqlcommenter tags of the current request and repository method.
+
+    Returns:
+        str: comment appended to the statement, empty outside of a request
+
+    """
+    tags: list[tuple[str, str]] = []
+
+    if (method := repository_method.get()) is not None:
+        tags.append(("db_method", method))
+
+    if (context := request_context.get()) is not None:
+        if settings.db.comments.request_id:
+            tags.append(("request_id", context.request_id))
+        if (route := context.route) is not None:
+            tags.append(("route", route))
+
+    return _render_comment(tuple(tags)) if tags else ""
+
+
+def _strip_comment(statement: str) -> str:
+    if statement.endswith("*/") and (start := statement.rfind(" /*")) != -1:
+        return statement[:start]
+    return statement
+
+
+def _add_comment(
+    _conn: Connection,
+    _cursor: Any,  # noqa: ANN401
+    statement: str,
+    parameters: Any,  # noqa: ANN401
+    _context: ExecutionContext | None,
+    _executemany: bool,  # noqa: FBT001
+) -> tuple[str, Any]:
+    return f"{statement}{sql_comment()}", parameters
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    _cursor: Any,  # noqa: ANN401
+    _statement: str,
+    _parameters: Any,  # noqa: ANN401
+    _context: ExecutionContext | None,
+    _executemany: bool,  # noqa: FBT001
+) -> None:
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter_ns())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    _cursor: Any,  # noqa: ANN401
+    statement: str,
+    _parameters: Any,  # noqa: ANN401
+    _context: ExecutionContext | None,
+    _executemany: bool,  # noqa: FBT001
+) -> None:
+    duration_ns = time.perf_counter_ns() - conn.info[_START_KEY].pop()
+    statement = _strip_comment(statement)
+    record_timing("sql", duration_ns)
+
+    if (stats := query_stats.get()) is not None:
+        stats.add(statement, duration_ns)
+
+    # pg_stat_statements folds the statements of all routes into the first one's comment,
+    # these counts split them back
+    context = request_context.get()
+    db_statements_total.labels(
+        (context.route if context is not None else None) or "",
+        repository_method.get() or "",
+    ).inc()
+
+    if duration_ns >= settings.db.queries.slow_threshold * 1e9:
+        logger.bind(
+            type="sql",
+            duration=duration_ns / 1e9,
+            statement=normalize_sql(statement),
+        ).warning("Slow query took {duration_ms:.1f} ms", duration_ms=duration_ns / 1e6)
+
+
+def _count_cache_hits(
+    conn: Connection,
+    _cursor: Any,  # noqa: ANN401
+    statement: str,
+    _parameters: Any,  # noqa: ANN401
+    context: ExecutionContext | None,
+    executemany: bool,  # noqa: FBT001
+) -> None:
+    if context is not None:
+        cache_hit = getattr(context, "cache_hit", CacheStats.NO_CACHE_KEY)
+        db_compiled_cache_total.labels(_COMPILED_CACHE_RESULTS[cache_hit]).inc()
+
+    # asyncpg runs the batches without preparing them through the cache
+    if executemany:
+        return
+
+    # the cache of the SQLAlchemy asyncpg adapter, keyed by the final statement text
+    dbapi_connection = conn.connection.dbapi_connection
+    cache = getattr(dbapi_connection, "_prepared_statement_cache", None)
+
+    if cache is not None:
+        db_prepared_statements_total.labels("hit" if statement in cache else "miss").inc()
+    elif hasattr(dbapi_connection, "_prepared_statement_cache"):
+        db_prepared_statements_total.labels("disabled").inc()
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    if context.connection is not None and context.cursor is not None:
+        starts = context.connection.info.get(_START_KEY)
+
+        if starts:
+            _ = starts.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Attribute the statements executed by the engine to the current request.
+
+    Args:
+        engine (AsyncEngine): database engine
+
+    """
+    if settings.db.comments.enabled:
+        event.listen(engine.sync_engine, "before_cursor_execute", _add_comment, retval=True)
+
+    # after the comment, the statement is the text the driver prepares
+    if settings.db.statements.metrics:
+        event.listen(engine.sync_engine, "before_cursor_execute", _count_cache_hits)
+
+    if not settings.db.queries.enabled:
+        return
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
@@ -1,6 +1,6 @@
 from typing import final
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import String
 
@@ -10,6 +10,11 @@ from app.database.models.mixins.int_id_pk import IntIdPkMixin
 
 @final
 class Task(IntIdPkMixin, Base):
+    # LIKE 'prefix%' uses a btree index under any collation only with the pattern ops
+    __table_args__ = (
+        Index("ix_tasks_title_pattern", "title", postgresql_ops={"title": "varchar_pattern_ops"}),
+    )
+
     title: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     description: Mapped[str] = mapped_column(String(100), nullable=False)
     is_public: Mapped[bool] = mapped_column(nullable=False, default=False)
@@ -1,5 +1,6 @@
 from typing import final
 
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import String
 
@@ -10,6 +11,15 @@ from app.schemas import USER_ROLE
 
 @final
 class User(IntIdPkMixin, Base):
+    # LIKE 'prefix%' uses a btree index under any collation only with the pattern ops
+    __table_args__ = (
+        Index(
+            "ix_users_username_pattern",
+            "username",
+            postgresql_ops={"username": "varchar_pattern_ops"},
+        ),
+    )
+
     username: Mapped[str] = mapped_column(String(15), unique=True, nullable=False)
     hashed_password: Mapped[str] = mapped_column(String(100), nullable=False)
     role: Mapped[USER_ROLE] = mapped_column(String(10), nullable=False)
@@ -1,12 +1,15 @@
 from abc import ABC, abstractmethod
-from collections.abc import Sequence
-from typing import override
+from collections.abc import Mapping, Sequence
+from typing import Any, override
 
 from pydantic import BaseModel
-from sqlalchemy import Select, select
+from sqlalchemy import RowMapping, Select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
+from app.database.filters import FilterSpec
+from app.database.instrumentation import tag_statements
+
 
 class RepositoryBase[Model, Create, Update, Filters](ABC):
     @abstractmethod
@@ -67,7 +70,7 @@ class RepositoryBase[Model, Create, Update, Filters](ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def read_all(self, filters: Filters) -> Sequence[Model]:
+    async def read_all(self, filters: Filters) -> Sequence[Mapping[str, Any]]:
         """
         Read all items with the search filter.
 
@@ -75,7 +78,7 @@ class RepositoryBase[Model, Create, Update, Filters](ABC):
             filters (Filters): item search filter
 
         Returns:
-            Sequence[Model]: list of items
+            Sequence[Mapping[str, Any]]: column values of the items
 
         """
         raise NotImplementedError
@@ -90,6 +93,7 @@ class SqlAlchemyRepositoryBase[
     __slots__ = ("session",)
 
     model: type[Model]
+    filter_spec: FilterSpec[Model]
 
     def __init__(self, session: AsyncSession) -> None:
         """
@@ -102,6 +106,7 @@ class SqlAlchemyRepositoryBase[
         self.session = session
 
     @override
+    @tag_statements
     async def create(self, item_create: Create) -> Model:
         new_item = self.model(**item_create.model_dump())
         self.session.add(new_item)
@@ -109,10 +114,12 @@ class SqlAlchemyRepositoryBase[
         return new_item
 
     @override
+    @tag_statements
     async def read(self, item_id: int) -> Model | None:
         return await self.session.get(self.model, item_id)
 
     @override
+    @tag_statements
     async def update(self, item_id: int, item_update: Update) -> Model | None:
         item = await self.read(item_id)
 
@@ -126,6 +133,7 @@ class SqlAlchemyRepositoryBase[
         return item
 
     @override
+    @tag_statements
     async def delete(self, item_id: int) -> Model | None:
         item = await self.read(item_id)
 
@@ -136,28 +144,24 @@ class SqlAlchemyRepositoryBase[
         return item
 
     @override
-    async def read_all(self, filters: Filters) -> Sequence[Model]:
-        query = select(self.model)
-        query = await self._filter_query(query, filters)
-        result = await self.session.scalars(query)
-        return result.all()
-
-    @classmethod
-    async def _filter_query(
-        cls,
-        query: Select[tuple[Model]],
-        filters: Filters,
-    ) -> Select[tuple[Model]]:
+    @tag_statements
+    async def read_all(self, filters: Filters) -> Sequence[RowMapping]:
+        query, params = self.filter_spec.query(filters)
+        return await self._read_rows(query, params)
+
+    async def _read_rows(
+        self, query: Select[Any], params: Mapping[str, Any]
+    ) -> Sequence[RowMapping]:
         """
-        Filter the query by the specified search filter.
+        Execute the column values query, without loading ORM entities.
 
         Args:
-            query (Select[tuple[Model]]): database query expression
-            filters (Filters): item search filter
+            query (Select[Any]): database query expression
+            params (Mapping[str, Any]): bound parameter values
 
         Returns:
-            Select[tuple[Model]]: filtered query expression
+            Sequence[RowMapping]: column values of the items
 
         """
-        _ = filters
-        return query
+        result = await self.session.execute(query, params)
+        return result.mappings().all()
@@ -1,9 +1,10 @@
-from collections.abc import Sequence
-from typing import final, override
+from collections.abc import Mapping, Sequence
+from typing import Any, final, override
 
-from sqlalchemy import Select, select
+from sqlalchemy import RowMapping
 
-from app.core.exceptions import QueryValueError
+from app.database.filters import FilterField, FilterSpec
+from app.database.instrumentation import tag_statements
 from app.database.models import Task
 from app.database.repositories.base import RepositoryBase, SqlAlchemyRepositoryBase
 from app.schemas import TaskCreate, TaskFilters, TaskUpdate
@@ -11,7 +12,11 @@ from app.schemas import TaskCreate, TaskFilters, TaskUpdate
 
 class TaskRepositoryBase(RepositoryBase[Task, TaskCreate, TaskUpdate, TaskFilters]):
     @override
-    async def read_all(self, filters: TaskFilters, relation_id: int = -1) -> Sequence[Task]:
+    async def read_all(
+        self,
+        filters: TaskFilters,
+        relation_id: int = -1,
+    ) -> Sequence[Mapping[str, Any]]:
         """
         Read all tasks with the search filter.
 
@@ -23,7 +28,7 @@ class TaskRepositoryBase(RepositoryBase[Task, TaskCreate, TaskUpdate, TaskFilter
             TypeError: missing 'relation_id' argument
 
         Returns:
-            Sequence[Task]: list of tasks
+            Sequence[Mapping[str, Any]]: column values of the tasks
 
         """
         raise NotImplementedError
@@ -35,38 +40,24 @@ class TaskRepository(
     TaskRepositoryBase,
 ):
     model = Task
+    filter_spec = FilterSpec(
+        Task,
+        fields={
+            "title_contains": FilterField("title", "contains"),
+            "title_prefix": FilterField("title", "prefix"),
+            "public": FilterField("is_public"),
+            "completed": FilterField("is_completed"),
+        },
+        sortable=("id", "title"),
+        scope=("user_id",),
+    )
 
     @override
-    async def read_all(self, filters: TaskFilters, relation_id: int = -1) -> Sequence[Task]:
+    @tag_statements
+    async def read_all(self, filters: TaskFilters, relation_id: int = -1) -> Sequence[RowMapping]:
         if relation_id == -1:
             msg_err = "read_all() missing 1 required positional argument: 'relation_id'"
             raise TypeError(msg_err)
 
-        query = select(self.model)
-        query = await self._filter_query(query, filters, relation_id)
-        result = await self.session.scalars(query)
-        return result.all()
-
-    @classmethod
-    @override
-    async def _filter_query(
-        cls,
-        query: Select[tuple[Task]],
-        filters: TaskFilters,
-        relation_id: int = -1,
-    ) -> Select[tuple[Task]]:
-        query = query.where(cls.model.user_id == relation_id)
-
-        if (title := filters.title_contains) is not None:
-            query = query.where(cls.model.title.ilike(f"%{title}%"))
-        if (is_public := filters.public) is not None:
-            query = query.where(cls.model.is_public == is_public)
-        if (is_completed := filters.completed) is not None:
-            query = query.where(cls.model.is_completed == is_completed)
-        if hasattr(cls.model, filters.sort_by.removeprefix("-")):
-            sort_attr = getattr(cls.model, filters.sort_by.removeprefix("-"))
-        else:
-            raise QueryValueError(filters.sort_by.removeprefix("-"), "sort-by")
-
-        sort_by = sort_attr.desc() if filters.sort_by.startswith("-") else sort_attr.asc()
-        return query.order_by(sort_by).limit(filters.limit).offset(filters.offset)
+        query, params = self.filter_spec.query(filters, user_id=relation_id)
+        return await self._read_rows(query, params)
@@ -2,9 +2,10 @@ from abc import abstractmethod
 from typing import final, override
 
 from pydantic import BaseModel
-from sqlalchemy import Select, select
+from sqlalchemy import select
 
-from app.core.exceptions import QueryValueError
+from app.database.filters import FilterField, FilterSpec
+from app.database.instrumentation import tag_statements
 from app.database.models import User
 from app.database.repositories.base import RepositoryBase, SqlAlchemyRepositoryBase
 from app.schemas import UserCreate, UserFilters
@@ -32,33 +33,25 @@ class UserRepository(
     UserRepositoryBase,
 ):
     model = User
+    filter_spec = FilterSpec(
+        User,
+        fields={
+            "username_contains": FilterField("username", "contains"),
+            "username_prefix": FilterField("username", "prefix"),
+            "role": FilterField("role", "in"),
+        },
+        sortable=("id", "username"),
+    )
 
     @override
+    @tag_statements
     async def read_by_name(self, username: str) -> User | None:
         query = select(self.model).where(self.model.username == username)
         result = await self.session.execute(query)
         return result.scalars().one_or_none()
 
     @override
+    @tag_statements
     async def update(self, item_id: int, item_update: BaseModel) -> User | None:
         """Not implemented."""
         raise NotImplementedError
-
-    @classmethod
-    @override
-    async def _filter_query(
-        cls,
-        query: Select[tuple[User]],
-        filters: UserFilters,
-    ) -> Select[tuple[User]]:
-        if (username := filters.username_contains) is not None:
-            query = query.where(cls.model.username.ilike(f"%{username}%"))
-        if (roles := filters.role) is not None:
-            query = query.where(cls.model.role.in_(roles))
-        if hasattr(cls.model, filters.sort_by.removeprefix("-")):
-            sort_attr = getattr(cls.model, filters.sort_by.removeprefix("-"))
-        else:
-            raise QueryValueError(filters.sort_by.removeprefix("-"), "sort-by")
-
-        sort_by = sort_attr.desc() if filters.sort_by.startswith("-") else sort_attr.asc()
-        return query.order_by(sort_by).limit(filters.limit).offset(filters.offset)
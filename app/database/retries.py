@@ -0,0 +1,166 @@
+import asyncio
+import functools
+import random
+import time
+from collections.abc import Callable, Coroutine
+from contextvars import ContextVar
+from typing import Any, Final, final
+
+from loguru import logger
+from sqlalchemy.exc import DBAPIError, DisconnectionError
+
+from app.core.config import settings
+from app.core.deadlines import remaining_time
+from app.core.metrics import db_retries_total
+
+# connection exceptions and the server shutting down or not accepting connections yet
+_DISCONNECT_SQLSTATES: Final[frozenset[str]] = frozenset({"57P01", "57P02", "57P03"})
+_CONNECTION_SQLSTATE_CLASS: Final[str] = "08"
+
+read_only: ContextVar[bool] = ContextVar("read_only", default=False)
+
+
+def is_disconnect(error: BaseException) -> bool:
+    """
+    Check whether the error is a lost or refused database connection.
+
+    Such an error means the statement did not complete, the server may have failed over.
+
+    Args:
+        error (BaseException): raised error
+
+    Returns:
+        bool: True for connection failures
+
+    """
+    if isinstance(error, DisconnectionError | ConnectionError):
+        return True
+
+    if not isinstance(error, DBAPIError):
+        return False
+
+    if error.connection_invalidated:
+        return True
+
+    sqlstate = getattr(error.orig, "sqlstate", None) or ""
+    return sqlstate.startswith(_CONNECTION_SQLSTATE_CLASS) or sqlstate in _DISCONNECT_SQLSTATES
+
+
+@final
+class RetryBudget:
+    """
+    Share of the reads that may be retried.
+
+    Every read deposits a fraction of a retry and a few retries per second are always
+    allowed, so that a failover is retried through while an outage does not multiply
+    the load on a recovering database.
+    """
+
+    __slots__ = ("_tokens", "_updated")
+
+    def __init__(self) -> None:
+        """Initialize the budget full."""
+        self._tokens = float(settings.db.retries.budget_burst)
+        self._updated = time.monotonic()
+
+    def deposit(self) -> None:
+        """Account a read."""
+        config = settings.db.retries
+        self._tokens = min(config.budget_burst, self._tokens + config.budget_ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Take a retry from the budget.
+
+        Returns:
+            bool: True when the retry is allowed
+
+        """
+        config = settings.db.retries
+        now = time.monotonic()
+        refill = (now - self._updated) * config.budget_per_second
+        self._tokens = min(config.budget_burst, self._tokens + refill)
+        self._updated = now
+
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+        return True
+
+
+retry_budget = RetryBudget()
+
+
+def _backoff(attempt: int) -> float:
+    config = settings.db.retries
+    # full jitter, the retries of the requests failed together do not arrive together
+    return random.uniform(0, min(config.max_backoff, config.backoff * 2**attempt))  # noqa: S311
+
+
+def _may_retry(error: BaseException, attempt: int, delay: float) -> bool:
+    if attempt >= settings.db.retries.attempts:
+        db_retries_total.labels("exhausted").inc()
+        return False
+
+    if (budget := remaining_time()) is not None and budget <= delay:
+        db_retries_total.labels("deadline").inc()
+        return False
+
+    if not retry_budget.withdraw():
+        db_retries_total.labels("budget").inc()
+        return False
+
+    db_retries_total.labels("retried").inc()
+    logger.bind(type="sqlalchemy_exception").warning(
+        "Read failed on a lost connection, retry {attempt} in {delay_ms:.0f} ms: {error!r}",
+        attempt=attempt + 1,
+        delay_ms=delay * 1000,
+        error=error,
+    )
+    return True
+
+
+def retry_reads[**P, R](
+    func: Callable[P, Coroutine[Any, Any, R]],
+) -> Callable[P, Coroutine[Any, Any, R]]:
+    """
+    Retry the read-only unit of work on a fresh connection after a lost connection.
+
+    The whole function is run again, so it must open its own unit of work and must not
+    write: a commit inside it raises.
+
+    Args:
+        func (Callable): coroutine function reading through a unit of work
+
+    Returns:
+        Callable: retried function
+
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        if not settings.db.retries.enabled:
+            return await func(*args, **kwargs)
+
+        retry_budget.deposit()
+        token = read_only.set(True)
+
+        try:
+            attempt = 0
+
+            while True:
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as error:
+                    delay = _backoff(attempt)
+
+                    if not is_disconnect(error) or not _may_retry(error, attempt, delay):
+                        raise
+
+                attempt += 1
+                await asyncio.sleep(delay)
+        finally:
+            read_only.reset(token)
+
+    return wrapper
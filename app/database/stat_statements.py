@@ -0,0 +1,240 @@
+import argparse
+import asyncio
+import re
+import sys
+from collections.abc import Iterable, Mapping, Sequence
+from pathlib import Path
+from typing import Final, Literal, final
+from urllib.parse import unquote
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+type GROUP_BY = Literal["route", "db_method"]
+
+_COMMENT: Final[re.Pattern[str]] = re.compile(r"/\*(?P<tags>[^*]*)\*/\s*$")
+_TAG: Final[re.Pattern[str]] = re.compile(r"(?P<key>\w+)='(?P<value>[^']*)'")
+_LABEL: Final[re.Pattern[str]] = re.compile(r'(?P<key>\w+)="(?P<value>[^"]*)"')
+_UNTAGGED: Final[str] = "(untagged)"
+_STATEMENTS_METRIC: Final[str] = "db_statements_total"
+_QUERY: Final[str] = """
+SELECT query, calls, total_exec_time, rows
+FROM pg_stat_statements
+WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+"""
+
+
+def parse_tags(query: str) -> dict[str, str]:
+    """
+    Extract the sqlcommenter tags appended to the statement.
+
+    Args:
+        query (str): statement text
+
+    Returns:
+        dict[str, str]: decoded tags
+
+    """
+    if (match := _COMMENT.search(query)) is None:
+        return {}
+
+    return {tag["key"]: unquote(tag["value"]) for tag in _TAG.finditer(match["tags"])}
+
+
+@final
+class _Usage:
+    __slots__ = ("calls", "rows", "statements", "total_ms")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.calls = 0.0
+        self.rows = 0.0
+        self.total_ms = 0.0
+
+
+def route_shares(series: Mapping[str, float]) -> dict[str, dict[str, float]]:
+    """
+    Share of the statements of every repository method run by each route.
+
+    Args:
+        series (Mapping[str, float]): db_statements_total values by label text
+
+    Returns:
+        dict[str, dict[str, float]]: route shares by repository method
+
+    """
+    calls: dict[str, dict[str, float]] = {}
+
+    for labels, value in series.items():
+        tags = {label["key"]: label["value"] for label in _LABEL.finditer(labels)}
+        by_route = calls.setdefault(tags.get("db_method", ""), {})
+        route = tags.get("route") or _UNTAGGED
+        by_route[route] = by_route.get(route, 0.0) + value
+
+    return {
+        method: {route: count / total for route, count in by_route.items()}
+        for method, by_route in calls.items()
+        if (total := sum(by_route.values())) > 0
+    }
+
+
+def rank(
+    rows: Iterable[Sequence[object]],
+    group_by: GROUP_BY,
+    shares: Mapping[str, Mapping[str, float]] | None = None,
+) -> list[tuple[str, _Usage]]:
+    """
+    Aggregate the pg_stat_statements rows by tag and rank them by database time.
+
+    Postgres keeps the text of the first execution of every normalized statement, the
+    route tag only names the first route which ran it. With the route shares counted by
+    the application, the statement of a repository method is split over its routes.
+
+    Args:
+        rows (Iterable[Sequence[object]]): query, calls, total time (ms), rows
+        group_by (GROUP_BY): tag to group by
+        shares (Mapping[str, Mapping[str, float]] | None, optional): route shares by
+            repository method. Defaults to None.
+
+    Returns:
+        list[tuple[str, _Usage]]: groups by descending total time
+
+    """
+    usage: dict[str, _Usage] = {}
+
+    for query, calls, total_ms, returned in rows:
+        tags = parse_tags(str(query))
+        split: Mapping[str, float] = {tags.get(group_by, _UNTAGGED): 1.0}
+
+        if group_by == "route" and shares and (method := tags.get("db_method")) in shares:
+            split = shares[method]
+
+        for key, share in split.items():
+            group = usage.setdefault(key, _Usage())
+            group.statements += 1
+            group.calls += int(calls) * share  # type: ignore[reportArgumentType]
+            group.rows += int(returned) * share  # type: ignore[reportArgumentType]
+            group.total_ms += float(total_ms) * share  # type: ignore[reportArgumentType]
+
+    return sorted(usage.items(), key=lambda item: item[1].total_ms, reverse=True)
+
+
+def render(ranking: Sequence[tuple[str, _Usage]], group_by: GROUP_BY) -> str:
+    """
+    Render the ranking as a text table.
+
+    Args:
+        ranking (Sequence[tuple[str, _Usage]]): ranked groups
+        group_by (GROUP_BY): grouping tag
+
+    Returns:
+        str: table
+
+    """
+    overall_ms = sum(usage.total_ms for _, usage in ranking) or 1.0
+    width = max((len(key) for key, _ in ranking), default=0)
+    width = max(width, len(group_by))
+    header = (
+        f"{group_by:<{width}}  {'total ms':>12}  {'share':>6}  {'calls':>10}  "
+        f"{'mean ms':>9}  {'rows':>10}  {'stmts':>5}"
+    )
+    lines = [header]
+
+    for key, usage in ranking:
+        mean_ms = usage.total_ms / usage.calls if usage.calls else 0.0
+        lines.append(
+            f"{key:<{width}}  {usage.total_ms:>12.1f}  {usage.total_ms / overall_ms:>6.1%}  "
+            f"{usage.calls:>10.0f}  {mean_ms:>9.3f}  {usage.rows:>10.0f}  {usage.statements:>5}"
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+async def report(
+    url: str,
+    group_by: GROUP_BY,
+    limit: int,
+    shares: Mapping[str, Mapping[str, float]] | None = None,
+) -> str:
+    """
+    Rank the application routes by the database time recorded in pg_stat_statements.
+
+    Args:
+        url (str): database url
+        group_by (GROUP_BY): tag to group by
+        limit (int): number of groups to show
+        shares (Mapping[str, Mapping[str, float]] | None, optional): route shares by
+            repository method. Defaults to None.
+
+    Returns:
+        str: report table
+
+    """
+    engine = create_async_engine(url)
+
+    try:
+        async with engine.connect() as connection:
+            result = await connection.execute(text(_QUERY))
+            rows = result.all()
+    finally:
+        await engine.dispose()
+
+    return render(rank(rows, group_by, shares)[:limit], group_by)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Run the pg_stat_statements report.
+
+    Args:
+        argv (Sequence[str] | None, optional): command line arguments. Defaults to None.
+
+    Returns:
+        int: exit code
+
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m app.database.stat_statements",
+        description="Rank routes by database time from pg_stat_statements.",
+    )
+    _ = parser.add_argument("--by", choices=("route", "db_method"), default="route")
+    _ = parser.add_argument("--limit", type=int, default=20)
+    _ = parser.add_argument("--url", default=str(settings.db.url))
+    _ = parser.add_argument(
+        "--metrics-dir",
+        type=Path,
+        # the default directory belongs to the parent process, the shell running the CLI
+        default=settings.metrics.directory,
+        required=settings.metrics.directory is None,
+        help="metrics directory of the server, for the statement counts by route",
+    )
+    args = parser.parse_args(argv)
+    registry.directory = args.metrics_dir
+    shares = route_shares(registry.series(_STATEMENTS_METRIC))
+
+    if args.by == "route" and not shares:
+        _ = sys.stderr.write(
+            f"No statement counts in {args.metrics_dir}: every statement is accounted to "
+            "the first route which ran it.\n"
+        )
+
+    try:
+        table = asyncio.run(report(args.url, args.by, args.limit, shares))
+    except ProgrammingError as e:
+        _ = sys.stderr.write(
+            f"pg_stat_statements is not available: {e.orig}\n"
+            "Preload it with shared_preload_libraries and run "
+            "'CREATE EXTENSION pg_stat_statements;'.\n"
+        )
+        return 1
+
+    _ = sys.stdout.write(table)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,14 @@
+import time
 from abc import ABC, abstractmethod
 from types import TracebackType
-from typing import ClassVar, Self, final, override
+from typing import Self, final, override
 
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 import app.core.exceptions as exc
+from app.core.metrics import db_pool_wait_seconds
+from app.core.timing import record_timing
+from app.database.bulkheads import Bulkhead, bulkheads
 from app.database.db import DbBase
 from app.database.repositories import (
     TaskRepository,
@@ -12,6 +16,7 @@ from app.database.repositories import (
     UserRepository,
     UserRepositoryBase,
 )
+from app.database.retries import read_only
 
 
 class UOWBase(ABC):
@@ -54,10 +59,10 @@ class UOWBase(ABC):
 
 
 class DbUOW[Engine, Session, SessionFactory](UOWBase):
-    __slots__ = ("_session", "_session_factory")
+    __slots__ = ("_bulkhead", "_session", "_session_factory", "_started_ns", "tasks", "users")
 
-    users: ClassVar[UserRepositoryBase]
-    tasks: ClassVar[TaskRepositoryBase]
+    users: UserRepositoryBase
+    tasks: TaskRepositoryBase
 
     def __init__(self, db: DbBase[Engine, Session, SessionFactory]) -> None:
         """
@@ -69,15 +74,37 @@ class DbUOW[Engine, Session, SessionFactory](UOWBase):
         """
         self._session: Session | None = None
         self._session_factory = db.session_factory
+        self._started_ns = 0
+        self._bulkhead: Bulkhead | None = None
 
 
 @final
 class SqlAlchemyUOW(DbUOW[AsyncEngine, AsyncSession, async_sessionmaker[AsyncSession]]):
     @override
     async def __aenter__(self) -> Self:
+        self._started_ns = time.perf_counter_ns()
+        self._bulkhead = bulkheads.resolve()
+
+        if self._bulkhead is not None:
+            await self._bulkhead.acquire()
+
         self._session = self._session_factory()
-        SqlAlchemyUOW.users = UserRepository(self._session)
-        SqlAlchemyUOW.tasks = TaskRepository(self._session)
+        self.users = UserRepository(self._session)
+        self.tasks = TaskRepository(self._session)
+
+        # check out the connection eagerly to separate pool waits from query time
+        try:
+            _ = await self._session.connection()
+        except BaseException:
+            await self._close()
+            raise
+
+        checkout_ns = time.perf_counter_ns() - self._started_ns
+        record_timing("db-checkout", checkout_ns)
+        db_pool_wait_seconds.labels(
+            self._bulkhead.name if self._bulkhead is not None else "none"
+        ).observe(checkout_ns / 1e9)
+
         return await super().__aenter__()
 
     @override
@@ -102,9 +129,23 @@ class SqlAlchemyUOW(DbUOW[AsyncEngine, AsyncSession, async_sessionmaker[AsyncSes
         if self._session is None:
             raise exc.DatabaseSessionError
 
-        await super().__aexit__(exc_type, exc_val, exc_tb)
-        await self._session.close()
-        self._session = None
+        try:
+            await super().__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            await self._close()
+
+        record_timing("db", time.perf_counter_ns() - self._started_ns)
+
+    async def _close(self) -> None:
+        try:
+            if self._session is not None:
+                await self._session.close()
+        finally:
+            self._session = None
+
+            if self._bulkhead is not None:
+                self._bulkhead.release()
+                self._bulkhead = None
 
     @override
     async def commit(self) -> None:
@@ -113,11 +154,17 @@ class SqlAlchemyUOW(DbUOW[AsyncEngine, AsyncSession, async_sessionmaker[AsyncSes
 
         Raises:
             DatabaseSessionError: session is not initialized
+            RuntimeError: commit in a retried read
 
         """
         if self._session is None:
             raise exc.DatabaseSessionError
 
+        # a retried read would repeat the write
+        if read_only.get():
+            exc_msg = "Commit in a read-only unit of work."
+            raise RuntimeError(exc_msg)
+
         await self._session.commit()
 
     @override
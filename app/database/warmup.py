@@ -0,0 +1,109 @@
+import asyncio
+from collections.abc import Callable, Coroutine, Iterable, Mapping
+from typing import Any, Final
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.routing import BaseRoute
+
+from app.core.config import settings
+from app.core.context import RequestContext, request_context
+from app.database.models import Task, User
+from app.database.repositories import TaskRepository, UserRepository
+from app.schemas import TaskFilters
+
+type HOT_READ = Callable[[AsyncSession, User], Coroutine[Any, Any, object]]
+
+_WARMUP_REQUEST_ID: Final[str] = "warmup"
+
+
+def hot_reads() -> dict[str, HOT_READ]:
+    """
+    Repository reads of the busiest routes by route path.
+
+    Returns:
+        dict[str, HOT_READ]: read run for a user, by the route executing it
+
+    """
+    v1 = settings.api.v1
+    prefix = f"{settings.api.prefix}{v1.prefix}"
+    return {
+        f"{prefix}{v1.auth}/login": lambda session, user: UserRepository(session).read_by_name(
+            user.username
+        ),
+        f"{prefix}{v1.users}/me": lambda session, user: UserRepository(session).read(user.id),
+        f"{prefix}{v1.tasks}/all": lambda session, user: TaskRepository(session).read_all(
+            TaskFilters(), user.id
+        ),
+    }
+
+
+async def _active_users(
+    session_factory: async_sessionmaker[AsyncSession], count: int
+) -> list[User]:
+    if count == 0:
+        return []
+
+    busiest = select(Task.user_id).group_by(Task.user_id).order_by(func.count().desc()).limit(count)
+
+    async with session_factory() as session:
+        result = await session.scalars(select(User).where(User.id.in_(busiest.scalar_subquery())))
+        return list(result.all())
+
+
+async def _warm_connection(
+    session_factory: async_sessionmaker[AsyncSession],
+    routes: Mapping[str, BaseRoute],
+    users: list[User],
+    opened: asyncio.Barrier,
+) -> None:
+    async with session_factory() as session:
+        _ = await session.connection()
+        # every task holds its connection until all are open, so that they are distinct
+        _ = await opened.wait()
+
+        for path, read in hot_reads().items():
+            # the statements carry the route comment of the real requests, their prepared
+            # statements are the ones the requests will look up
+            scope = {"route": routes[path]} if path in routes else {}
+            token = request_context.set(RequestContext(_WARMUP_REQUEST_ID, scope))
+
+            try:
+                for user in users:
+                    _ = await read(session, user)
+                    session.expunge_all()
+            finally:
+                request_context.reset(token)
+
+
+async def warm_up_database(
+    session_factory: async_sessionmaker[AsyncSession],
+    routes: Iterable[BaseRoute],
+) -> None:
+    """
+    Open the pooled connections and prepare the hot statements on each of them.
+
+    The reads of the most active users also pull their rows into the database cache.
+
+    Args:
+        session_factory (async_sessionmaker[AsyncSession]): database session factory
+        routes (Iterable[BaseRoute]): application routes
+
+    """
+    config = settings.warmup
+    count = min(config.connections, settings.db.pool_size)
+
+    if count == 0:
+        return
+
+    users = await _active_users(session_factory, config.active_users)
+    # without data the statements are still prepared, the reads just find nothing
+    users = users or [User(id=0, username="")]
+    by_path = {path: route for route in routes if (path := getattr(route, "path", None))}
+    opened = asyncio.Barrier(count)
+
+    async with asyncio.TaskGroup() as group:
+        for index in range(count):
+            # the users are spread over the connections, each one reads at least one
+            share = users[index % len(users) :: count] or users[:1]
+            _ = group.create_task(_warm_connection(session_factory, by_path, share, opened))
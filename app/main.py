@@ -1,3 +1,5 @@
+import asyncio
+import functools
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
@@ -5,30 +7,41 @@ import redis.asyncio as redis
 from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi_limiter import FastAPILimiter
 from loguru import logger
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.api import router as router_api
+from app.api.metrics import router as router_metrics
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.context import RequestIdMiddleware
+from app.core.deadlines import DeadlineMiddleware
+from app.core.drain import DrainMiddleware, drain
 from app.core.exception_handlers import (
     database_exception_handler,
     global_exception_handler,
     http_exception_handler,
     validation_exception_handler,
 )
-from app.core.loggers import setup_logger
+from app.core.health import HealthMiddleware, health
+from app.core.load_shedding import LoadSheddingMiddleware
+from app.core.loggers import log_pipeline, setup_logger, shutdown_logger
+from app.core.metrics import registry
 from app.core.middlewares import LoggingMiddleware
+from app.core.openapi import cached_openapi
+from app.core.rate_limiter import check_rate_costs, limiter
+from app.core.responses import TimedJSONResponse
+from app.core.warmup import warm_up
 from app.database import SqlAlchemyDB
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncGenerator[None]:
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     """
     Initialize the fastapi application lifespan.
 
     Args:
-        _ (FastAPI): fastapi application instance
+        app (FastAPI): fastapi application instance
 
     Yields:
         AsyncGenerator[None]: open before launching, close before completion
@@ -46,29 +59,57 @@ async def lifespan(_: FastAPI) -> AsyncGenerator[None]:
     await db.init(str(settings.db.url))
     logger.info("Connection to database completed.")
 
-    await FastAPILimiter.init(redis_connection)  # type: ignore[reportUnknownMemberType]
+    await limiter.init(redis_connection)
+    health.init(db, redis_connection)
+    await warm_up(app, db)
 
     yield
 
-    await FastAPILimiter.close()
-
     logger.info("🛑 Application shutting down...")
+    drain.start()
+    await drain.wait_idle()
+    await limiter.close()
+
+    # the records of the drained requests are written before the pools go away
+    _ = await asyncio.to_thread(log_pipeline.flush, settings.drain.timeout)
+
+    await redis_connection.aclose()
     logger.info("Disconnecting from the database...")
     await db.close()
 
+    registry.close()
+    shutdown_logger()
 
-app = FastAPI(title="FastAPI Base Example", lifespan=lifespan)
 
+app = FastAPI(
+    title="FastAPI Base Example",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
+)
+
+app.openapi = functools.partial(cached_openapi, app)  # type: ignore[reportAttributeAccessIssue]
 app.include_router(router_api)
 
+if settings.metrics.enabled:
+    app.include_router(router_metrics)
+
+check_rate_costs(app.routes)
+
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(LoggingMiddleware)
+app.add_middleware(LoadSheddingMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=[settings.request_id.header],
 )
+app.add_middleware(RequestIdMiddleware)
+app.add_middleware(DrainMiddleware)
+app.add_middleware(HealthMiddleware)
 
 app.add_exception_handler(Exception, global_exception_handler)
 app.add_exception_handler(SQLAlchemyError, database_exception_handler)
@@ -60,9 +60,7 @@ def get_full_url_data(request: Request, exc: Exception) -> dict[str, Any]:
     if query_params := request.query_params:
         dict_query: dict[str, Any] = {}
 
-        for q in str(query_params).split("&"):
-            k, v = q.split("=")
-
+        for k, v in query_params.multi_items():
             if k in dict_query:
                 cur: str | list[str] = dict_query[k]
                 dict_query[k] = [*cur, v] if isinstance(cur, list) else [cur, v]
@@ -33,5 +33,6 @@ class TaskFilters(BaseModel):
     completed: bool | None = None
     public: bool | None = None
     title_contains: str | None = Field(default=None, validation_alias="title-contains")
+    title_prefix: str | None = Field(default=None, validation_alias="title-prefix")
 
     model_config = ConfigDict(populate_by_name=True)
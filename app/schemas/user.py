@@ -34,6 +34,7 @@ class UserFilters(BaseModel):
     offset: int = Field(default=0, ge=0)
     sort_by: str = Field(default="id", validation_alias="sort-by")
     username_contains: str | None = Field(default=None, validation_alias="username-contains")
+    username_prefix: str | None = Field(default=None, validation_alias="username-prefix")
     role: list[str] | None = None
 
     model_config = ConfigDict(populate_by_name=True)
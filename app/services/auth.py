@@ -5,6 +5,8 @@ from fastapi import Response
 
 import app.core.exceptions as exc
 from app.core.security import Password, Token
+from app.core.timing import timed, timed_async
+from app.database.retries import retry_reads
 from app.schemas import Payload, TokensCreate, TokenType, UserCreate, UserInput, UserRead
 from app.services.base import ServiceBase, SqlAlchemyServiceBase
 
@@ -36,6 +38,7 @@ class AuthServiceBase(ServiceBase):
 
 @final
 class AuthService(SqlAlchemyServiceBase, AuthServiceBase):
+    @retry_reads
     async def _check_user(self, user_input: UserInput) -> UserRead:
         async with self.uow as uow:
             user = await uow.users.read_by_name(user_input.username)
@@ -48,9 +51,11 @@ class AuthService(SqlAlchemyServiceBase, AuthServiceBase):
                 exc_msg = "Authorization failed."
                 raise exc.AuthorizationError(exc_msg)
 
-            return UserRead.model_validate(user, from_attributes=True)
+            with timed("validation"):
+                return UserRead.model_validate(user, from_attributes=True)
 
     @override
+    @timed_async("service")
     async def login(self, user_input: UserInput, response: Response) -> None:
         user = await self._check_user(user_input)
 
@@ -64,6 +69,7 @@ class AuthService(SqlAlchemyServiceBase, AuthServiceBase):
         Token.set_tokens(tokens, response)
 
     @override
+    @timed_async("service")
     async def register(self, user_input: UserInput) -> None:
         """
         Register a new user.
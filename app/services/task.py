@@ -1,12 +1,19 @@
 from abc import abstractmethod
 from typing import Final, final, override
 
+from pydantic import TypeAdapter
+
 import app.core.exceptions as exc
+from app.core.timing import timed, timed_async
+from app.database.retries import retry_reads
 from app.schemas import TaskCreate, TaskFilters, TaskInput, TaskRead, TaskUpdate
 from app.services.base import ServiceBase, SqlAlchemyServiceBase
 
 MSG_TASK_NOT_FOUND: Final[str] = "Task not found."
 
+# built once, validates a whole result set of row mappings in one pydantic-core call
+TASK_LIST_ADAPTER: Final[TypeAdapter[list[TaskRead]]] = TypeAdapter(list[TaskRead])
+
 
 class TaskServiceBase(ServiceBase):
     @abstractmethod
@@ -86,21 +93,28 @@ class TaskServiceBase(ServiceBase):
 @final
 class TaskService(SqlAlchemyServiceBase, TaskServiceBase):
     @override
+    @timed_async("service")
     async def create_task(self, task_input: TaskInput, user_id: int) -> TaskRead:
         task_create = TaskCreate(**task_input.model_dump(), user_id=user_id)
 
         async with self.uow as uow:
             task = await uow.tasks.create(task_create)
             await uow.commit()
-            return TaskRead.model_validate(task, from_attributes=True)
+            with timed("validation"):
+                return TaskRead.model_validate(task, from_attributes=True)
 
     @override
+    @timed_async("service")
+    @retry_reads
     async def get_all_tasks(self, filters: TaskFilters, user_id: int) -> list[TaskRead]:
         async with self.uow as uow:
             tasks = await uow.tasks.read_all(filters, user_id)
-            return [TaskRead.model_validate(task, from_attributes=True) for task in tasks]
+            with timed("validation"):
+                return TASK_LIST_ADAPTER.validate_python(tasks)
 
     @override
+    @timed_async("service")
+    @retry_reads
     async def get_task(self, task_id: int) -> TaskRead:
         """
         Get the task by id.
@@ -121,9 +135,11 @@ class TaskService(SqlAlchemyServiceBase, TaskServiceBase):
             if task is None:
                 raise exc.ResourceNotFoundError(MSG_TASK_NOT_FOUND)
 
-            return TaskRead.model_validate(task, from_attributes=True)
+            with timed("validation"):
+                return TaskRead.model_validate(task, from_attributes=True)
 
     @override
+    @timed_async("service")
     async def update_task(self, task_update: TaskUpdate, task_id: int) -> TaskRead:
         """
         Update the task by id.
@@ -146,9 +162,11 @@ class TaskService(SqlAlchemyServiceBase, TaskServiceBase):
                 raise exc.ResourceNotFoundError(MSG_TASK_NOT_FOUND)
 
             await uow.commit()
-            return TaskRead.model_validate(task, from_attributes=True)
+            with timed("validation"):
+                return TaskRead.model_validate(task, from_attributes=True)
 
     @override
+    @timed_async("service")
     async def delete_task(self, task_id: int) -> TaskRead:
         """
         Delete the task by id.
@@ -170,4 +188,5 @@ class TaskService(SqlAlchemyServiceBase, TaskServiceBase):
                 raise exc.ResourceNotFoundError(MSG_TASK_NOT_FOUND)
 
             await uow.commit()
-            return TaskRead.model_validate(task, from_attributes=True)
+            with timed("validation"):
+                return TaskRead.model_validate(task, from_attributes=True)
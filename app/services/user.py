@@ -1,11 +1,16 @@
 from abc import abstractmethod
 from typing import Final, final, override
 
+from pydantic import TypeAdapter
+
 import app.core.exceptions as exc
+from app.core.timing import timed, timed_async
+from app.database.retries import retry_reads
 from app.schemas import UserFilters, UserRead
 from app.services.base import ServiceBase, SqlAlchemyServiceBase
 
 MSG_USER_NOT_FOUND: Final[str] = "User not found."
+USER_LIST_ADAPTER: Final[TypeAdapter[list[UserRead]]] = TypeAdapter(list[UserRead])
 
 
 class UserServiceBase(ServiceBase):
@@ -55,12 +60,17 @@ class UserServiceBase(ServiceBase):
 @final
 class UserService(SqlAlchemyServiceBase, UserServiceBase):
     @override
+    @timed_async("service")
+    @retry_reads
     async def get_all_users(self, filters: UserFilters) -> list[UserRead]:
         async with self.uow as uow:
             users = await uow.users.read_all(filters)
-            return [UserRead.model_validate(user, from_attributes=True) for user in users]
+            with timed("validation"):
+                return USER_LIST_ADAPTER.validate_python(users)
 
     @override
+    @timed_async("service")
+    @retry_reads
     async def get_user(self, user_id: int) -> UserRead:
         """
         Get the user by id.
@@ -81,9 +91,11 @@ class UserService(SqlAlchemyServiceBase, UserServiceBase):
             if user is None:
                 raise exc.ResourceNotFoundError(MSG_USER_NOT_FOUND)
 
-            return UserRead.model_validate(user, from_attributes=True)
+            with timed("validation"):
+                return UserRead.model_validate(user, from_attributes=True)
 
     @override
+    @timed_async("service")
     async def delete_user(self, user_id: int) -> UserRead:
         """
         Delete the user by id.
@@ -105,4 +117,5 @@ class UserService(SqlAlchemyServiceBase, UserServiceBase):
                 raise exc.ResourceNotFoundError(MSG_USER_NOT_FOUND)
 
             await uow.commit()
-            return UserRead.model_validate(user, from_attributes=True)
+            with timed("validation"):
+                return UserRead.model_validate(user, from_attributes=True)
@@ -0,0 +1,218 @@
+"""
+Throughput of the 4xx error responses: previous handlers vs the preencoded path.
+
+Run with ``python -m benchmarks.error_responses``.
+"""
+
+import asyncio
+from typing import Any
+
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from loguru import logger
+
+from app.core.exception_handlers import http_exception_handler, validation_exception_handler
+from app.core.exceptions import TokenExpiredError, UserPermissionError
+from app.core.loggers import redact_headers
+from app.schemas import ProblemDetails, get_custom_errors
+from benchmarks.utils import call_asgi, http_scope, measure
+
+ITERATIONS = 5_000
+HEADERS = [
+    (b"host", b"bench"),
+    (b"user-agent", b"bench/1.0"),
+    (b"accept", b"application/json"),
+    (b"cookie", b"access_token=expired"),
+]
+
+
+def legacy_full_url_data(request: Request, exc: Exception) -> dict[str, Any]:
+    """
+    Previous ``get_full_url_data``, splitting the query string by hand.
+
+    Args:
+        request (Request): request instance
+        exc (Exception): exception instance
+
+    Returns:
+        dict[str, Any]: url instance data
+
+    """
+    instance: dict[str, Any] = {"method": request.method, "path": request.url.path}
+
+    if path_params := request.path_params:
+        instance["params"] = path_params
+
+    if query_params := request.query_params:
+        dict_query: dict[str, Any] = {}
+
+        for q in str(query_params).split("&"):
+            k, v = q.split("=")
+
+            if k in dict_query:
+                cur: str | list[str] = dict_query[k]
+                dict_query[k] = [*cur, v] if isinstance(cur, list) else [cur, v]
+            else:
+                dict_query[k] = v
+
+        instance["query"] = dict_query
+
+    if body := getattr(exc, "body", None):
+        instance["body"] = body
+
+    return instance
+
+
+def legacy_validation_handler(request: Request, exc: Exception) -> Response:
+    """
+    Previous validation error handler, kept as the baseline.
+
+    Args:
+        request (Request): request instance
+        exc (Exception): exception instance
+
+    Returns:
+        Response: error response
+
+    """
+    if not isinstance(exc, RequestValidationError):
+        raise exc
+
+    method = request.method
+    path = str(request.url)
+    client = request.client
+    client_ip = client.host if client is not None else "unknown"
+
+    logger_validation_exc = logger.bind(
+        path=path,
+        method=method,
+        client_ip=client_ip,
+        headers=redact_headers(request.headers.raw),
+    )
+    problem_details = ProblemDetails(
+        title="Validation Error",
+        status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail="One or more validation errors occurred in the request.",
+        instance=legacy_full_url_data(request, exc),
+        errors=get_custom_errors(exc),
+    )
+    logger_validation_exc.bind(type="validation_exception").warning(
+        "RequestValidationError: {exc_msg};\nRequest: {method} {path}",
+        exc_msg=problem_details.model_dump_json(),
+        method=method,
+        path=path,
+    )
+    return JSONResponse(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        content=jsonable_encoder(problem_details),
+        headers={"Content-Type": "application/problem+json"},
+    )
+
+
+def legacy_http_handler(request: Request, exc: Exception) -> Response:
+    """
+    Previous HTTP error handler, kept as the baseline.
+
+    Args:
+        request (Request): request instance
+        exc (Exception): exception instance
+
+    Returns:
+        Response: error response
+
+    """
+    if not isinstance(exc, HTTPException):
+        raise exc
+
+    method = request.method
+    path = str(request.url)
+    client = request.client
+    client_ip = client.host if client is not None else "unknown"
+
+    logger_fastapi_exc = logger.bind(
+        path=path,
+        method=method,
+        client_ip=client_ip,
+        headers=redact_headers(request.headers.raw),
+    )
+    logger_fastapi_exc.bind(type="http_exception", status_code=exc.status_code).warning(
+        "HTTPException {status_code}: {exc_msg};\nRequest: {method} {path}",
+        status_code=exc.status_code,
+        exc_msg=exc.detail,
+        method=method,
+        path=path,
+    )
+    return JSONResponse(
+        status_code=exc.status_code,
+        content=jsonable_encoder({"error": exc.detail}),
+        headers=exc.headers,
+    )
+
+
+def create_app(*, legacy: bool) -> FastAPI:
+    """
+    Create an application with endpoints answering the common client errors.
+
+    Args:
+        legacy (bool): use the previous error handlers
+
+    Returns:
+        FastAPI: application
+
+    """
+    app = FastAPI()
+
+    @app.get("/expired")
+    async def expired() -> None:
+        raise TokenExpiredError
+
+    @app.get("/forbidden")
+    async def forbidden() -> None:
+        raise UserPermissionError
+
+    @app.get("/items")
+    async def items(limit: int, offset: int = 0) -> dict[str, int]:
+        return {"limit": limit, "offset": offset}
+
+    if legacy:
+        app.add_exception_handler(HTTPException, legacy_http_handler)
+        app.add_exception_handler(RequestValidationError, legacy_validation_handler)
+    else:
+        app.add_exception_handler(HTTPException, http_exception_handler)
+        app.add_exception_handler(RequestValidationError, validation_exception_handler)
+
+    return app
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    logger.remove()
+    cases = {
+        "401 token expired": http_scope("/expired", headers=HEADERS),
+        "403 permission": http_scope("/forbidden", headers=HEADERS),
+        "422 validation": http_scope(
+            "/items", query_string=b"limit=ten&offset=1&tag=a&tag=b", headers=HEADERS
+        ),
+    }
+    before = create_app(legacy=True)
+    after = create_app(legacy=False)
+
+    for name, scope in cases.items():
+        rps_before = await measure(
+            f"before: {name}", lambda scope=scope: call_asgi(before, scope), ITERATIONS
+        )
+        rps_after = await measure(
+            f"after: {name}", lambda scope=scope: call_asgi(after, scope), ITERATIONS
+        )
+        print(f"speedup: {rps_after / rps_before:.2f}x")
+
+    # the previous query parsing fails on an encoded '=' in a value
+    broken = http_scope("/items", query_string=b"limit=x&q=a%3Db", headers=HEADERS)
+    messages = await call_asgi(after, broken)
+    print(f"encoded '=' in the query: {messages[0]['status']}, {messages[1]['body'].decode()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
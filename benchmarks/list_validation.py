@@ -0,0 +1,85 @@
+"""
+List validation: per-row model_validate on ORM entities vs one TypeAdapter call on rows.
+
+Run with ``python -m benchmarks.list_validation``.
+"""
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+from app.database.models import Task
+from app.schemas import TaskRead
+from app.services.task import TASK_LIST_ADAPTER
+
+PAGE_SIZES = (1, 10, 50, 100)
+ROWS_PER_CASE = 200_000
+
+
+def make_rows(count: int) -> list[dict[str, Any]]:
+    """
+    Build the column values of a page of tasks.
+
+    Args:
+        count (int): page size
+
+    Returns:
+        list[dict[str, Any]]: task rows
+
+    """
+    return [
+        {
+            "id": i,
+            "title": f"Task number {i}",
+            "description": "Write the quarterly report and send it to the team.",
+            "is_public": i % 2 == 0,
+            "is_completed": i % 3 == 0,
+            "user_id": 1,
+        }
+        for i in range(count)
+    ]
+
+
+def timeit(func: Callable[[], object], iterations: int) -> float:
+    """
+    Measure the mean time of a call.
+
+    Args:
+        func (Callable[[], object]): measured call
+        iterations (int): number of calls
+
+    Returns:
+        float: seconds per call
+
+    """
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        _ = func()
+
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    """Run the benchmark."""
+    print(f"{'page':>5} {'model_validate us':>18} {'TypeAdapter us':>15} {'speedup':>8}")
+
+    for size in PAGE_SIZES:
+        rows = make_rows(size)
+        entities = [Task(**row) for row in rows]
+        iterations = ROWS_PER_CASE // size
+
+        def per_row(entities: list[Task] = entities) -> list[TaskRead]:
+            return [TaskRead.model_validate(task, from_attributes=True) for task in entities]
+
+        def batch(rows: list[dict[str, Any]] = rows) -> list[TaskRead]:
+            return TASK_LIST_ADAPTER.validate_python(rows)
+
+        assert per_row() == batch()  # noqa: S101
+        before = timeit(per_row, iterations)
+        after = timeit(batch, iterations)
+        print(f"{size:>5} {before * 1e6:>18.1f} {after * 1e6:>15.1f} {before / after:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
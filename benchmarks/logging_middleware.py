@@ -0,0 +1,100 @@
+"""
+Throughput of the logging middleware: BaseHTTPMiddleware vs pure ASGI.
+
+Run with ``python -m benchmarks.logging_middleware``.
+"""
+
+import asyncio
+import time
+from typing import override
+
+from fastapi import FastAPI, Request, Response
+from loguru import logger
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+
+from app.core.middlewares import LoggingMiddleware
+from benchmarks.utils import call_asgi, http_scope, measure
+
+ITERATIONS = 5_000
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    """Previous ``BaseHTTPMiddleware`` implementation, kept as the baseline."""
+
+    @override
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        start_time = time.time()
+        method = request.method
+        path = request.url.path
+        client = request.client
+        client_ip = client.host if client is not None else "unknown"
+
+        logger_request = logger.bind(
+            path=path,
+            method=method,
+            client_ip=client_ip,
+            cookies=request.cookies,
+        )
+        logger_request.bind(type="request", headers=request.headers).info(
+            "Request: {method} {path} from {client_ip}",
+            method=method,
+            path=path,
+            client_ip=client_ip,
+        )
+
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        response.headers["X-Process-Time"] = str(process_time)
+
+        logger_request.bind(
+            type="response",
+            headers=response.headers,
+            process_time=str(process_time),
+        ).info(
+            "Response: {method} {path} returned {status_code} to {client_ip}",
+            method=method,
+            path=path,
+            status_code=response.status_code,
+            client_ip=client_ip,
+        )
+        return response
+
+
+def create_app(middleware: type) -> FastAPI:
+    """
+    Create an application with a single JSON endpoint behind the middleware.
+
+    Args:
+        middleware (type): logging middleware class
+
+    Returns:
+        FastAPI: application
+
+    """
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict[str, str]:
+        return {"message": "pong"}
+
+    app.add_middleware(middleware)
+    return app
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    logger.remove()
+    scope = http_scope("/ping")
+
+    before = create_app(BaseHTTPLoggingMiddleware)
+    after = create_app(LoggingMiddleware)
+
+    rps_before = await measure(
+        "before: BaseHTTPMiddleware", lambda: call_asgi(before, scope), ITERATIONS
+    )
+    rps_after = await measure("after: pure ASGI", lambda: call_asgi(after, scope), ITERATIONS)
+    print(f"speedup: {rps_after / rps_before:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
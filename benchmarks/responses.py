@@ -0,0 +1,74 @@
+"""
+Throughput of a 100-item task list response: validated json vs trusted pydantic-core.
+
+Run with ``python -m benchmarks.responses``.
+"""
+
+import asyncio
+
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from app.core.responses import TimedJSONResponse, TrustedRoute
+from app.schemas import TaskRead
+from benchmarks.utils import call_asgi, http_scope, measure
+
+ITERATIONS = 2_000
+TASKS = [
+    TaskRead(
+        id=i,
+        title=f"Task number {i}",
+        description="Write the quarterly report and send it to the team.",
+        is_public=i % 2 == 0,
+        is_completed=i % 3 == 0,
+        user_id=1,
+    )
+    for i in range(100)
+]
+
+
+def create_app(route_class: type[APIRoute], response_class: type[JSONResponse]) -> FastAPI:
+    """
+    Create an application returning the task list as the service would.
+
+    Args:
+        route_class (type[APIRoute]): route class of the router
+        response_class (type[JSONResponse]): default response class
+
+    Returns:
+        FastAPI: application
+
+    """
+    app = FastAPI(default_response_class=response_class)
+    router = APIRouter(route_class=route_class)
+
+    @router.get("/tasks/all")
+    async def get_all_tasks() -> list[TaskRead]:
+        return TASKS
+
+    app.include_router(router)
+    return app
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    scope = http_scope("/tasks/all")
+    cases = {
+        "before: validate + json": create_app(APIRoute, JSONResponse),
+        "validate + orjson": create_app(APIRoute, TimedJSONResponse),
+        "after: trusted pydantic-core": create_app(TrustedRoute, TimedJSONResponse),
+    }
+    bodies = set()
+    results: list[float] = []
+
+    for name, app in cases.items():
+        results.append(await measure(name, lambda app=app: call_asgi(app, scope), ITERATIONS))
+        messages = await call_asgi(app, scope)
+        bodies.add(messages[1]["body"])
+
+    print(f"speedup: {results[-1] / results[0]:.2f}x, identical bodies: {len(bodies) == 1}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
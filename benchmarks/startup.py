@@ -0,0 +1,107 @@
+"""
+Cold start: application import, OpenAPI schema generated vs loaded from the cache.
+
+Prints the slowest imports from ``-X importtime`` as the startup profile.
+
+Run with ``python -m benchmarks.startup``.
+"""
+
+import json
+import os
+import statistics
+import subprocess  # noqa: S404 - runs this interpreter on a fixed probe, no user input
+import sys
+import tempfile
+from pathlib import Path
+
+RUNS = 5
+TOP_IMPORTS = 15
+PROBE = """
+import json, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+app.openapi()
+done = time.perf_counter()
+print(json.dumps({"import": imported - start, "openapi": done - imported}))
+"""
+
+
+def probe(cache_path: Path, *, importtime: bool = False) -> tuple[dict[str, float], str]:
+    """
+    Start a fresh interpreter importing the application and building its schema.
+
+    Args:
+        cache_path (Path): OpenAPI schema cache file
+        importtime (bool, optional): collect the import profile. Defaults to False.
+
+    Returns:
+        tuple[dict[str, float], str]: phase durations in seconds, import profile
+
+    """
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", PROBE]
+    result = subprocess.run(  # noqa: S603
+        command,
+        capture_output=True,
+        check=True,
+        text=True,
+        env={**os.environ, "APP_CONFIG__OPENAPI__CACHE_PATH": str(cache_path)},
+    )
+    return json.loads(result.stdout.splitlines()[-1]), result.stderr
+
+
+def slowest_imports(profile: str) -> list[tuple[int, str]]:
+    """
+    Parse the ``-X importtime`` output for the modules imported by the application.
+
+    Args:
+        profile (str): interpreter stderr
+
+    Returns:
+        list[tuple[int, str]]: cumulative microseconds and module names
+
+    """
+    imports: list[tuple[int, str]] = []
+
+    for line in profile.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+
+        # the probe imports app.main at the top level, its own imports are one level deeper
+        if name.startswith("   ") and not name.startswith("     "):
+            imports.append((int(cumulative), name.strip()))
+
+    return sorted(imports, reverse=True)[:TOP_IMPORTS]
+
+
+def main() -> None:
+    """Run the benchmark."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache_path = Path(directory) / "openapi.json"
+        cold: list[dict[str, float]] = []
+        cached: list[dict[str, float]] = []
+
+        for _ in range(RUNS):
+            cache_path.unlink(missing_ok=True)
+            cold.append(probe(cache_path)[0])
+            cached.append(probe(cache_path)[0])
+
+        _, profile = probe(cache_path, importtime=True)
+
+    print(f"{'phase':>24} {'median ms':>10}")
+
+    for name, runs in (("generated", cold), ("cached", cached)):
+        for phase in ("import", "openapi"):
+            median = statistics.median(run[phase] for run in runs)
+            print(f"{f'{phase} ({name})':>24} {median * 1e3:>10.1f}")
+
+    print(f"\n{'cumulative ms':>14}  imported by app.main")
+
+    for cumulative, name in slowest_imports(profile):
+        print(f"{cumulative / 1e3:>14.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Statement preparation: the /tasks/all read with the prepared statement cache off and on.
+
+The PgBouncer mode prepares every statement under a unique name.
+
+Needs the PostgreSQL database of the settings, migrated and seeded.
+
+Run with ``python -m benchmarks.statements``.
+"""
+
+import asyncio
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.core.context import RequestContext, request_context
+from app.core.metrics import registry
+from app.database import SqlAlchemyDB
+from app.database.models import Task, User
+from app.database.warmup import HOT_READ, hot_reads
+
+READS = 2_000
+WARMUP = 100
+CASES = {
+    "cache off": {"prepared_statement_cache_size": 0, "pgbouncer": False},
+    "cache on": {"prepared_statement_cache_size": 256, "pgbouncer": False},
+    "pgbouncer": {"prepared_statement_cache_size": 256, "pgbouncer": True},
+}
+
+
+def prepared_hits() -> tuple[float, float]:
+    """
+    Read the prepared statement cache counters of the process.
+
+    Returns:
+        tuple[float, float]: hits and misses
+
+    """
+    hits = misses = 0.0
+
+    for key, value in registry.collect().items():
+        if not key.startswith("db_prepared_statements_total"):
+            continue
+        if 'result="hit"' in key:
+            hits += value
+        elif 'result="miss"' in key:
+            misses += value
+
+    return hits, misses
+
+
+async def read_tasks(session: AsyncSession, read: HOT_READ) -> float:
+    """
+    Read the tasks of the busiest user repeatedly on one connection.
+
+    Args:
+        session (AsyncSession): database session
+        read (HOT_READ): repository read of the route
+
+    Returns:
+        float: seconds per read
+
+    """
+    busiest = select(Task.user_id).group_by(Task.user_id).order_by(func.count().desc()).limit(1)
+    user = User(id=await session.scalar(busiest) or 0, username="")
+
+    for _ in range(WARMUP):
+        _ = await read(session, user)
+        session.expunge_all()
+
+    start = time.perf_counter()
+
+    for _ in range(READS):
+        _ = await read(session, user)
+        session.expunge_all()
+
+    return (time.perf_counter() - start) / READS
+
+
+async def run_case(name: str, options: dict[str, object]) -> float:
+    """
+    Measure the read with the statement cache settings.
+
+    Args:
+        name (str): benchmark case name
+        options (dict[str, object]): statement cache settings
+
+    Returns:
+        float: seconds per read
+
+    """
+    for key, value in options.items():
+        setattr(settings.db.statements, key, value)
+
+    db = SqlAlchemyDB()
+    await db.init(str(settings.db.url))
+    path = f"{settings.api.prefix}{settings.api.v1.prefix}{settings.api.v1.tasks}/all"
+    # the statements carry the route comment of the real requests
+    token = request_context.set(RequestContext("bench", {"route": Route(path, lambda: None)}))
+    hits, misses = prepared_hits()
+
+    try:
+        async with db.session_factory() as session:
+            elapsed = await read_tasks(session, hot_reads()[path])
+    finally:
+        request_context.reset(token)
+        await db.close()
+
+    after_hits, after_misses = prepared_hits()
+    lookups = after_hits - hits + after_misses - misses
+    ratio = f"{(after_hits - hits) / lookups:.0%}" if lookups else "-"
+    print(f"{name:<12} {elapsed * 1e6:>10.1f} us/read {ratio:>8} hits")
+    return elapsed
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    results = {name: await run_case(name, options) for name, options in CASES.items()}
+    saved = results["cache off"] - results["cache on"]
+    print(f"preparation saved {saved * 1e6:.1f} us/read ({saved / results['cache off']:.0%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+import time
+from collections.abc import Awaitable, Callable
+
+from starlette.types import ASGIApp, Message, Scope
+
+
+def http_scope(
+    path: str,
+    method: str = "GET",
+    query_string: bytes = b"",
+    headers: list[tuple[bytes, bytes]] | None = None,
+) -> Scope:
+    """
+    Build a minimal HTTP connection scope.
+
+    Args:
+        path (str): request path
+        method (str, optional): request method. Defaults to "GET".
+        query_string (bytes, optional): raw query string. Defaults to b"".
+        headers (list[tuple[bytes, bytes]] | None, optional): raw headers. Defaults to None.
+
+    Returns:
+        Scope: connection scope
+
+    """
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": headers or [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def call_asgi(app: ASGIApp, scope: Scope, body: bytes = b"") -> list[Message]:
+    """
+    Drive one request through the ASGI application without a server.
+
+    Args:
+        app (ASGIApp): ASGI application
+        scope (Scope): connection scope
+        body (bytes, optional): request body. Defaults to b"".
+
+    Returns:
+        list[Message]: messages sent by the application
+
+    """
+    sent: list[Message] = []
+    request_message: Message = {"type": "http.request", "body": body, "more_body": False}
+
+    async def receive() -> Message:
+        return request_message
+
+    async def send(message: Message) -> None:
+        sent.append(message)
+
+    await app(dict(scope), receive, send)
+    return sent
+
+
+async def measure(
+    name: str,
+    func: Callable[[], Awaitable[object]],
+    iterations: int,
+    warmup: int = 100,
+) -> float:
+    """
+    Measure and print the throughput of an asynchronous call.
+
+    Args:
+        name (str): benchmark case name
+        func (Callable[[], Awaitable[object]]): measured call
+        iterations (int): number of measured calls
+        warmup (int, optional): number of unmeasured calls. Defaults to 100.
+
+    Returns:
+        float: calls per second
+
+    """
+    for _ in range(warmup):
+        await func()
+
+    start = time.perf_counter()
+
+    for _ in range(iterations):
+        await func()
+
+    elapsed = time.perf_counter() - start
+    throughput = iterations / elapsed
+    print(f"{name:<40} {throughput:>12,.0f} req/s {elapsed / iterations * 1e6:>10.1f} us/req")
+    return throughput